@@ -0,0 +1,549 @@
+import json
+import csv
+import re
+import os
+import sys
+import tracemalloc
+import random
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from datetime import datetime
+from columnar_output import ColumnarTable, COLUMNAR_FORMATS, write_columnar_next_to_csv
+
+# VLAN usada cuando la tabla de MACs no trae un número (ej. entradas '-' del supervisor)
+NO_VLAN = 0
+# Columnas que solo se conservan cuando se piden (JSON de depuración), incluida la MAC tal como vino
+MAC_EXTRA_COLUMNS = ("Indicator", "MAC", "Type", "Age", "Flag1", "Flag2")
+
+# Registro compacto de la tabla de MACs: MAC como entero de 48 bits, VLAN como entero
+# e interfaz internada. Las columnas sin uso en el match solo se guardan en 'extra' si se piden.
+class MacEntry:
+    __slots__ = ("mac", "vlan", "interface", "extra")
+
+    def __init__(self, mac, vlan, interface, extra=None):
+        self.mac = mac
+        self.vlan = vlan
+        self.interface = interface
+        self.extra = extra
+
+    def as_dict(self):
+        entry = {"MAC": format_mac(self.mac), "VLAN": self.vlan, "Interface": self.interface}
+        if self.extra:
+            entry.update(zip(MAC_EXTRA_COLUMNS, self.extra))
+        return entry
+
+# Registro compacto de la tabla ARP. La MAC entera solo se usa como clave;
+# en la salida va el texto capturado (mac_text) para no cambiar la notación del equipo.
+class ArpEntry:
+    __slots__ = ("ip", "mac", "vlan", "mac_text")
+
+    def __init__(self, ip, mac, vlan, mac_text):
+        self.ip = ip
+        self.mac = mac
+        self.vlan = vlan
+        self.mac_text = mac_text
+
+    def as_dict(self):
+        return {"IP": self.ip, "MAC": self.mac_text, "VLAN": self.vlan}
+
+MAC_PATTERN = re.compile(r'(\S+)\s+(\S+)\s+(\S+)\s+(\S+)\s+(\S+)\s+(\S+)\s+(\S+)\s+(\S+)')
+ARP_PATTERN = re.compile(r'(\S+)\s+(\S+)\s+(\S+)\s+Vlan(\d+)\s*\*?')
+
+MATCH_FIELDNAMES = ["IP", "MAC", "VLAN", "Interface", "Hostname"]
+# Tipos de las columnas para la salida Parquet/Arrow (ver columnar_output.py)
+MATCH_COLUMNAR_SCHEMA = [("IP", "ip"), ("MAC", "mac"), ("VLAN", "int"), ("Interface", "string"), ("Hostname", "string")]
+MANIFEST_FIELDNAMES = ["hostname", "mac_file", "arp_file", "omitted_interfaces"]
+
+# Códigos de salida del modo batch
+EXIT_OK = 0
+EXIT_DEVICE_ERRORS = 1
+EXIT_INVALID_MANIFEST = 2
+
+def validate_file_path(prompt, expected_extension=None):
+    while True:
+        file_path = input(prompt)
+        if expected_extension and not file_path.endswith(expected_extension):
+            print(f"El archivo debe tener la extensión {expected_extension}.")
+        elif os.path.isfile(file_path):
+            return file_path
+        else:
+            print("El archivo no existe. Por favor, inténtalo de nuevo.")
+
+# Función para convertir una MAC (0050.5601.0001, 00:50:56:01:00:01 o 00-50-56-01-00-01) a entero de 48 bits
+def parse_mac(mac_text):
+    digits = mac_text.replace('.', '').replace(':', '').replace('-', '')
+    if len(digits) != 12:
+        raise ValueError(f"MAC inválida: {mac_text}")
+    return int(digits, 16)
+
+# Función para mostrar la MAC en el formato de NX-OS/IOS (xxxx.xxxx.xxxx)
+def format_mac(mac):
+    digits = f"{mac:012x}"
+    return f"{digits[0:4]}.{digits[4:8]}.{digits[8:12]}"
+
+# Función para armar la clave (MAC, VLAN) del índice. Se usa una tupla y no un entero
+# combinado para que una VLAN fuera de 0-4095 no se mezcle con los bits de la MAC.
+def mac_vlan_key(mac, vlan):
+    return (mac, vlan)
+
+# Generador que convierte las líneas de 'show mac address-table' en registros compactos.
+# Las líneas cuya MAC o VLAN no son válidas (encabezados, leyendas) se descartan.
+def parse_mac_lines(lines, keep_columns=False):
+    intern = sys.intern
+    for line in lines:
+        if not (match := MAC_PATTERN.match(line)):
+            continue
+        try:
+            mac = parse_mac(match.group(3))
+        except ValueError:
+            continue
+        vlan_text = match.group(2)
+        vlan = int(vlan_text) if vlan_text.isdigit() else NO_VLAN
+        extra = (match.group(1), match.group(3), match.group(4), match.group(5), match.group(6), match.group(7)) if keep_columns else None
+        yield MacEntry(mac, vlan, intern(match.group(8)), extra)
+
+# Generador que lee la salida de 'show mac address-table' línea por línea (una sola lectura)
+def iter_mac_records(mac_file_path, keep_columns=False):
+    with open(mac_file_path, 'r') as file:
+        yield from parse_mac_lines(file, keep_columns)
+
+# Generador que lee la salida de 'show ip arp' línea por línea (una sola lectura)
+def iter_arp_records(arp_file_path):
+    with open(arp_file_path, 'r') as file:
+        for line in file:
+            if not (match := ARP_PATTERN.match(line)):
+                continue
+            try:
+                mac = parse_mac(match.group(3))
+            except ValueError:
+                continue
+            yield ArpEntry(match.group(1), mac, int(match.group(4)), match.group(3))
+
+# Generador que deja pasar los registros y los va escribiendo en un JSON de depuración
+def tee_records_to_json(records, json_path):
+    with open(json_path, 'w') as json_file:
+        json_file.write("[")
+        separator = "\n"
+        for record in records:
+            json_file.write(separator + json.dumps(record.as_dict()))
+            separator = ",\n"
+            yield record
+        json_file.write("\n]\n")
+    print(f"Registros de depuración guardados en {json_path}")
+
+# Función para leer el archivo de salida de MAC y construir el índice (MAC, VLAN) -> interfaces
+def read_mac_output(debug_json=False):
+    mac_file_path = validate_file_path("Nombre del archivo con las direcciones MACs en txt (ejemplo: macs-output.txt): ", '.txt')
+
+    while True:
+        records = iter_mac_records(mac_file_path, keep_columns=debug_json)
+        if debug_json:
+            records = tee_records_to_json(records, os.path.splitext(mac_file_path)[0] + '.json')
+        mac_index = build_mac_index(records)
+        if mac_index:
+            return mac_index
+
+        print(f"El archivo '{mac_file_path}' no contiene información válida para un archivo de MAC.")
+        mac_file_path = validate_file_path("Por favor, proporciona un archivo válido de direcciones MACs en txt: ", '.txt')
+
+# Función para leer el archivo de salida de ARP y generar la lista de registros compactos
+def read_arp_output(debug_json=False):
+    arp_file_path = validate_file_path("Nombre del archivo con la tabla ARP en txt (ejemplo: arp-output.txt): ", '.txt')
+
+    while True:
+        records = iter_arp_records(arp_file_path)
+        if debug_json:
+            records = tee_records_to_json(records, os.path.splitext(arp_file_path)[0] + '.json')
+        arp_records = list(records)
+        if arp_records:
+            return arp_records
+
+        print(f"El archivo '{arp_file_path}' no contiene información válida para un archivo de ARP.")
+        arp_file_path = validate_file_path("Por favor, proporciona un archivo válido de tabla ARP en txt: ", '.txt')
+
+# Función para validar que las interfaces a omitir existan
+def validate_existing_interfaces(available_interfaces):
+    #print(f"Interfaces disponibles: {', '.join(available_interfaces)}")
+    while True:
+        omitted_interfaces = input("Ingrese las interfaces a omitir, separadas por comas (Ejemplo: Po1,Eth3/19) o presione Enter para omitir este paso: ").split(',')
+        omitted_interfaces = [interface.strip() for interface in omitted_interfaces if interface.strip()]
+        non_existent = [interface for interface in omitted_interfaces if interface not in available_interfaces]
+
+        if non_existent:
+            print(f"Las siguientes interfaces no existen: {', '.join(non_existent)}. Por favor, verifica y vuelve a intentarlo.")
+        else:
+            return omitted_interfaces
+
+# Función para crear la carpeta con la fecha actual y devolver la ruta del CSV de resultados
+def dated_csv_path(output_csv_name):
+    current_date = datetime.now().strftime("%d-%m-%Y")
+    folder_name = f"{current_date}-match"
+
+    os.makedirs(folder_name, exist_ok=True)
+    return os.path.join(folder_name, output_csv_name + '.csv')
+
+# Función para abrir el CSV de resultados en modo 'append' y escribir la cabecera si es nuevo
+def open_match_writer(output_csv_path):
+    # Comprobar si el archivo CSV ya existe
+    file_exists = os.path.isfile(output_csv_path)
+
+    csv_file = open(output_csv_path, 'a', newline='')  # Abrir en modo 'append'
+    writer = csv.DictWriter(csv_file, fieldnames=MATCH_FIELDNAMES)
+
+    # Si el archivo no existe, escribir la cabecera
+    if not file_exists:
+        writer.writeheader()
+    return csv_file, writer
+
+# Función para escribir las coincidencias de un equipo
+def write_matches(writer, matches, hostname):
+    for entry in matches:
+        entry['Hostname'] = hostname
+        writer.writerow(entry)
+
+# Función para crear la carpeta con la fecha actual y guardar el archivo CSV
+def save_csv_in_dated_folder(matches, hostname, output_csv_name, columnar_format=None):
+    output_csv_path = dated_csv_path(output_csv_name)
+
+    csv_file, writer = open_match_writer(output_csv_path)
+    with csv_file:
+        write_matches(writer, matches, hostname)
+
+    print(f"Los resultados se han guardado en {output_csv_path}")
+
+    if columnar_format:
+        # El CSV acumula todos los equipos; Parquet/Arrow no admite 'append', así que va un archivo por equipo
+        table = ColumnarTable(MATCH_COLUMNAR_SCHEMA)
+        table.extend(matches)
+        write_columnar_next_to_csv(table, f"{os.path.splitext(output_csv_path)[0]}-{hostname}.csv", columnar_format)
+
+# Función para construir el índice (MAC, VLAN) -> interfaces sobre la tabla de MACs.
+# Las interfaces omitidas se descartan aquí, así no se vuelven a revisar en el match.
+def build_mac_index(mac_records, omitted_interfaces=()):
+    omitted = set(omitted_interfaces)
+    mac_index = {}
+    for record in mac_records:
+        if record.interface in omitted:
+            continue
+        key = mac_vlan_key(record.mac, record.vlan)
+        mac_index[key] = mac_index.get(key, ()) + (record.interface,)
+    return mac_index
+
+# Función para quitar del índice las interfaces omitidas cuando se eligen después de leer el archivo
+def prune_mac_index(mac_index, omitted_interfaces):
+    omitted = set(omitted_interfaces)
+    if not omitted:
+        return mac_index
+    pruned_index = {}
+    for key, interfaces in mac_index.items():
+        kept = tuple(interface for interface in interfaces if interface not in omitted)
+        if kept:
+            pruned_index[key] = kept
+    return pruned_index
+
+# Función para unir la tabla ARP con el índice de MACs (una búsqueda por entrada ARP)
+def join_arp_with_mac_index(arp_records, mac_index):
+    return [
+        {
+            "IP": arp_record.ip,
+            "MAC": arp_record.mac_text,
+            "VLAN": str(arp_record.vlan),
+            "Interface": interface,
+        }
+        for arp_record in arp_records
+        for interface in mac_index.get(mac_vlan_key(arp_record.mac, arp_record.vlan), ())
+    ]
+
+# Función para hacer match entre los datos de MAC y ARP
+def match_mac_arp(mac_index, arp_records, columnar_format=None):
+    available_interfaces = {interface for interfaces in mac_index.values() for interface in interfaces}
+    omitted_interfaces = validate_existing_interfaces(available_interfaces)
+
+    total_mac_count = sum(len(interfaces) for interfaces in mac_index.values())
+    matches = join_arp_with_mac_index(arp_records, prune_mac_index(mac_index, omitted_interfaces))
+
+    print(f"Total de direcciones MAC: {total_mac_count}")
+    print(f"Total de coincidencias: {len(matches)}")
+
+    hostname = input("Ingrese el hostname del equipo: ")
+    output_csv_name = input("Ingrese el nombre del archivo CSV (sin extensión, ejemplo: match): ")
+    save_csv_in_dated_folder(matches, hostname, output_csv_name, columnar_format)
+
+# Función para preguntar si el usuario desea realizar otro análisis
+def ask_continue():
+    while True:
+        continuar = input("¿Desea realizar otro análisis de coincidencias? (s/n): ").strip().lower()
+        if continuar in ('s', 'n'):
+            return continuar == 's'
+        print("Por favor, ingrese 's' para sí o 'n' para no.")
+
+# Función principal con introducción
+def main(debug_json=False, columnar_format=None):
+    print("Bienvenido al programa de procesamiento de datos de MAC y ARP.")
+    print("Este programa realiza las siguientes funciones:")
+    print("1. Lee un archivo con direcciones MAC y construye un índice por MAC y VLAN.")
+    print("2. Lee un archivo con una tabla ARP.")
+    print("3. Compara las direcciones MAC con la tabla ARP para encontrar coincidencias.")
+    print("4. Guarda las coincidencias en un archivo CSV en una carpeta con la fecha actual.")
+    print("\nPor favor, sigue las instrucciones para seleccionar los archivos y proporcionar los datos necesarios.\n")
+
+    while True:
+        mac_index = read_mac_output(debug_json)
+        arp_records = read_arp_output(debug_json)
+
+        match_mac_arp(mac_index, arp_records, columnar_format)
+
+        if not ask_continue():
+            break
+        print("Reiniciando el proceso...")
+
+    print("Saliendo del programa.")
+
+# Función para leer el manifiesto del modo batch (CSV con hostname, mac_file, arp_file, omitted_interfaces).
+# Las interfaces a omitir van separadas por ';' y las rutas relativas se resuelven desde la carpeta del manifiesto.
+def read_manifest(manifest_path):
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    devices = []
+    with open(manifest_path, 'r', newline='') as manifest_file:
+        reader = csv.DictReader(manifest_file)
+        missing_columns = [name for name in MANIFEST_FIELDNAMES[:3] if name not in (reader.fieldnames or [])]
+        if missing_columns:
+            raise ValueError(f"Faltan columnas en el manifiesto: {', '.join(missing_columns)}")
+
+        for line_number, row in enumerate(reader, 2):
+            hostname = (row["hostname"] or "").strip()
+            mac_file = (row["mac_file"] or "").strip()
+            arp_file = (row["arp_file"] or "").strip()
+            if not (hostname and mac_file and arp_file):
+                raise ValueError(f"Línea {line_number} del manifiesto incompleta: se requieren hostname, mac_file y arp_file")
+
+            omitted_interfaces = [interface.strip() for interface in (row.get("omitted_interfaces") or "").split(';') if interface.strip()]
+            devices.append({
+                "hostname": hostname,
+                "mac_file": os.path.join(base_dir, mac_file),
+                "arp_file": os.path.join(base_dir, arp_file),
+                "omitted_interfaces": omitted_interfaces,
+            })
+    return devices
+
+# Función para procesar un equipo del manifiesto sin ninguna pregunta al usuario
+def process_device(device, debug_json=False):
+    result = {"hostname": device["hostname"], "status": "ok", "mac_count": 0, "match_count": 0, "message": "", "matches": []}
+
+    for key in ("mac_file", "arp_file"):
+        if not os.path.isfile(device[key]):
+            result.update(status="error", message=f"El archivo {device[key]} no existe")
+            return result
+
+    try:
+        return correlate_device(device, result, debug_json)
+    except (OSError, UnicodeDecodeError) as e:
+        result.update(status="error", message=f"Error al leer los archivos: {e}")
+        return result
+
+# Función con el pipeline de un equipo: lectura de MAC y ARP, índice, match
+def correlate_device(device, result, debug_json=False):
+    mac_records = iter_mac_records(device["mac_file"], keep_columns=debug_json)
+    arp_records = iter_arp_records(device["arp_file"])
+    if debug_json:
+        mac_records = tee_records_to_json(mac_records, os.path.splitext(device["mac_file"])[0] + '.json')
+        arp_records = tee_records_to_json(arp_records, os.path.splitext(device["arp_file"])[0] + '.json')
+
+    mac_index = build_mac_index(mac_records)
+    if not mac_index:
+        result.update(status="error", message=f"El archivo '{device['mac_file']}' no contiene información válida para un archivo de MAC")
+        return result
+    arp_records = list(arp_records)
+    if not arp_records:
+        result.update(status="error", message=f"El archivo '{device['arp_file']}' no contiene información válida para un archivo de ARP")
+        return result
+
+    available_interfaces = {interface for interfaces in mac_index.values() for interface in interfaces}
+    non_existent = [interface for interface in device["omitted_interfaces"] if interface not in available_interfaces]
+    if non_existent:
+        result.update(status="warning", message=f"Interfaces a omitir que no existen: {', '.join(non_existent)}")
+
+    result["mac_count"] = sum(len(interfaces) for interfaces in mac_index.values())
+    result["matches"] = join_arp_with_mac_index(arp_records, prune_mac_index(mac_index, device["omitted_interfaces"]))
+    result["match_count"] = len(result["matches"])
+    return result
+
+# Función para imprimir el resumen de la corrida batch
+def print_run_summary(results, output_csv_path, elapsed, workers):
+    errors = [result for result in results if result["status"] == "error"]
+    warnings = [result for result in results if result["status"] == "warning"]
+
+    print("\nResumen de la ejecución")
+    print("=" * 50)
+    for result in results:
+        line = f"{result['hostname']}: {result['status']} - MACs: {result['mac_count']}, coincidencias: {result['match_count']}"
+        if result["message"]:
+            line += f" ({result['message']})"
+        print(line)
+    print("=" * 50)
+    print(f"Equipos procesados: {len(results)}, con advertencias: {len(warnings)}, con errores: {len(errors)}")
+    print(f"Total de coincidencias: {sum(result['match_count'] for result in results)}")
+    print(f"Resultados guardados en {output_csv_path} ({elapsed:.1f} s con {workers} proceso(s))")
+
+# Generador que procesa los equipos en un pool de procesos y entrega los resultados en el orden del manifiesto
+def iter_device_results(devices, workers, debug_json=False):
+    if workers <= 1:
+        for device in devices:
+            yield process_device(device, debug_json)
+        return
+
+    workers = min(workers, len(devices))
+    chunksize = max(1, len(devices) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(process_device, devices, repeat(debug_json), chunksize=chunksize)
+
+# Función para procesar todos los equipos del manifiesto y devolver el código de salida
+def run_batch(manifest_path, output_csv_name, workers=1, debug_json=False, columnar_format=None):
+    try:
+        devices = read_manifest(manifest_path)
+    except (OSError, ValueError) as e:
+        print(f"Manifiesto inválido '{manifest_path}': {e}")
+        return EXIT_INVALID_MANIFEST
+    if not devices:
+        print(f"El manifiesto '{manifest_path}' no contiene equipos.")
+        return EXIT_INVALID_MANIFEST
+
+    start = time.perf_counter()
+    output_csv_path = dated_csv_path(output_csv_name)
+    results = []
+    table = ColumnarTable(MATCH_COLUMNAR_SCHEMA) if columnar_format else None
+
+    # El proceso principal es el único que escribe en el CSV; los workers solo devuelven resultados
+    csv_file, writer = open_match_writer(output_csv_path)
+    with csv_file:
+        for result in iter_device_results(devices, workers, debug_json):
+            matches = result.pop("matches")
+            write_matches(writer, matches, result["hostname"])
+            if table is not None:
+                table.extend(matches)
+            results.append(result)
+
+    if table is not None:
+        write_columnar_next_to_csv(table, output_csv_path, columnar_format)
+
+    print_run_summary(results, output_csv_path, time.perf_counter() - start, workers)
+    return EXIT_DEVICE_ERRORS if any(result["status"] == "error" for result in results) else EXIT_OK
+
+# Función con el match original (ARP x MAC), se conserva solo como referencia del benchmark
+def nested_loop_match(arp_records, mac_records, omitted_interfaces):
+    return [
+        {
+            "IP": arp_record.ip,
+            "MAC": arp_record.mac_text,
+            "VLAN": str(arp_record.vlan),
+            "Interface": mac_record.interface,
+        }
+        for arp_record in arp_records
+        for mac_record in mac_records
+        if arp_record.mac == mac_record.mac and arp_record.vlan == mac_record.vlan and mac_record.interface not in omitted_interfaces
+    ]
+
+# Función para generar tablas MAC y ARP sintéticas
+def generate_synthetic_tables(rows, seed=0):
+    rng = random.Random(seed)
+    mac_records = [
+        MacEntry(0x005056000000 + i, rng.randint(1, 200), sys.intern(f"Eth1/{rng.randint(1, 48)}"))
+        for i in range(rows)
+    ]
+    arp_records = [
+        ArpEntry(f"10.{(i >> 16) & 0xff}.{(i >> 8) & 0xff}.{i & 0xff}", record.mac, record.vlan, format_mac(record.mac))
+        for i, record in enumerate(rng.sample(mac_records, rows // 2))
+    ]
+    return mac_records, arp_records
+
+# Función para medir el match indexado contra el match anidado en 1k, 10k y 100k filas
+BENCHMARK_SIZES = (1_000, 10_000, 100_000)
+NESTED_LOOP_MAX_ROWS = 10_000
+
+def run_benchmark(sizes=BENCHMARK_SIZES):
+    omitted_interfaces = ["Eth1/48"]
+    print(f"{'Filas MAC':>10} {'Filas ARP':>10} {'Coincidencias':>14} {'Indexado (s)':>13} {'Anidado (s)':>12}")
+    for rows in sizes:
+        mac_records, arp_records = generate_synthetic_tables(rows)
+
+        start = time.perf_counter()
+        matches = join_arp_with_mac_index(arp_records, build_mac_index(mac_records, omitted_interfaces))
+        indexed_time = time.perf_counter() - start
+
+        if rows <= NESTED_LOOP_MAX_ROWS:
+            start = time.perf_counter()
+            expected = nested_loop_match(arp_records, mac_records, omitted_interfaces)
+            nested_time = f"{time.perf_counter() - start:12.3f}"
+            if expected != matches:
+                raise AssertionError(f"El match indexado no coincide con el anidado para {rows} filas")
+        else:
+            nested_time = f"{'omitido':>12}"
+
+        print(f"{rows:>10} {len(arp_records):>10} {len(matches):>14} {indexed_time:13.3f} {nested_time}")
+
+# Función con el formato anterior de la tabla de MACs (dict de 8 cadenas por fila), solo para el benchmark de memoria
+def parse_mac_lines_as_dicts(lines):
+    return [
+        {
+            "Indicator": match.group(1),
+            "VLAN": match.group(2),
+            "MAC": match.group(3),
+            "Type": match.group(4),
+            "Age": match.group(5),
+            "Flag1": match.group(6),
+            "Flag2": match.group(7),
+            "Interface": match.group(8),
+        }
+        for line in lines if (match := MAC_PATTERN.match(line))
+    ]
+
+# Función para generar líneas sintéticas de 'show mac address-table'
+def generate_synthetic_mac_lines(rows, seed=0):
+    rng = random.Random(seed)
+    lines = []
+    for i in range(rows):
+        mac = format_mac(0x005056000000 + i)
+        lines.append(f"*  {rng.randint(1, 4000):<4}   {mac}   dynamic  0         F      F    Eth{rng.randint(1, 8)}/{rng.randint(1, 48)}\n")
+    return lines
+
+# Función para medir la memoria retenida por cada formato de la tabla de MACs
+def measure_retained_memory(build):
+    tracemalloc.start()
+    data = build()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del data
+    return retained / (1024 * 1024)
+
+MEMORY_BENCHMARK_SIZES = (100_000, 500_000)
+
+def run_memory_benchmark(sizes=MEMORY_BENCHMARK_SIZES):
+    print(f"{'Filas MAC':>10} {'Dicts (MB)':>11} {'Compacto (MB)':>14} {'Índice (MB)':>12}")
+    for rows in sizes:
+        lines = generate_synthetic_mac_lines(rows)
+        dict_mb = measure_retained_memory(lambda: parse_mac_lines_as_dicts(lines))
+        compact_mb = measure_retained_memory(lambda: list(parse_mac_lines(lines)))
+        index_mb = measure_retained_memory(lambda: build_mac_index(parse_mac_lines(lines)))
+        print(f"{rows:>10} {dict_mb:11.1f} {compact_mb:14.1f} {index_mb:12.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Procesamiento de datos de MAC y ARP.")
+    parser.add_argument("--manifest", help="CSV con hostname, mac_file, arp_file y omitted_interfaces para procesar sin preguntas.")
+    parser.add_argument("--output", default="match", help="Nombre del CSV de resultados en modo batch (sin extensión, por defecto: match).")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Procesos en paralelo para el modo batch (por defecto: número de CPUs).")
+    parser.add_argument("--benchmark", action="store_true", help="Mide el match indexado contra el match anidado y termina.")
+    parser.add_argument("--benchmark-memory", action="store_true", help="Mide la memoria de la tabla de MACs en dicts contra los registros compactos y termina.")
+    parser.add_argument("--debug-json", action="store_true", help="Guarda los registros leídos, con todas sus columnas, en un JSON junto a cada archivo de entrada.")
+    parser.add_argument("--columnar", choices=COLUMNAR_FORMATS, help="Guarda también los resultados en Parquet o Arrow (requiere pyarrow).")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        run_benchmark()
+    elif args.benchmark_memory:
+        run_memory_benchmark()
+    elif args.manifest:
+        sys.exit(run_batch(args.manifest, args.output, args.workers, args.debug_json, args.columnar))
+    else:
+        main(args.debug_json, args.columnar)
@@ -0,0 +1,88 @@
+import json
+import csv
+import os
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from nxos_route_parser import parse_route_file
+from route_diff import diff_route_tables, summarize_changes, CHANGE_FIELDNAMES
+from columnar_output import ColumnarTable, COLUMNAR_FORMATS, write_columnar_next_to_csv
+from datetime import datetime
+
+# Tipos de las columnas para la salida Parquet/Arrow (ver columnar_output.py)
+CHANGE_COLUMNAR_SCHEMA = [("Network", "prefix"), ("Cambio", "string"), ("Next-hop", "ip"), ("Interfaz", "string"), ("Antes", "string"), ("Después", "string")]
+
+def validate_file_path(prompt, expected_extension=None):
+    while True:
+        file_path = input(prompt)
+        if expected_extension and not file_path.endswith(expected_extension):
+            print(f"El archivo debe tener la extensión {expected_extension}.")
+            continue
+        if os.path.isfile(file_path):
+            return file_path
+        else:
+            print("El archivo no existe. Por favor, inténtalo de nuevo.")
+
+# Función para parsear las dos capturas a la vez (una por proceso); las tablas vuelven en memoria
+def parse_captures(txt_file_paths, workers=2):
+    if workers <= 1:
+        return [parse_route_file(path) for path in txt_file_paths]
+    with ProcessPoolExecutor(max_workers=min(workers, len(txt_file_paths))) as executor:
+        return list(executor.map(parse_route_file, txt_file_paths))
+
+# Función para exportar una tabla a JSON con el mismo nombre que el archivo de texto (opcional, --export-json)
+def export_routes_json(routes, txt_file_path):
+    json_file_path = txt_file_path.replace(".txt", ".json")
+    with open(json_file_path, 'w') as json_file:
+        json.dump(routes, json_file, indent=4)
+    
+    print(f"El archivo JSON de las rutas se ha guardado en {json_file_path}")
+    return json_file_path
+
+def save_differences_to_csv(changes, csv_file_path, columnar_format=None):
+    with open(csv_file_path, 'w', newline='') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(CHANGE_FIELDNAMES)
+        writer.writerows(change.as_row() for change in changes)
+    
+    print(f"El archivo CSV con el resumen de diferencias se ha guardado en {csv_file_path}")
+
+    if columnar_format:
+        table = ColumnarTable(CHANGE_COLUMNAR_SCHEMA)
+        table.extend(dict(zip(CHANGE_FIELDNAMES, change.as_row())) for change in changes)
+        write_columnar_next_to_csv(table, csv_file_path, columnar_format)
+
+# Función para mostrar cuántos cambios hubo de cada tipo
+def print_change_summary(changes):
+    print(f"Total de cambios: {len(changes)}")
+    for kind, count in summarize_changes(changes).items():
+        print(f"  {kind}: {count}")
+
+def main(export_json=False, workers=2, columnar_format=None):
+    txt_file1 = validate_file_path("Ingrese la tabla de rutas del antes en txt: ", ".txt")
+    txt_file2 = validate_file_path("Ingrese la tabla de rutas del despues en txt: ", ".txt")
+    
+    data1, data2 = parse_captures([txt_file1, txt_file2], workers)
+    
+    if export_json:
+        export_routes_json(data1, txt_file1)
+        export_routes_json(data2, txt_file2)
+    
+    changes = diff_route_tables(data1, data2)
+    print_change_summary(changes)
+    
+    date_folder = datetime.now().strftime("%d-%m-%Y-diff")
+    if not os.path.exists(date_folder):
+        os.makedirs(date_folder)
+    
+    csv_file_name = input("Ingrese el nombre para generar el archivo CSV con las rutas que cambiaron (sin extensión): ").strip()
+    csv_file_path = os.path.join(date_folder, f"{csv_file_name}.csv")
+    
+    save_differences_to_csv(changes, csv_file_path, columnar_format)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara dos tablas de rutas de NX-OS y guarda los cambios en CSV.")
+    parser.add_argument("--export-json", action="store_true", help="Guarda también cada tabla en JSON junto a su archivo txt.")
+    parser.add_argument("--workers", type=int, default=min(2, os.cpu_count() or 1), help="Procesos para parsear las dos capturas (1 = en serie, por defecto: 2 si hay más de una CPU).")
+    parser.add_argument("--columnar", choices=COLUMNAR_FORMATS, help="Guarda también las diferencias en Parquet o Arrow (requiere pyarrow).")
+    args = parser.parse_args()
+    main(args.export_json, args.workers, args.columnar)
@@ -0,0 +1,117 @@
+import json
+import csv
+import os
+import argparse
+from datetime import datetime
+from collections import defaultdict
+from nxos_route_parser import parse_route_file
+from columnar_output import ColumnarTable, COLUMNAR_FORMATS, write_columnar_next_to_csv
+
+# Tipos de las columnas para la salida Parquet/Arrow (ver columnar_output.py)
+ROUTE_COLUMNAR_SCHEMA = [
+    ("network", "prefix"), ("ubest", "int"), ("next_hop", "ip"), ("interface", "string"), ("administrative_distance", "int"),
+    ("metric", "int"), ("age", "string"), ("protocol", "string"), ("route_type", "string"), ("tag", "int")
+]
+
+def validate_file_path(prompt, expected_extension=None):
+    while True:
+        file_path = input(prompt)
+        if expected_extension and not file_path.endswith(expected_extension):
+            print(f"El archivo debe tener la extensión {expected_extension}.")
+            continue
+        if os.path.isfile(file_path):
+            return file_path
+        else:
+            print("El archivo no existe. Por favor, inténtalo de nuevo.")
+
+def validate_output_file_name(prompt):
+    while True:
+        file_name = input(prompt).strip()
+        if file_name:
+            return file_name
+        else:
+            print("El nombre del archivo no puede estar vacío. Por favor, inténtalo de nuevo.")
+
+def parse_route_output(columnar_format=None):
+    # Solicitar el archivo de rutas
+    route_file_path = validate_file_path("Nombre del archivo con las RUTAS en txt (ejemplo: routes-output.txt): ", '.txt')
+    
+    routes = parse_route_file(route_file_path)
+
+    # Crear la carpeta con la fecha actual
+    date_folder = datetime.now().strftime("%d-%m-%Y-rutas")
+    if not os.path.exists(date_folder):
+        os.makedirs(date_folder)
+
+    # Guardar JSON temporalmente en la carpeta de fecha
+    json_file_path = os.path.join(date_folder, "routes.json")
+    with open(json_file_path, 'w') as json_file:
+        json.dump(routes, json_file, indent=4)
+    
+    print(f"El archivo JSON de las rutas se ha guardado en {json_file_path}")
+
+    # Solicitar el nombre del archivo CSV al usuario
+    csv_file_name = validate_output_file_name("Ingrese el nombre con el que desea guardar el archivo CSV (sin extensión): ")
+    csv_file_path = os.path.join(date_folder, f"{csv_file_name}.csv")
+
+    table = ColumnarTable(ROUTE_COLUMNAR_SCHEMA) if columnar_format else None
+
+    # Guardar CSV en la carpeta de fecha con el nombre especificado
+    with open(csv_file_path, 'w', newline='') as csv_file:
+        fieldnames = ["network", "ubest", "next_hop", "interface", "administrative_distance", "metric", "age", "protocol", "route_type", "tag"]
+        writer = csv.DictWriter(csv_file, fieldnames=fieldnames)
+        writer.writeheader()
+
+        # Escribir las rutas en el CSV (y en la tabla columnar si se pidió)
+        for network, route_info in routes.items():
+            for path in route_info["paths"]:
+                row = {
+                    "network": network,
+                    "ubest": route_info["ubest"],
+                    "next_hop": path["next_hop"],
+                    "interface": path["interface"],
+                    "administrative_distance": path["administrative_distance"],
+                    "metric": path["metric"],
+                    "age": path["age"],
+                    "protocol": path["protocol"],
+                    "route_type": path["route_type"],
+                    "tag": path["tag"]
+                }
+                writer.writerow(row)
+                if table is not None:
+                    table.append(row)
+    
+    print(f"El archivo CSV de las rutas se ha guardado en {csv_file_path}")
+    if table is not None:
+        write_columnar_next_to_csv(table, csv_file_path, columnar_format)
+
+    # Generar el reporte en un archivo .txt con el mismo nombre que el archivo CSV más el sufijo "-report"
+    total_networks = len(routes)
+    next_hop_counts = defaultdict(int)
+
+    for route_info in routes.values():
+        for path in route_info["paths"]:
+            next_hop_counts[path["next_hop"]] += 1
+    
+    total_next_hops = len(next_hop_counts)
+
+    # Crear el archivo de reporte en la misma carpeta
+    report_file_name = f"{csv_file_name}-report.txt"
+    report_file_path = os.path.join(date_folder, report_file_name)
+    with open(report_file_path, 'w') as report_file:
+        report_file.write(f"Total de redes: {total_networks}\n")
+        report_file.write(f"Total de next-hops únicos: {total_next_hops}\n\n")
+        report_file.write("Redes aprendidas por cada next-hop:\n")
+        for next_hop, count in next_hop_counts.items():
+            report_file.write(f"Next-hop {next_hop}: {count} redes\n")
+
+    print(f"El archivo de reporte se ha guardado en {report_file_path}")
+
+def main(columnar_format=None):
+    parse_route_output(columnar_format)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convierte la salida de 'show ip route' de NX-OS a JSON y CSV.")
+    parser.add_argument("--columnar", choices=COLUMNAR_FORMATS, help="Guarda también las rutas en Parquet o Arrow (requiere pyarrow).")
+    args = parser.parse_args()
+    main(args.columnar)
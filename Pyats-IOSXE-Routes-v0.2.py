@@ -0,0 +1,214 @@
+import time
+
+# Measured before anything else is imported, to report the script's startup time
+SCRIPT_START = time.perf_counter()
+
+import json
+import argparse
+import csv
+import os
+from collections import defaultdict
+from datetime import datetime
+from genie_parse_cache import cached_cli
+from columnar_output import ColumnarTable, COLUMNAR_FORMATS, write_columnar_next_to_csv
+
+# Column types for the Parquet/Arrow output (see columnar_output.py)
+ROUTE_COLUMNAR_SCHEMA = [
+    ("vrf", "string"), ("protocol", "string"), ("network", "prefix"), ("distance", "int"), ("metric", "int"),
+    ("next_hop", "ip"), ("time", "string"), ("interface", "string"), ("source_protocol_codes", "string")
+]
+
+# Function to validate file path
+def validate_file_path(prompt):
+    while True:
+        file_path = input(prompt)
+        if file_path.lower() == 'end':
+            print("Terminando el programa.")
+            return 'end'
+        if file_path.endswith('.txt') or file_path.endswith('.log'):
+            if os.path.isfile(file_path):
+                return file_path
+            else:
+                print("El archivo no existe. Por favor, inténtalo de nuevo.")
+        else:
+            print("El archivo debe tener la extensión .txt o .log.")
+
+# Function to validate and ensure output file has .csv extension
+def validate_output_file_name(prompt):
+    while True:
+        file_name = input(prompt).strip()
+        if file_name.lower() == 'end':
+            print("Terminando el programa.")
+            return 'end'
+        if file_name:
+            if not file_name.endswith('.csv'):
+                file_name += '.csv'
+            return file_name
+        else:
+            print("El nombre del archivo no puede estar vacío. Por favor, inténtalo de nuevo.")
+
+# Function to create a folder named with the current date
+def create_date_folder():
+    date_folder = datetime.now().strftime("%d-%m-%Y-routes")
+    try:
+        os.makedirs(date_folder, exist_ok=True)
+        print(f"Directory created: {date_folder}")
+    except Exception as e:
+        print(f"Error creating directory {date_folder}: {e}")
+    return date_folder
+
+# Genie is imported only when a capture is not in the parse cache (it takes seconds to load)
+genie_modules = None
+
+def load_genie():
+    global genie_modules
+    if genie_modules is None:
+        start = time.perf_counter()
+        from genie.conf.base import Device
+        from genie.libs.parser.iosxe import show_routing
+        print(f"Genie cargado en {time.perf_counter() - start:.2f} s")
+        genie_modules = (Device, show_routing)
+    return genie_modules
+
+# Function to build a Genie route parser; only called on a parse cache miss
+def make_route_parser(parser_class_name):
+    Device, show_routing = load_genie()
+    device = Device(name='virtual_device', os='iosxe')
+    device.custom.setdefault('abstraction', {'order': ['os']})
+    return getattr(show_routing, parser_class_name)(device=device)
+
+# Function to parse the 'show_ip_route_output' with Genie (result cached on disk, see genie_parse_cache.py);
+# the full JSON dump is only written with --dump-json
+def parse_show_ip_route(show_ip_route_output, date_folder, dump_json=False):
+    try:
+        parsed_output = cached_cli(
+            "iosxe.show_routing.ShowIpRoute", 'iosxe', show_ip_route_output, lambda: make_route_parser("ShowIpRoute")
+        )
+        
+        # Save parsed output as a JSON file
+        if dump_json:
+            with open(os.path.join(date_folder, 'parsed_output.json'), 'w') as json_file:
+                json.dump(parsed_output, json_file, indent=4)
+            
+            print(f"Parsed JSON saved to parsed_output.json in {date_folder}")
+        return parsed_output
+    except Exception as e:
+        print("Error parsing show_ip_route output:", e)
+        return None
+
+# Function to walk the parsed data once, yielding one CSV row per next hop
+def iter_route_rows(parsed_data):
+    # Iterate over the VRFs and routes, and extract relevant data
+    for vrf_name, vrf_data in parsed_data.get("vrf", {}).items():
+        for af, af_data in vrf_data.get("address_family", {}).items():
+            for network, route_info in af_data.get("routes", {}).items():
+                protocol = route_info.get("source_protocol", "n/a").upper()
+                network = route_info.get("route", "n/a")
+                distance = route_info.get("route_preference", "n/a")
+                metric = route_info.get("metric", "n/a")
+                source_protocol_codes = route_info.get("source_protocol_codes", "n/a")
+
+                # Extract next hop information
+                next_hop_info = route_info.get("next_hop", {}).get("next_hop_list", {})
+                for hop_index, hop_details in next_hop_info.items():
+                    yield {
+                        "vrf": vrf_name,
+                        "protocol": protocol,
+                        "network": network,
+                        "distance": distance,
+                        "metric": metric,
+                        "next_hop": hop_details.get("next_hop", "n/a"),
+                        "time": hop_details.get("updated", "n/a"),
+                        "interface": hop_details.get("outgoing_interface", "n/a"),
+                        "source_protocol_codes": source_protocol_codes
+                    }
+
+# Function to write the CSV and count next hops per VRF for the report in the same pass
+def convert_json_to_csv(parsed_data, csv_file_path, columnar_format=None):
+    next_hop_counts = defaultdict(lambda: defaultdict(int))
+    table = ColumnarTable(ROUTE_COLUMNAR_SCHEMA) if columnar_format else None
+    try:
+        with open(csv_file_path, mode='w', newline='') as csv_file:
+            fieldnames = ["vrf", "protocol", "network", "distance", "metric", "next_hop", "time", "interface", "source_protocol_codes"]
+            csv_writer = csv.DictWriter(csv_file, fieldnames=fieldnames)
+            csv_writer.writeheader()
+
+            for row in iter_route_rows(parsed_data):
+                csv_writer.writerow(row)
+                if table is not None:
+                    table.append(row)
+                if row["network"] and row["next_hop"]:
+                    next_hop_counts[row["vrf"]][row["next_hop"]] += 1
+
+        print(f"CSV file created at: {csv_file_path}")
+        if table is not None:
+            write_columnar_next_to_csv(table, csv_file_path, columnar_format)
+    except Exception as e:
+        print(f"Error converting JSON to CSV: {e}")
+    return next_hop_counts
+
+# Function to write the report from the counts gathered while writing the CSV, organized by VRF
+def generate_report(next_hop_counts, csv_file_path):
+    try:
+        report_file_path = f"{os.path.splitext(csv_file_path)[0]}-report.txt"
+
+        with open(report_file_path, 'w') as report_file:
+            for vrf, vrf_next_hops in next_hop_counts.items():
+                total_networks = sum(vrf_next_hops.values())
+                total_next_hops = len(vrf_next_hops)
+
+                report_file.write(f"\nVRF: {vrf}\n")
+                report_file.write(f"Total de redes: {total_networks}\n")
+                report_file.write(f"Total de next-hops únicos: {total_next_hops}\n\n")
+                report_file.write("Redes aprendidas por cada next-hop:\n")
+
+                for next_hop, count in vrf_next_hops.items():
+                    report_file.write(f"  Next-hop {next_hop}: {count} redes\n")
+
+        print(f"El archivo de reporte se ha guardado en {report_file_path}")
+    except Exception as e:
+        print(f"Error generating report: {e}")
+
+# Main function
+def main(validate_only=False, dump_json=False, columnar_format=None):
+    print(f"Tiempo de arranque: {time.perf_counter() - SCRIPT_START:.3f} s")
+
+    # Step 1: Get the input file path and output CSV file name
+    show_ip_route_file_path = validate_file_path("Introduce el archivo de salida de show ip route (por ejemplo, show_ip_route_output.txt o show_ip_route_output.log): ")
+    if show_ip_route_file_path == 'end':
+        return
+    
+    if validate_only:
+        print(f"Archivo válido: {show_ip_route_file_path}. No se realizó el análisis (--validate-only).")
+        return
+
+    csv_file_name = validate_output_file_name("Introduce el nombre del archivo CSV de salida (por ejemplo, output.csv): ")
+    if csv_file_name == 'end':
+        return
+
+    # Step 2: Create date-based folder
+    date_folder = create_date_folder()
+    csv_file_path = os.path.join(date_folder, csv_file_name)
+
+    # Step 3: Read the content from the show_ip_route file
+    with open(show_ip_route_file_path, 'r') as file:
+        show_ip_route_output = file.read()
+
+    # Step 4: Parse the show_ip_route_output using genie
+    parsed_data = parse_show_ip_route(show_ip_route_output, date_folder, dump_json)
+
+    if parsed_data:
+        # Step 5: Convert the parsed data to CSV, counting next hops for the report in the same pass
+        next_hop_counts = convert_json_to_csv(parsed_data, csv_file_path, columnar_format)
+        
+        # Step 6: Generate the report
+        generate_report(next_hop_counts, csv_file_path)
+
+# Run the main function
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convierte la salida de 'show ip route' (IOSXE) a CSV con Genie.")
+    parser.add_argument("--validate-only", action="store_true", help="Solo valida el archivo de entrada, sin cargar Genie ni analizar.")
+    parser.add_argument("--dump-json", action="store_true", help="Guarda también el árbol completo de Genie en parsed_output.json.")
+    parser.add_argument("--columnar", choices=COLUMNAR_FORMATS, help="Guarda también las rutas en Parquet o Arrow (requiere pyarrow).")
+    args = parser.parse_args()
+    main(args.validate_only, args.dump_json, args.columnar)
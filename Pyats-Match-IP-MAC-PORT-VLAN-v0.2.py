@@ -0,0 +1,405 @@
+import time
+
+# Measured before anything else is imported, to report the script's startup time
+SCRIPT_START = time.perf_counter()
+
+import json
+import csv
+import os
+import sys
+import importlib
+import random
+import logging
+import argparse
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from genie_parse_cache import cached_cli
+
+SUPPORTED_OS = ("nxos", "iosxe")
+
+logger = logging.getLogger("pyats_match")
+
+# Per-phase counters and timings, reported at the end of the run
+stats = Counter()
+phase_times = {}
+
+# Function to configure console output (INFO) and the optional sampled trace file (DEBUG)
+def setup_logging(trace_path=None):
+    logger.handlers.clear()
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG if trace_path else logging.INFO)
+
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setLevel(logging.INFO)
+    console_handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(console_handler)
+
+    if trace_path:
+        trace_handler = logging.FileHandler(trace_path, mode='w')
+        trace_handler.setLevel(logging.DEBUG)
+        trace_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+        logger.addHandler(trace_handler)
+
+# Context manager to time a phase of the run
+@contextmanager
+def timed_phase(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        phase_times[name] = phase_times.get(name, 0.0) + time.perf_counter() - start
+
+# Function to log the per-phase timings and counters
+def log_run_stats():
+    logger.info("Tiempos por fase: %s", ", ".join(f"{name}={elapsed:.3f}s" for name, elapsed in phase_times.items()))
+    logger.info("Contadores: %s", ", ".join(f"{name}={count}" for name, count in stats.items()))
+
+# Function to validate file path
+def validate_file_path(file_path):
+    if os.path.isfile(file_path) and (file_path.endswith('.txt') or file_path.endswith('.log')):
+        return file_path
+    else:
+        return None
+
+# Genie is imported lazily, only on a parse cache miss and only the parser modules of the OS in use
+# (it takes seconds to load)
+genie_parsers = {}
+genie_devices = {}
+
+# Function to import the Genie ARP and MAC parsers for one OS family
+def load_genie_parsers(os_type):
+    if os_type not in genie_parsers:
+        with timed_phase("load_genie"):
+            show_arp = importlib.import_module(f"genie.libs.parser.{os_type}.show_arp")
+            show_fdb = importlib.import_module(f"genie.libs.parser.{os_type}.show_fdb")
+        genie_parsers[os_type] = (show_arp, show_fdb)
+    return genie_parsers[os_type]
+
+# Function to create (once per OS family) the virtual Genie device used by the parsers
+def create_device(os_type):
+    if os_type not in genie_devices:
+        with timed_phase("load_genie"):
+            from genie.conf.base import Device
+        device = Device(name='virtual_device', os=os_type)
+        device.custom.setdefault('abstraction', {'order': ['os']})
+        genie_devices[os_type] = device
+    return genie_devices[os_type]
+
+# Function to parse ARP output with pyATS (cached on disk by output hash, see genie_parse_cache.py)
+def parse_arp_output(output, os_type):
+    try:
+        return cached_cli(
+            f"{os_type}.show_arp.ShowIpArp", os_type, output,
+            lambda: load_genie_parsers(os_type)[0].ShowIpArp(device=create_device(os_type))
+        )
+    except Exception as e:
+        print(f"Error al analizar el archivo ARP: {e}")
+        return None
+
+# Function to parse MAC table output with pyATS (cached on disk by output hash, see genie_parse_cache.py)
+def parse_mac_output(output, os_type):
+    try:
+        return cached_cli(
+            f"{os_type}.show_fdb.ShowMacAddressTable", os_type, output,
+            lambda: load_genie_parsers(os_type)[1].ShowMacAddressTable(device=create_device(os_type))
+        )
+    except Exception as e:
+        print(f"Error al analizar el archivo MAC: {e}")
+        return None
+
+# Function to validate available interfaces and check for omitted ones
+def validate_existing_interfaces(available_interfaces):
+    print(f"Interfaces disponibles: {', '.join(available_interfaces)}")
+    while True:
+        omitted_interfaces = input("Ingrese las interfaces a omitir, separadas por comas o presione Enter para omitir: ").split(',')
+        omitted_interfaces = [interface.strip() for interface in omitted_interfaces if interface.strip()]
+        non_existent = [interface for interface in omitted_interfaces if interface not in available_interfaces]
+        
+        if non_existent:
+            print(f"Las siguientes interfaces no existen: {', '.join(non_existent)}.")
+        else:
+            return omitted_interfaces
+
+# Function to add a parsed MAC table to the flattened index MAC -> [(label, vlan, interfaces)].
+# The index is built once per MAC file; omitted interfaces are dropped while indexing.
+def add_mac_table_to_index(mac_index, mac_data, mac_file_label):
+    # Get available interfaces from MAC data
+    available_interfaces = {entry['interface'] for vlan in mac_data['mac_table']['vlans'].values()
+                            for mac in vlan['mac_addresses'].values()
+                            for entry in mac.get('interfaces', {}).values()}
+
+    print(f"Available interfaces in MAC data (Label: {mac_file_label}): {available_interfaces}")
+
+    omitted_interfaces = set(validate_existing_interfaces(available_interfaces))
+
+    for vlan_data in mac_data['mac_table']['vlans'].values():
+        mac_vlan = vlan_data['vlan']
+        for mac_address, mac_entry in vlan_data['mac_addresses'].items():
+            interfaces = tuple(mac_interface for mac_interface in mac_entry.get('interfaces', {})
+                               if mac_interface not in omitted_interfaces)
+            mac_index.setdefault(mac_address, []).append((mac_file_label, mac_vlan, interfaces))
+
+# Function to match ARP data against the MAC index of every labeled MAC file in a single pass.
+# Per-entry detail is only logged for one ARP entry out of every 'trace_sample' (0 disables it).
+def match_mac_arp(arp_data, mac_index, mac_file_labels, trace_sample=0):
+    matches_by_label = {label: [] for label in mac_file_labels}
+    # Labels key the per-file buckets; a repeated label would merge two MAC files into one
+    if len(matches_by_label) != len(mac_file_labels):
+        raise ValueError(f"Duplicate MAC file labels: {', '.join(mac_file_labels)}")
+    total_mac_count = 0
+    matched_mac_count = 0
+    arp_count = 0
+    trace_enabled = trace_sample > 0 and logger.isEnabledFor(logging.DEBUG)
+
+    # Iterate over ARP data (ARP IP-to-MAC entries)
+    for arp_intf_data in arp_data['interfaces'].values():
+        for arp_ip, arp_entry in arp_intf_data['ipv4']['neighbors'].items():
+            arp_mac = arp_entry["link_layer_address"]  # MAC address from ARP table
+            arp_interface = arp_entry["physical_interface"]  # Interface from ARP table (e.g., Vlan491)
+
+            arp_count += 1
+            trace = trace_enabled and arp_count % trace_sample == 0
+            if trace:
+                logger.debug("Processing ARP entry: IP=%s, MAC=%s, Interface=%s", arp_ip, arp_mac, arp_interface)
+
+            is_vlan = arp_interface.startswith("Vlan")
+            is_port_channel = arp_interface.startswith("Port-channel")
+
+            # One lookup per ARP entry instead of walking every VLAN of every MAC file
+            for mac_file_label, mac_vlan, mac_interfaces in mac_index.get(arp_mac, ()):
+                total_mac_count += 1
+                for mac_interface in mac_interfaces:
+                    if trace:
+                        logger.debug("Found MAC %s in VLAN %s with Interface %s (Label: %s)", arp_mac, mac_vlan, mac_interface, mac_file_label)
+
+                    if is_vlan:  # ARP entry interface is VLAN
+                        matched = arp_interface == f"Vlan{mac_vlan}"  # Ensure the VLANs match
+                    elif is_port_channel:  # ARP entry interface is Port-channel
+                        matched = mac_interface == arp_interface  # Match if Port-channel interfaces match
+                    else:
+                        matched = False
+
+                    if matched:
+                        matches_by_label[mac_file_label].append({
+                            "IP": arp_ip,
+                            "MAC": arp_mac,
+                            "VLAN": mac_vlan,
+                            "Interface": mac_interface,
+                            "MAC File Label": mac_file_label
+                        })
+                        matched_mac_count += 1
+                        if trace:
+                            logger.debug("Match found for IP: %s, MAC: %s, VLAN: %s, Interface: %s", arp_ip, arp_mac, mac_vlan, mac_interface)
+
+    stats["arp_entries"] += arp_count
+    stats["mac_candidates"] += total_mac_count
+    stats["matches"] += matched_mac_count
+    logger.info("Total MACs in MAC table: %d, Matched MACs: %d", total_mac_count, matched_mac_count)
+
+    # Keep the matches grouped by MAC file, in the order the files were given
+    matches = [match for label_matches in matches_by_label.values() for match in label_matches]
+    return matches, total_mac_count, matched_mac_count
+
+# Function to save results in CSV and TXT
+def save_results(matches, mac_file_labels, total_mac_count, matched_mac_count):
+    current_date = datetime.now().strftime("%d-%m-%Y")
+    folder_name = f"{current_date}-match"
+    os.makedirs(folder_name, exist_ok=True)
+
+    output_csv_file = input("Ingrese el nombre del archivo CSV (sin extensión): ") + '.csv'
+    output_csv_path = os.path.join(folder_name, output_csv_file)
+    output_txt_path = os.path.join(folder_name, "match_summary.txt")
+
+    # Create a new CSV or append if the file exists
+    file_exists = os.path.isfile(output_csv_path)
+
+    # Save CSV file (append mode if file exists)
+    with open(output_csv_path, 'a', newline='') as csv_file:
+        fieldnames = ["IP","MAC", "VLAN", "Interface", "MAC File Label"]
+        writer = csv.DictWriter(csv_file, fieldnames=fieldnames)
+
+        # Write the header only if the file does not exist
+        if not file_exists:
+            writer.writeheader()
+
+        # Single aggregation pass: write each CSV row and group it by label for the summary
+        matches_by_label = defaultdict(list)
+        matched_macs = set()
+        for match in matches:
+            writer.writerow(match)
+            matches_by_label[match['MAC File Label']].append(match)
+            matched_macs.add(match['MAC'])
+
+    # Save summary to TXT file
+    with open(output_txt_path, 'w') as txt_file:
+        txt_file.write(f"Resumen de coincidencias - {current_date}\n")
+        txt_file.write("=" * 50 + "\n")
+        txt_file.write(f"Total de direcciones MAC en todos los archivos: {total_mac_count}\n")
+        txt_file.write(f"Total de coincidencias en todos los archivos: {matched_mac_count}\n\n")
+
+        # Separate summary by MAC file label
+        for label in mac_file_labels:
+            file_matches = matches_by_label.get(label, [])
+            file_mac_count = len(file_matches)
+            file_matched_count = sum(1 for m in file_matches if m['MAC'] in matched_macs)
+
+            txt_file.write(f"Resumen del archivo MAC con etiqueta: {label}\n")
+            txt_file.write(f"Total de MACs en archivo: {file_mac_count}\n")
+            txt_file.write(f"Total de coincidencias en archivo: {file_matched_count}\n\n")
+            txt_file.writelines(
+                f"IP: {match['IP']},MAC: {match['MAC']}, VLAN: {match['VLAN']}, Interface: {match['Interface']}\n"
+                for match in file_matches
+            )
+
+    print(f"Resultados guardados en {output_csv_path} y {output_txt_path}")
+
+# Main function
+def main(os_type='nxos', trace_sample=0, validate_only=False):
+    phase_times["startup"] = time.perf_counter() - SCRIPT_START
+    print("Bienvenido al programa de coincidencias de MAC y ARP con pyATS.")
+
+    # Ask for ARP file path
+    while True:
+        arp_file_path = input("Nombre del archivo con la salida de ARP en .txt o .log: ").strip()
+        if validate_file_path(arp_file_path):
+            break
+        else:
+            print("El archivo ARP no es válido. Por favor, inténtalo de nuevo.")
+
+    # Prompt for multiple MAC files
+    mac_files = []
+    mac_file_labels = []
+    while True:
+        mac_file_path = input("Nombre del archivo con la salida de MAC en .txt o .log (o escribe 'fin' para terminar): ").strip()
+        if mac_file_path.lower() == 'fin':
+            break
+
+        while True:
+            mac_file_label = input(f"Nombre o etiqueta para este archivo de MAC (se usará en CSV): ").strip()
+            # Matches and summaries are grouped by label, so every MAC file needs its own
+            if mac_file_label in mac_file_labels:
+                print(f"La etiqueta '{mac_file_label}' ya se usó para otro archivo de MAC. Por favor, ingresa una distinta.")
+            elif mac_file_label:
+                break
+            else:
+                print("La etiqueta no puede estar vacía. Por favor, ingresa un nombre o etiqueta.")
+
+        # Validate the MAC file
+        if validate_file_path(mac_file_path):
+            mac_files.append(mac_file_path)
+            mac_file_labels.append(mac_file_label)
+        else:
+            print("El archivo no existe o no tiene extensión válida (.txt o .log). Por favor, inténtalo de nuevo.")
+
+    # Ensure at least one MAC file is available
+    if not mac_files:
+        print("No se proporcionaron archivos MAC válidos. El programa finalizará.")
+        return
+
+    if validate_only:
+        print(f"Archivos válidos: ARP {arp_file_path}, MAC {', '.join(mac_files)}. No se realizó el análisis (--validate-only).")
+        logger.info("Tiempo de arranque: %.3f s", phase_times["startup"])
+        return
+
+    with open(arp_file_path, 'r') as arp_file:
+        arp_output = arp_file.read()
+
+    # Parse the outputs (Genie is imported on the first cache miss, only for 'os_type')
+    with timed_phase("parse_arp"):
+        arp_data = parse_arp_output(arp_output, os_type)
+
+    if not arp_data:
+        print("Error al analizar el archivo ARP.")
+        return
+
+    # Parse every MAC file into a single index
+    mac_index = {}
+    indexed_labels = []
+
+    for mac_file_path, mac_file_label in zip(mac_files, mac_file_labels):
+        with open(mac_file_path, 'r') as mac_file:
+            mac_output = mac_file.read()
+
+        with timed_phase("parse_mac"):
+            mac_data = parse_mac_output(mac_output, os_type)
+        if not mac_data:
+            print(f"Error al analizar el archivo MAC: {mac_file_label}.")
+            continue
+
+        with timed_phase("index"):
+            add_mac_table_to_index(mac_index, mac_data, mac_file_label)
+        indexed_labels.append(mac_file_label)
+
+    # Match the ARP table against all MAC files in one pass
+    with timed_phase("match"):
+        all_matches, total_mac_count, matched_mac_count = match_mac_arp(arp_data, mac_index, indexed_labels, trace_sample)
+
+    # Save the results to CSV and TXT
+    with timed_phase("save"):
+        save_results(all_matches, mac_file_labels, total_mac_count, matched_mac_count)
+
+    log_run_stats()
+
+# Function to build synthetic Genie ARP and MAC structures for the benchmark
+def generate_synthetic_genie_tables(neighbors, vlans=3000, seed=0):
+    rng = random.Random(seed)
+    arp_data = {'interfaces': {}}
+    mac_vlans = {}
+    for i in range(neighbors):
+        vlan = rng.randint(1, vlans)
+        mac = f"0050.{(i >> 16) & 0xffff:04x}.{i & 0xffff:04x}"
+        arp_interface = f"Vlan{vlan}" if i % 10 else f"Port-channel{vlan % 16 + 1}"
+        mac_interface = f"Ethernet1/{rng.randint(1, 48)}" if i % 10 else arp_interface
+        arp_data['interfaces'].setdefault(arp_interface, {'ipv4': {'neighbors': {}}})['ipv4']['neighbors'][f"10.{(i >> 16) & 0xff}.{(i >> 8) & 0xff}.{i & 0xff}"] = {
+            'link_layer_address': mac,
+            'physical_interface': arp_interface,
+        }
+        vlan_data = mac_vlans.setdefault(str(vlan), {'vlan': vlan, 'mac_addresses': {}})
+        vlan_data['mac_addresses'][mac] = {'interfaces': {mac_interface: {'interface': mac_interface}}}
+    return arp_data, {'mac_table': {'vlans': mac_vlans}}
+
+# Function to time the match phase with per-entry detail, with sampled tracing and with the quiet default
+def run_benchmark(neighbors=50_000, trace_path="pyats_match_benchmark_trace.log"):
+    arp_data, mac_data = generate_synthetic_genie_tables(neighbors)
+    mac_index = {}
+    for vlan_data in mac_data['mac_table']['vlans'].values():
+        for mac_address, mac_entry in vlan_data['mac_addresses'].items():
+            mac_index.setdefault(mac_address, []).append(("bench", vlan_data['vlan'], tuple(mac_entry['interfaces'])))
+
+    scenarios = [
+        ("detalle por entrada (stdout)", None, 1),
+        (f"traza muestreada 1/100 ({trace_path})", trace_path, 100),
+        ("silencioso (por defecto)", None, 0),
+    ]
+    results = []
+    for name, path, trace_sample in scenarios:
+        setup_logging(path)
+        if path is None and trace_sample:
+            # Same volume of detail the matcher used to print on every ARP entry
+            logger.setLevel(logging.DEBUG)
+            logger.handlers[0].setLevel(logging.DEBUG)
+        start = time.perf_counter()
+        match_mac_arp(arp_data, mac_index, ["bench"], trace_sample)
+        results.append((name, time.perf_counter() - start))
+
+    setup_logging()
+    logger.info("\nMatch de %d vecinos ARP:", neighbors)
+    for name, elapsed in results:
+        logger.info("  %-60s %8.3f s", name, elapsed)
+
+# Run the main function
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Coincidencias de MAC y ARP con pyATS.")
+    parser.add_argument("--os", dest="os_type", choices=SUPPORTED_OS, default="nxos", help="Sistema operativo de las capturas; solo se cargan los parsers de Genie de ese OS (por defecto: nxos).")
+    parser.add_argument("--validate-only", action="store_true", help="Solo valida los archivos de entrada, sin cargar Genie ni analizar.")
+    parser.add_argument("--trace", metavar="ARCHIVO", help="Escribe el detalle por entrada ARP (muestreado) en este archivo.")
+    parser.add_argument("--trace-sample", type=int, default=100, help="Registra el detalle de 1 de cada N entradas ARP con --trace (por defecto: 100, 1 = todas).")
+    parser.add_argument("--benchmark", action="store_true", help="Mide el match sobre una tabla ARP sintética de 50k vecinos y termina.")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        run_benchmark()
+    else:
+        setup_logging(args.trace)
+        main(args.os_type, args.trace_sample if args.trace else 0, args.validate_only)
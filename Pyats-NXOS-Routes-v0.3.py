@@ -0,0 +1,322 @@
+import time
+
+# Measured before anything else is imported, to report the script's startup time
+SCRIPT_START = time.perf_counter()
+
+import re
+import json
+import hashlib
+import argparse
+import csv
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from genie_parse_cache import cached_cli
+from columnar_output import ColumnarTable, COLUMNAR_FORMATS, load_pyarrow, write_columnar_next_to_csv
+
+UNSAFE_FILE_CHARS = re.compile(r"[^\w.-]")
+# Header that starts each VRF section of 'show ip route vrf all' / 'show ipv6 route vrf all'
+VRF_HEADER = re.compile(r'^\s*IP(?:v6)? Rout(?:e|ing) Table for VRF "([^"]+)"')
+DEFAULT_VRF = "default"
+FIELDNAMES = ["vrf", "address_family", "protocol", "network", "distance", "metric", "next_hop", "time", "interface", "source_protocol_status", "tag"]
+# Column types for the Parquet/Arrow output (see columnar_output.py)
+ROUTE_COLUMNAR_SCHEMA = [
+    ("vrf", "string"), ("address_family", "string"), ("protocol", "string"), ("network", "prefix"), ("distance", "int"), ("metric", "int"),
+    ("next_hop", "ip"), ("time", "string"), ("interface", "string"), ("source_protocol_status", "string"), ("tag", "int")
+]
+
+# Function to validate file path, supporting both .txt and .log extensions
+def validate_file_path(prompt, expected_extensions=None):
+    while True:
+        file_path = input(prompt)
+        if file_path.lower() == 'end':
+            print("Cerrando el programa.")
+            exit()
+        if expected_extensions and not any(file_path.endswith(ext) for ext in expected_extensions):
+            print(f"El archivo debe tener una de las siguientes extensiones: {', '.join(expected_extensions)}.")
+            continue
+        if os.path.isfile(file_path):
+            return file_path
+        else:
+            print("El archivo no existe. Por favor, inténtalo de nuevo.")
+
+# Function to validate and ensure output file has .csv extension
+def validate_output_file_name(prompt):
+    while True:
+        file_name = input(prompt).strip()
+        if file_name.lower() == 'end':
+            print("Cerrando el programa.")
+            exit()
+        if file_name:
+            if not file_name.endswith('.csv'):
+                file_name += '.csv'
+            return file_name
+        else:
+            print("El nombre del archivo no puede estar vacío. Por favor, inténtalo de nuevo.")
+
+# Function to create a folder named with the current date
+def create_date_folder():
+    date_folder = datetime.now().strftime("%d-%m-%Y-routes")
+    try:
+        os.makedirs(date_folder, exist_ok=True)
+        print(f"Directory created: {date_folder}")
+    except Exception as e:
+        print(f"Error creating directory {date_folder}: {e}")
+    return date_folder
+
+# Genie is imported only when a capture is not in the parse cache (it takes seconds to load)
+genie_modules = None
+
+def load_genie():
+    global genie_modules
+    if genie_modules is None:
+        start = time.perf_counter()
+        from genie.conf.base import Device
+        from genie.libs.parser.nxos import show_routing
+        print(f"Genie cargado en {time.perf_counter() - start:.2f} s")
+        genie_modules = (Device, show_routing)
+    return genie_modules
+
+# Function to build a Genie route parser; only called on a parse cache miss
+def make_route_parser(parser_class_name):
+    Device, show_routing = load_genie()
+    device = Device(name='virtual_device', os='iosxe')
+    device.custom.setdefault('abstraction', {'order': ['os']})
+    return getattr(show_routing, parser_class_name)(device=device)
+
+# Function to split a 'show ip route vrf all' capture into one text chunk per VRF, so each VRF
+# can be parsed by Genie in its own worker. A capture without VRF headers is a single 'default' chunk
+def split_route_output_by_vrf(output):
+    chunks = defaultdict(list)
+    current = None
+    for line in output.splitlines(keepends=True):
+        match = VRF_HEADER.match(line)
+        if match:
+            current = chunks[match.group(1)]
+        if current is not None:
+            current.append(line)
+    if not chunks:
+        return {DEFAULT_VRF: output}
+    return {vrf: "".join(lines) for vrf, lines in chunks.items()}
+
+# Function to parse one VRF chunk with Genie (result cached on disk, see genie_parse_cache.py);
+# the 'show ipv6 route' chunk of the same VRF, if any, is merged into its address families.
+# Chunks without any route line are not parsed (Genie rejects empty output)
+def parse_vrf_routes(vrf, ip_chunk, ipv6_chunk=None):
+    vrf_data = {}
+    for parser_class_name, chunk in (("ShowIpRoute", ip_chunk), ("ShowIpv6Route", ipv6_chunk)):
+        if not chunk or "ubest/mbest" not in chunk:
+            continue
+        parsed = cached_cli(
+            f"nxos.show_routing.{parser_class_name}", 'iosxe', chunk, lambda: make_route_parser(parser_class_name)
+        )
+        parsed_vrf = parsed.get("vrf", {}).get(vrf, {})
+        vrf_data.setdefault("address_family", {}).update(parsed_vrf.get("address_family", {}))
+    return vrf_data
+
+# Function to walk one VRF once, yielding one CSV row per next hop for every address family
+def iter_vrf_rows(vrf, vrf_data):
+    for af, af_data in vrf_data.get("address_family", {}).items():
+        for route, route_info in af_data.get("routes", {}).items():
+            protocol = route_info.get("source_protocol", "n/a").upper()
+            network = route_info.get("route", "n/a")
+            distance = route_info.get("route_preference", "n/a")
+            metric = route_info.get("metric", "n/a")
+            tag = route_info.get("tag", "n/a") if protocol == "OSPF" else "n/a"
+
+            next_hop_info = route_info.get("next_hop", {}).get("next_hop_list", {})
+            for hop_index, hop_details in next_hop_info.items():
+                yield {
+                    "vrf": vrf,
+                    "address_family": af,
+                    "protocol": protocol,
+                    "network": network,
+                    "distance": distance,
+                    "metric": metric,
+                    "next_hop": hop_details.get("next_hop", "n/a"),
+                    "time": hop_details.get("updated", "n/a"),
+                    "interface": hop_details.get("outgoing_interface", "n/a"),
+                    "source_protocol_status": hop_details.get("source_protocol_status", "n/a") if protocol == "OSPF" else "n/a",
+                    "tag": tag
+                }
+
+# Function to build the per-VRF CSV paths from the output name (VRF names may contain '/' or ':').
+# Names that clean up to the same file (e.g. 'a/b', 'a:b' and 'a_b') get a short hash of the raw
+# name appended, so parallel workers never write to the same file
+def vrf_csv_paths(csv_file_path, vrfs):
+    base, ext = os.path.splitext(csv_file_path)
+    safe_names = {vrf: UNSAFE_FILE_CHARS.sub('_', vrf) for vrf in vrfs}
+    safe_name_counts = defaultdict(int)
+    for safe_name in safe_names.values():
+        safe_name_counts[safe_name] += 1
+
+    vrf_file_paths = {}
+    for vrf, safe_name in safe_names.items():
+        if safe_name_counts[safe_name] > 1 and safe_name != vrf:
+            safe_name = f"{safe_name}-{hashlib.sha1(vrf.encode()).hexdigest()[:8]}"
+        vrf_file_paths[vrf] = f"{base}-{safe_name}{ext}"
+    return vrf_file_paths
+
+# Function run by each worker: parses one VRF, writes its CSV and returns its next-hop counts per
+# address family. Only the VRF's text goes to the worker; the Genie tree comes back only with --dump-json
+def process_vrf(vrf, ip_chunk, ipv6_chunk, vrf_file_path, columnar_format=None, dump_json=False):
+    try:
+        vrf_data = parse_vrf_routes(vrf, ip_chunk, ipv6_chunk)
+    except Exception as e:
+        return vrf, vrf_file_path, None, f"Error parsing show ip route output: {e}", None
+
+    next_hop_counts = defaultdict(lambda: defaultdict(int))
+    table = ColumnarTable(ROUTE_COLUMNAR_SCHEMA) if columnar_format else None
+    try:
+        with open(vrf_file_path, mode='w', newline='') as csv_file:
+            csv_writer = csv.DictWriter(csv_file, fieldnames=FIELDNAMES)
+            csv_writer.writeheader()
+
+            for row in iter_vrf_rows(vrf, vrf_data):
+                csv_writer.writerow(row)
+                if table is not None:
+                    table.append(row)
+                if row["network"] and row["next_hop"]:
+                    next_hop_counts[row["address_family"]][row["next_hop"]] += 1
+    except Exception as e:
+        return vrf, vrf_file_path, None, f"Error converting VRF {vrf} to CSV: {e}", None
+
+    # The Parquet/Arrow file is optional: if it fails the VRF keeps its CSV and its counts
+    if table is not None:
+        write_columnar_next_to_csv(table, vrf_file_path, columnar_format)
+    counts = {af: dict(af_counts) for af, af_counts in next_hop_counts.items()}
+    return vrf, vrf_file_path, counts, None, vrf_data if dump_json else None
+
+# Function to shard the VRFs across a process pool; results come back in VRF order
+def iter_vrf_results(ip_chunks, ipv6_chunks, vrf_file_paths, workers, columnar_format=None, dump_json=False):
+    vrfs = list(vrf_file_paths)
+    tasks = (vrfs, [ip_chunks.get(vrf) for vrf in vrfs], [ipv6_chunks.get(vrf) for vrf in vrfs], [vrf_file_paths[vrf] for vrf in vrfs])
+    if workers <= 1 or len(vrfs) <= 1:
+        for task in zip(*tasks):
+            yield process_vrf(*task, columnar_format, dump_json)
+        return
+
+    workers = min(workers, len(vrfs))
+    chunksize = max(1, len(vrfs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(
+            process_vrf, *tasks, [columnar_format] * len(vrfs), [dump_json] * len(vrfs), chunksize=chunksize
+        )
+
+# Function to parse and write every VRF and gather their counts for the merged summary;
+# with --dump-json the Genie trees of all VRFs are saved together in parsed_output.json
+def convert_routes_to_csv(ip_chunks, ipv6_chunks, csv_file_path, vrf_file_paths, date_folder, workers=1, columnar_format=None, dump_json=False):
+    if columnar_format:
+        # Fail early in the parent instead of once per VRF in the workers
+        try:
+            load_pyarrow()
+        except ImportError as e:
+            print(f"No se pudo guardar la salida {columnar_format}: {e}")
+            columnar_format = None
+
+    next_hop_counts = {}
+    parsed_output = {"vrf": {}}
+    for vrf, vrf_file_path, vrf_counts, error, vrf_data in iter_vrf_results(ip_chunks, ipv6_chunks, vrf_file_paths, workers, columnar_format, dump_json):
+        if error:
+            print(error)
+            continue
+        next_hop_counts[vrf] = vrf_counts
+        if vrf_data is not None:
+            parsed_output["vrf"][vrf] = vrf_data
+    print(f"CSV files created for {len(next_hop_counts)} VRF(s) next to: {csv_file_path}")
+
+    if dump_json:
+        with open(os.path.join(date_folder, 'parsed_output.json'), 'w') as json_file:
+            json.dump(parsed_output, json_file, indent=4)
+        print(f"Parsed JSON saved to parsed_output.json in {date_folder}")
+    return next_hop_counts
+
+# Function to write the merged summary: totals for the whole device, then each VRF and address family
+def generate_report(next_hop_counts, csv_file_path, vrf_file_paths):
+    try:
+        report_file_path = f"{os.path.splitext(csv_file_path)[0]}-report.txt"
+        af_totals = defaultdict(int)
+        for vrf_counts in next_hop_counts.values():
+            for af, af_counts in vrf_counts.items():
+                af_totals[af] += sum(af_counts.values())
+
+        with open(report_file_path, 'w') as report_file:
+            report_file.write(f"Total de VRFs: {len(next_hop_counts)}\n")
+            for af, total in af_totals.items():
+                report_file.write(f"Total de redes {af}: {total}\n")
+
+            for vrf, vrf_counts in next_hop_counts.items():
+                for af, af_counts in vrf_counts.items():
+                    report_file.write(f"\nVRF: {vrf} ({af})\n")
+                    report_file.write(f"Archivo CSV: {os.path.basename(vrf_file_paths[vrf])}\n")
+                    report_file.write(f"Total de redes: {sum(af_counts.values())}\n")
+                    report_file.write(f"Total de next-hops únicos: {len(af_counts)}\n\n")
+                    report_file.write("Redes aprendidas por cada next-hop:\n")
+
+                    for next_hop, count in af_counts.items():
+                        report_file.write(f"  Next-hop {next_hop}: {count} redes\n")
+
+        print(f"El archivo de reporte se ha guardado en {report_file_path}")
+    except Exception as e:
+        print(f"Error generating report: {e}")
+
+# Main function
+def main(validate_only=False, dump_json=False, workers=1, ipv6_file_path=None, columnar_format=None):
+    print(f"Tiempo de arranque: {time.perf_counter() - SCRIPT_START:.3f} s")
+
+    # The optional IPv6 capture comes from --ipv6, so it is checked before any prompt
+    if ipv6_file_path and not (os.path.isfile(ipv6_file_path) and ipv6_file_path.endswith((".txt", ".log"))):
+        print(f"El archivo IPv6 {ipv6_file_path} no existe o no tiene extensión válida (.txt o .log).")
+        return
+
+    # Step 1: Get the input file path and output CSV file name
+    show_ip_route_file_path = validate_file_path(
+        "Introduce el archivo de salida de show ip route (por ejemplo, show_ip_route_output.txt or. log, si quiere cerrar el programa introduce 'end'): ",
+        [".txt", ".log"]
+    )
+    if validate_only:
+        valid_files = f"{show_ip_route_file_path}, IPv6 {ipv6_file_path}" if ipv6_file_path else show_ip_route_file_path
+        print(f"Archivos válidos: {valid_files}. No se realizó el análisis (--validate-only).")
+        return
+
+    csv_file_name = validate_output_file_name("Introduce el nombre del archivo CSV de salida (por ejemplo, output.csv): ")
+
+    # Step 2: Create date-based folder
+    date_folder = create_date_folder()
+    csv_file_path = os.path.join(date_folder, csv_file_name)
+
+    # Step 3: Read the content from the show_ip_route file (and the optional show ipv6 route file)
+    with open(show_ip_route_file_path, 'r') as file:
+        show_ip_route_output = file.read()
+    show_ipv6_route_output = None
+    if ipv6_file_path:
+        with open(ipv6_file_path, 'r') as file:
+            show_ipv6_route_output = file.read()
+
+    # Step 4: Split the captures per VRF; each VRF is parsed with Genie and written in the worker pool
+    ip_chunks = split_route_output_by_vrf(show_ip_route_output)
+    ipv6_chunks = split_route_output_by_vrf(show_ipv6_route_output) if show_ipv6_route_output else {}
+    vrf_file_paths = vrf_csv_paths(csv_file_path, dict.fromkeys([*ip_chunks, *ipv6_chunks]))
+
+    # Step 5: Parse each VRF and convert it to its own CSV, counting next hops in the same pass
+    start = time.perf_counter()
+    next_hop_counts = convert_routes_to_csv(
+        ip_chunks, ipv6_chunks, csv_file_path, vrf_file_paths, date_folder, workers, columnar_format, dump_json
+    )
+    print(f"VRFs procesadas en {time.perf_counter() - start:.2f} s con {workers} proceso(s)")
+
+    # Step 6: Generate the merged summary
+    if next_hop_counts:
+        generate_report(next_hop_counts, csv_file_path, vrf_file_paths)
+
+# Run the main function
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convierte la salida de 'show ip route' (NXOS) a un CSV por VRF con Genie.")
+    parser.add_argument("--validate-only", action="store_true", help="Solo valida los archivos de entrada (incluido --ipv6), sin cargar Genie ni analizar.")
+    parser.add_argument("--dump-json", action="store_true", help="Guarda también el árbol completo de Genie en parsed_output.json.")
+    parser.add_argument("--ipv6", help="Salida de 'show ipv6 route vrf all' para incluir también las tablas IPv6.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Procesos para repartir las VRFs (por defecto: número de CPUs).")
+    parser.add_argument("--columnar", choices=COLUMNAR_FORMATS, help="Guarda también cada VRF en Parquet o Arrow (requiere pyarrow).")
+    args = parser.parse_args()
+    main(args.validate_only, args.dump_json, args.workers, args.ipv6, args.columnar)
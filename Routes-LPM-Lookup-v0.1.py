@@ -0,0 +1,198 @@
+import os
+import re
+import sys
+import json
+import time
+import random
+import socket
+import argparse
+import tempfile
+from datetime import datetime
+from functools import partial
+from nxos_route_parser import parse_route_file
+from route_table import RouteTable, RangeIndex, Route, RoutePath, route_table_from_genie, generate_synthetic_prefixes
+
+# Longest-prefix match en bloque sobre una captura de rutas.
+# Acepta la salida de 'show ip route' de NX-OS en txt, el routes.json de NXOS-CLI-Routes-to-csv
+# o el parsed_output.json de los scripts Pyats-*-Routes. La tabla se aplana en rangos
+# disjuntos (RangeIndex) y cada IP se resuelve con un acceso a la tabla directa de /24
+# (bisect solo si el /24 está partido por prefijos más largos); la conversión de las IPs, la
+# búsqueda y la escritura del CSV se hacen con map sobre funciones en C, sin un bucle de
+# Python por dirección.
+
+LOOKUP_FIELDNAMES = ["ip", "prefix", "next_hops", "interfaces", "administrative_distance", "metric", "protocol"]
+NO_ROUTE = "sin ruta"
+CSV_SPECIAL_CHARS = re.compile(r'[,"\r\n]')
+
+def validate_file_path(prompt, expected_extension=None):
+    while True:
+        file_path = input(prompt)
+        if expected_extension and not file_path.endswith(expected_extension):
+            print(f"El archivo debe tener la extensión {expected_extension}.")
+            continue
+        if os.path.isfile(file_path):
+            return file_path
+        else:
+            print("El archivo no existe. Por favor, inténtalo de nuevo.")
+
+# Función para cargar la tabla de rutas desde una captura NX-OS (txt o routes.json) o de pyATS (parsed_output.json)
+def load_route_table(route_file_path, vrf="default"):
+    if not route_file_path.endswith(".json"):
+        return RouteTable.from_nxos_routes(parse_route_file(route_file_path))
+
+    with open(route_file_path, 'r') as json_file:
+        parsed = json.load(json_file)
+    if "vrf" in parsed:
+        if vrf not in parsed["vrf"]:
+            raise ValueError(f"La VRF '{vrf}' no está en la captura (VRFs: {', '.join(parsed['vrf'])})")
+        return route_table_from_genie(parsed, vrf)
+    return RouteTable.from_nxos_routes(parsed)
+
+# Función para leer el archivo de IPs destino (una por línea)
+def read_destination_ips(ip_file_path):
+    with open(ip_file_path, 'r') as ip_file:
+        return parse_destination_ips([ip for ip in map(str.strip, ip_file) if ip])
+
+# Función para convertir las IPs a enteros; devuelve las IPs válidas, sus enteros y las descartadas
+def parse_destination_ips(ips):
+    to_int = partial(int.from_bytes, byteorder="big")
+    pton = partial(socket.inet_pton, socket.AF_INET)
+    try:
+        return ips, list(map(to_int, map(pton, ips))), []
+    except OSError:
+        pass
+
+    # Hay líneas inválidas: se separan una por una solo en este caso
+    valid, addresses, invalid = [], [], []
+    for ip in ips:
+        try:
+            addresses.append(to_int(pton(ip)))
+        except OSError:
+            invalid.append(ip)
+            continue
+        valid.append(ip)
+    return valid, addresses, invalid
+
+# Función para escapar un campo como lo haría csv.writer (solo si lleva separadores o comillas)
+def csv_field(value):
+    value = str(value)
+    if CSV_SPECIAL_CHARS.search(value):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+# Función para formatear una vez las columnas de una ruta (desde prefix) como texto CSV
+def format_route_columns(route):
+    if route is None:
+        return NO_ROUTE + ",,,,,"
+    paths = route.paths
+    first = paths[0] if paths else RoutePath(None)
+    return ",".join(map(csv_field, (
+        route.prefix,
+        ";".join(path.next_hop or "N/A" for path in paths),
+        ";".join(path.interface or "N/A" for path in paths),
+        "N/A" if first.administrative_distance is None else first.administrative_distance,
+        "N/A" if first.metric is None else first.metric,
+        first.protocol or "N/A",
+    )))
+
+# Caché de columnas por ruta: cada ruta se formatea la primera vez que alguna IP cae en ella
+class RouteColumns(dict):
+    def __missing__(self, route):
+        columns = self[route] = format_route_columns(route)
+        return columns
+
+# Función para resolver las IPs y escribir el CSV; devuelve (IPs con ruta, segundos de búsqueda)
+def write_lookup_csv(index, ips, addresses, csv_path):
+    start = time.perf_counter()
+    owners = index.lookup_many(addresses)
+    lookup_time = time.perf_counter() - start
+
+    columns = RouteColumns()
+    with open(csv_path, 'w', newline='') as csv_file:
+        csv_file.write(",".join(LOOKUP_FIELDNAMES) + "\r\n")
+        csv_file.writelines(map("{},{}\r\n".format, ips, map(columns.__getitem__, owners)))
+
+    return len(owners) - owners.count(None), lookup_time
+
+def run_lookup(route_file_path, ip_file_path, csv_path, vrf="default"):
+    start = time.perf_counter()
+    table = load_route_table(route_file_path, vrf)
+    index = RangeIndex(table)
+    print(f"Tabla cargada: {len(table)} rutas, {len(index)} rangos ({time.perf_counter() - start:.2f} s)")
+
+    ips, addresses, invalid = read_destination_ips(ip_file_path)
+    if invalid:
+        print(f"Se descartaron {len(invalid)} líneas que no son IPv4 válidas (ejemplo: {invalid[0]})")
+
+    start = time.perf_counter()
+    matched, lookup_time = write_lookup_csv(index, ips, addresses, csv_path)
+    total_time = time.perf_counter() - start
+    rate = len(ips) / lookup_time if lookup_time else float("inf")
+    print(f"{len(ips)} IPs resueltas ({matched} con ruta) en {lookup_time:.2f} s de búsqueda, {rate:,.0f} búsquedas/s")
+    print(f"El archivo CSV del lookup se ha guardado en {csv_path} ({total_time:.2f} s con la escritura)")
+
+# Función para medir búsquedas/s sobre una tabla y un lote de IPs sintéticos
+def run_benchmark(route_count=1_000_000, lookups=2_000_000):
+    prefixes = generate_synthetic_prefixes(route_count)
+    table = RouteTable(4)
+    table.add_many([Route(network, length, 4, 1, 0, [RoutePath("192.168.0.1", "Eth1/1", 20, 0, None, "bgp-65000")])
+                    for network, length in prefixes])
+    start = time.perf_counter()
+    index = RangeIndex(table)
+    print(f"Tabla de {len(table)} rutas aplanada en {len(index)} rangos en {time.perf_counter() - start:.2f} s")
+
+    rng = random.Random(1)
+    addresses = [rng.getrandbits(32) for _ in range(lookups)]
+    ips = list(map(socket.inet_ntoa, map(partial(int.to_bytes, length=4, byteorder="big"), addresses)))
+
+    start = time.perf_counter()
+    _, converted, _ = parse_destination_ips(ips)
+    parse_time = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        start = time.perf_counter()
+        matched, lookup_time = write_lookup_csv(index, ips, converted, os.path.join(tmp_dir, "lookup.csv"))
+        write_time = time.perf_counter() - start
+
+    print(f"{lookups} IPs ({matched} con ruta):")
+    print(f"  conversión de IPs  {parse_time:6.2f} s  {lookups / parse_time:>12,.0f} IPs/s")
+    print(f"  búsqueda LPM       {lookup_time:6.2f} s  {lookups / lookup_time:>12,.0f} búsquedas/s")
+    print(f"  búsqueda + CSV     {write_time:6.2f} s  {lookups / write_time:>12,.0f} IPs/s")
+
+    # Verificación contra el LPM del trie sobre una muestra
+    sample = addresses[:20_000]
+    if index.lookup_many(sample) != [table.lookup(address) for address in sample]:
+        print("ERROR: el índice de rangos no coincide con el trie")
+        return 1
+    print("Índice de rangos verificado contra el trie en una muestra de 20000 direcciones.")
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Longest-prefix match en bloque sobre una captura de rutas NX-OS o pyATS.")
+    parser.add_argument("--routes", help="Captura de rutas: 'show ip route' en txt, routes.json o parsed_output.json de pyATS.")
+    parser.add_argument("--ips", help="Archivo con una IP destino por línea.")
+    parser.add_argument("--vrf", default="default", help="VRF a usar de una captura de pyATS (por defecto: default).")
+    parser.add_argument("--output", help="CSV de salida (por defecto: <fecha>-lookup/lookup.csv).")
+    parser.add_argument("--benchmark", action="store_true", help="Mide búsquedas/s con una tabla sintética de 1M de rutas.")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        sys.exit(run_benchmark())
+
+    route_file_path = args.routes or validate_file_path("Nombre del archivo con las RUTAS (txt o json): ")
+    ip_file_path = args.ips or validate_file_path("Nombre del archivo con las IPs destino (una por línea): ")
+
+    csv_path = args.output
+    if not csv_path:
+        date_folder = datetime.now().strftime("%d-%m-%Y-lookup")
+        os.makedirs(date_folder, exist_ok=True)
+        csv_path = os.path.join(date_folder, "lookup.csv")
+
+    try:
+        run_lookup(route_file_path, ip_file_path, csv_path, args.vrf)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import os
+import socket
+
+# Salida columnar opcional (Parquet o Arrow IPC) junto a los CSV de rutas, match y diferencias.
+# Las cadenas se guardan como columnas con diccionario (cada valor distinto una sola vez),
+# las IPs y prefijos como enteros y las MACs como enteros de 48 bits, así que los archivos
+# ocupan una fracción del CSV y se cargan sin volver a parsear texto.
+# pyarrow es opcional: se importa solo cuando se pide esta salida (pip install pyarrow).
+
+COLUMNAR_FORMATS = ("parquet", "arrow")
+COLUMNAR_EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrow"}
+NULL_VALUES = frozenset(("", "n/a", "N/A"))
+
+# Tipos de columna:
+#   "string"  cadena con diccionario
+#   "int"     entero (int64)
+#   "ip"      dirección IP: uint32 si todas son IPv4, binario de 16 bytes si hay IPv6 (IPv4 como ::ffff:a.b.c.d)
+#   "prefix"  prefijo IP: la red como en "ip" más una columna <nombre>_length (uint8)
+#   "mac"     MAC como uint64 (48 bits), acepta xxxx.xxxx.xxxx, xx:xx:xx:xx:xx:xx y xx-xx-xx-xx-xx-xx
+COLUMN_KINDS = ("string", "int", "ip", "prefix", "mac")
+
+_pyarrow = None
+
+# Función para importar pyarrow solo cuando se va a escribir un archivo columnar
+def load_pyarrow():
+    global _pyarrow
+    if _pyarrow is None:
+        try:
+            import pyarrow
+            import pyarrow.ipc
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("La salida Parquet/Arrow requiere pyarrow (pip install pyarrow).") from None
+        _pyarrow = pyarrow
+    return _pyarrow
+
+# Función para obtener la ruta del archivo columnar a partir de la del CSV
+def columnar_path(csv_file_path, columnar_format):
+    return os.path.splitext(csv_file_path)[0] + COLUMNAR_EXTENSIONS[columnar_format]
+
+def is_null(value):
+    return value is None or (isinstance(value, str) and value.strip() in NULL_VALUES)
+
+# Función para convertir una IP en texto a (entero, es_ipv6)
+def encode_ip(value):
+    text = str(value).strip()
+    if ':' in text:
+        return int.from_bytes(socket.inet_pton(socket.AF_INET6, text), "big"), True
+    return int.from_bytes(socket.inet_pton(socket.AF_INET, text), "big"), False
+
+# Función para convertir una MAC en texto a entero
+def encode_mac(value):
+    digits = str(value).strip().replace('.', '').replace(':', '').replace('-', '')
+    if len(digits) != 12:
+        raise ValueError(f"MAC inválida: {value}")
+    return int(digits, 16)
+
+# Tabla columnar en memoria: se le agregan filas (dicts como los de csv.DictWriter) y se escribe al final
+class ColumnarTable:
+    def __init__(self, schema):
+        for name, kind in schema:
+            if kind not in COLUMN_KINDS:
+                raise ValueError(f"Tipo de columna desconocido para {name}: {kind}")
+        self.schema = list(schema)
+        self.columns = {name: [] for name, _ in self.schema}
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()), ()))
+
+    def append(self, row):
+        for name, values in self.columns.items():
+            values.append(row.get(name))
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    # Función para convertir las columnas acumuladas en una tabla de pyarrow
+    def to_arrow(self):
+        pa = load_pyarrow()
+        arrays = []
+        names = []
+        for name, kind in self.schema:
+            values = self.columns[name]
+            if kind == "string":
+                arrays.append(pa.array([None if value is None else str(value) for value in values], pa.string()).dictionary_encode())
+                names.append(name)
+            elif kind == "int":
+                arrays.append(pa.array([None if is_null(value) else int(value) for value in values], pa.int64()))
+                names.append(name)
+            elif kind == "mac":
+                arrays.append(pa.array([None if is_null(value) else encode_mac(value) for value in values], pa.uint64()))
+                names.append(name)
+            elif kind == "ip":
+                arrays.append(ip_array(pa, values))
+                names.append(name)
+            else:
+                addresses, lengths = [], []
+                for value in values:
+                    if is_null(value):
+                        addresses.append(None)
+                        lengths.append(None)
+                        continue
+                    address, _, length = str(value).partition('/')
+                    addresses.append(address)
+                    lengths.append(int(length) if length else None)
+                arrays.append(ip_array(pa, addresses))
+                arrays.append(pa.array(lengths, pa.uint8()))
+                names.extend((name, f"{name}_length"))
+        return pa.Table.from_arrays(arrays, names=names)
+
+    # Función para escribir la tabla en Parquet (zstd) o Arrow IPC
+    def write(self, path, columnar_format):
+        pa = load_pyarrow()
+        table = self.to_arrow()
+        if columnar_format == "parquet":
+            pa.parquet.write_table(table, path, compression="zstd")
+        elif columnar_format == "arrow":
+            with pa.ipc.new_file(path, table.schema) as writer:
+                writer.write_table(table)
+        else:
+            raise ValueError(f"Formato columnar desconocido: {columnar_format}")
+        return path
+
+# Función para codificar una columna de IPs: uint32 si todas son IPv4, 16 bytes si hay alguna IPv6
+def ip_array(pa, values):
+    encoded = [None if is_null(value) else encode_ip(value) for value in values]
+    if not any(item and item[1] for item in encoded):
+        return pa.array([item and item[0] for item in encoded], pa.uint32())
+    return pa.array(
+        [None if item is None else (item[0] if item[1] else 0xffff00000000 | item[0]).to_bytes(16, "big") for item in encoded],
+        pa.binary(16)
+    )
+
+# Función para escribir la salida columnar junto al CSV; informa y no corta el script si falla
+def write_columnar_next_to_csv(table, csv_file_path, columnar_format):
+    try:
+        path = table.write(columnar_path(csv_file_path, columnar_format), columnar_format)
+    except (ImportError, ValueError, OSError) as e:
+        print(f"No se pudo guardar la salida {columnar_format}: {e}")
+        return None
+    print(f"El archivo {columnar_format} se ha guardado en {path}")
+    return path
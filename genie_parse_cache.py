@@ -0,0 +1,143 @@
+import os
+import time
+import zlib
+import pickle
+import hashlib
+
+# Caché en disco de los resultados de los parsers de Genie.
+# La clave es el SHA-256 de la salida cruda + el nombre del parser ("nxos.show_arp.ShowIpArp") +
+# el tipo de OS. Como la clave no necesita la clase del parser, Genie se importa y el Device se
+# crea solo cuando hay que parsear, así que volver a correr un script sobre las mismas capturas
+# no carga Genie.
+#
+# Variables de entorno:
+#   GENIE_PARSE_CACHE=off          desactiva la caché
+#   GENIE_PARSE_CACHE_DIR=<ruta>   carpeta de la caché (por defecto ~/.cache/scripts-linux/genie)
+#   GENIE_PARSE_CACHE_MAX_MB=<n>   tamaño máximo antes de expulsar las entradas menos usadas (por defecto 512)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "scripts-linux", "genie")
+DEFAULT_MAX_MB = 512
+CACHE_FORMAT_VERSION = b"1"
+ENTRY_SUFFIX = ".pkl.z"
+
+class GenieParseCache:
+    def __init__(self, cache_dir=None, max_bytes=None):
+        self.cache_dir = cache_dir or os.environ.get("GENIE_PARSE_CACHE_DIR", DEFAULT_CACHE_DIR)
+        if max_bytes is None:
+            max_bytes = int(float(os.environ.get("GENIE_PARSE_CACHE_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    # Función para calcular la clave de una salida cruda para un parser y OS concretos;
+    # parser_name es la ruta del parser bajo genie.libs.parser, p. ej. "nxos.show_arp.ShowIpArp"
+    @staticmethod
+    def make_key(output, parser_name, os_type):
+        digest = hashlib.sha256()
+        digest.update(CACHE_FORMAT_VERSION)
+        digest.update(f"{parser_name}\0{os_type}\0".encode())
+        digest.update(output.encode("utf-8", "surrogateescape"))
+        return digest.hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key + ENTRY_SUFFIX)
+
+    # Función para leer una entrada; marca el acceso (mtime) para la expulsión LRU
+    def get(self, key):
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, "rb") as entry_file:
+                parsed = pickle.loads(zlib.decompress(entry_file.read()))
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, zlib.error, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            # Entrada corrupta o de otra versión: se descarta y se vuelve a parsear
+            self._remove(entry_path)
+            self.misses += 1
+            return None
+
+        now = time.time()
+        try:
+            os.utime(entry_path, (now, now))
+        except OSError:
+            pass
+        self.hits += 1
+        return parsed
+
+    # Función para guardar una entrada de forma atómica y aplicar el límite de tamaño
+    def put(self, key, parsed):
+        entry_path = self._entry_path(key)
+        tmp_path = f"{entry_path}.{os.getpid()}.tmp"
+        data = zlib.compress(pickle.dumps(parsed, protocol=pickle.HIGHEST_PROTOCOL), 6)
+        try:
+            with open(tmp_path, "wb") as entry_file:
+                entry_file.write(data)
+            os.replace(tmp_path, entry_path)
+        except OSError as e:
+            print(f"No se pudo guardar en la caché de Genie: {e}")
+            self._remove(tmp_path)
+            return
+        self.evict()
+
+    # Función para expulsar las entradas menos usadas hasta quedar bajo el tamaño máximo
+    def evict(self):
+        entries = []
+        total_bytes = 0
+        with os.scandir(self.cache_dir) as scan:
+            for entry in scan:
+                if not entry.name.endswith(ENTRY_SUFFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total_bytes += stat.st_size
+
+        if total_bytes <= self.max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total_bytes <= self.max_bytes:
+                break
+            self._remove(path)
+            total_bytes -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+_default_cache = None
+
+# Función para obtener la caché por defecto (None si está desactivada)
+def get_default_cache():
+    global _default_cache
+    if os.environ.get("GENIE_PARSE_CACHE", "on").lower() in ("0", "off", "no", "false"):
+        return None
+    if _default_cache is None:
+        try:
+            _default_cache = GenieParseCache()
+        except OSError as e:
+            print(f"Caché de Genie desactivada: {e}")
+            return None
+    return _default_cache
+
+# Función que reemplaza a parser_class(device=device).cli(output=output) usando la caché.
+# make_parser() debe devolver la instancia del parser; solo se llama si la salida no está en la
+# caché, así que es ahí donde se importa Genie y se crea el Device.
+def cached_cli(parser_name, os_type, output, make_parser, cache=None):
+    cache = cache or get_default_cache()
+    if cache is None:
+        return make_parser().cli(output=output)
+
+    key = cache.make_key(output, parser_name, os_type)
+    parsed = cache.get(key)
+    if parsed is None:
+        parsed = make_parser().cli(output=output)
+        cache.put(key, parsed)
+    return parsed
@@ -0,0 +1,260 @@
+import sys
+import time
+import random
+import argparse
+from graph_paths import INFINITY, CSRGraph, shortest_path_counts, generate_synthetic_graph
+from graph_failures import DynamicGraph, DynamicTree
+
+# Comparación de caminos más cortos entre snapshots de topología (as-is / to-be).
+# De cada snapshot se calculan, para todos los pares, el costo mínimo, los brincos y la cantidad
+# de caminos de ese costo (ECMP). Al pasar de un snapshot al siguiente los árboles del anterior
+# se actualizan con las aristas que cambiaron: si ninguna arista quitada o encarecida estaba en
+# sus caminos mínimos y ninguna agregada o abaratada los iguala o mejora, el árbol queda igual;
+# si no, solo se recalculan los nodos afectados.
+
+PAIR_CHEAPER = "mas-barato"
+PAIR_COSTLIER = "mas-caro"
+PAIR_LOST = "sin-camino"
+PAIR_NEW = "camino-nuevo"
+PAIR_LESS_REDUNDANT = "menos-redundancia"
+PAIR_MORE_REDUNDANT = "mas-redundancia"
+
+PAIR_CHANGE_KINDS = (PAIR_CHEAPER, PAIR_COSTLIER, PAIR_LOST, PAIR_NEW, PAIR_LESS_REDUNDANT, PAIR_MORE_REDUNDANT)
+PAIR_CHANGE_FIELDNAMES = [
+    "Origen", "Destino", "Cambio", "Costo antes", "Costo después",
+    "Brincos antes", "Brincos después", "Caminos mínimos antes", "Caminos mínimos después"
+]
+TOLERANCE = 1e-9
+
+# Caminos más cortos de todos los pares de un snapshot.
+#   rows[origen] = (distancias, brincos, caminos) por id del grafo
+#   reused[origen] = True si el árbol quedó igual que en el snapshot anterior
+class SnapshotPaths:
+    __slots__ = ("graph", "rows", "reused")
+
+    def __init__(self, graph, rows, reused):
+        self.graph = graph
+        self.rows = rows
+        self.reused = reused
+
+    def reused_count(self):
+        return sum(self.reused)
+
+# Función para obtener las aristas de un grafo por nombre: {(origen, destino): [pesos]}.
+# Las aristas paralelas se conservan todas: cada una es un camino más para el conteo de ECMP.
+def edge_weights_by_name(graph):
+    names = graph.names
+    edges = {}
+    for node in range(len(graph)):
+        for dest, weight in graph.neighbors(node):
+            edges.setdefault((names[node], names[dest]), []).append(weight)
+    return edges
+
+# Función para emparejar una a una las aristas paralelas de un mismo (origen, destino) entre dos
+# snapshots: primero las de igual peso (no cambian) y las que sobran por posición. Devuelve
+# [(peso antes, peso después)], con infinito del lado donde la arista no existe.
+def pair_parallel_edges(weights_before, weights_after):
+    unmatched_after = list(weights_after)
+    pairs = []
+    unmatched_before = []
+    for weight in weights_before:
+        if weight in unmatched_after:
+            unmatched_after.remove(weight)
+            pairs.append((weight, weight))
+        else:
+            unmatched_before.append(weight)
+    extra = len(unmatched_after) - len(unmatched_before)
+    unmatched_before += [INFINITY] * extra
+    unmatched_after += [INFINITY] * -extra
+    pairs.extend(zip(unmatched_before, unmatched_after))
+    return pairs
+
+# Función para armar el grafo unión de dos snapshots con los pesos del anterior (infinito en las
+# aristas que solo están en el nuevo) y la lista [(arista, peso nuevo)] que lleva al snapshot nuevo.
+# Cada arista paralela es una arista propia del grafo unión, así el cambio se aplica arista por arista.
+# Los nodos del anterior conservan sus ids y los nuevos van al final.
+def union_graph(graph_before, graph_after):
+    before = edge_weights_by_name(graph_before)
+    after = edge_weights_by_name(graph_after)
+    names = list(graph_before.names) + [name for name in graph_after.names if name not in graph_before.ids]
+    adjacency = {name: [] for name in names}
+    new_weights_by_node = {name: [] for name in names}
+    for (u, v), weights_before in before.items():
+        for weight_before, weight_after in pair_parallel_edges(weights_before, after.get((u, v), ())):
+            adjacency[u].append((v, weight_before))
+            new_weights_by_node[u].append(weight_after)
+    for (u, v), weights_after in after.items():
+        if (u, v) not in before:
+            for weight_after in weights_after:
+                adjacency[u].append((v, INFINITY))
+                new_weights_by_node[u].append(weight_after)
+    union = CSRGraph.from_adjacency(adjacency)
+    # from_adjacency guarda las aristas en el orden de la adyacencia, así que los pesos nuevos van en el mismo orden
+    new_weights = list(enumerate(weight for name in names for weight in new_weights_by_node[name]))
+    return union, new_weights
+
+# Función para calcular los caminos de todos los pares de un snapshot. Si se pasa el snapshot
+# anterior, sus árboles se pasan al nuevo con el motor dinámico (graph_failures): los que no tocan
+# las aristas cambiadas quedan igual y en el resto solo se repara la parte que colgaba de ellas.
+def compute_snapshot_paths(graph, previous=None):
+    if previous is None:
+        rows = [shortest_path_counts(graph, source, TOLERANCE) for source in range(len(graph))]
+        return SnapshotPaths(graph, rows, [False] * len(graph))
+
+    union, new_weights = union_graph(previous.graph, graph)
+    extra = len(union) - len(previous.graph)
+    dynamic = DynamicGraph(union, sources=())
+    for source, (distances, hops, counts) in enumerate(previous.rows):
+        # Copias: la reparación modifica las listas y el snapshot anterior se sigue usando en la comparación
+        dynamic.trees[source] = DynamicTree(
+            dynamic, source, (distances + [INFINITY] * extra, hops + [-1] * extra, counts + [0] * extra)
+        )
+    changed = dynamic.change_edges(new_weights)
+    dynamic.commit()
+
+    # Para cada id del grafo nuevo, su id en el grafo unión
+    in_union = [union.ids[name] for name in graph.names]
+    same_ids = len(union) == len(graph) and in_union == list(range(len(graph)))
+    rows = []
+    reused = []
+    for source, union_source in enumerate(in_union):
+        tree = dynamic.trees.get(union_source)
+        if tree is None:
+            rows.append(shortest_path_counts(graph, source, TOLERANCE))
+            reused.append(False)
+            continue
+        if same_ids:
+            rows.append((tree.distances, tree.hops, tree.counts))
+        else:
+            rows.append((
+                [tree.distances[node] for node in in_union],
+                [tree.hops[node] for node in in_union],
+                [tree.counts[node] for node in in_union],
+            ))
+        reused.append(union_source not in changed)
+    return SnapshotPaths(graph, rows, reused)
+
+# Función para clasificar el cambio de un par; devuelve la lista de tipos (vacía si no cambió)
+def classify_pair(cost_before, count_before, cost_after, count_after):
+    if cost_before == INFINITY and cost_after == INFINITY:
+        return []
+    if cost_after == INFINITY:
+        return [PAIR_LOST]
+    if cost_before == INFINITY:
+        return [PAIR_NEW]
+    kinds = []
+    if cost_after < cost_before - TOLERANCE:
+        kinds.append(PAIR_CHEAPER)
+    elif cost_after > cost_before + TOLERANCE:
+        kinds.append(PAIR_COSTLIER)
+    if count_after < count_before:
+        kinds.append(PAIR_LESS_REDUNDANT)
+    elif count_after > count_before:
+        kinds.append(PAIR_MORE_REDUNDANT)
+    return kinds
+
+def format_cost(cost):
+    return "N/A" if cost == INFINITY else cost
+
+# Función para comparar dos snapshots; devuelve las filas (PAIR_CHANGE_FIELDNAMES) de los pares que
+# cambiaron. Los orígenes con el árbol sin cambios y los mismos nodos no pueden cambiar y se saltan.
+def diff_snapshot_paths(before, after):
+    names_before, names_after = before.graph.names, after.graph.names
+    ids_before, ids_after = before.graph.ids, after.graph.ids
+    same_nodes = names_before == names_after
+    sites = list(names_before) + [name for name in names_after if name not in ids_before]
+    empty = ([INFINITY] * len(sites), [-1] * len(sites), [0] * len(sites))
+    # Posición de cada sitio en los arrays de cada snapshot (-1 si no existe en ese snapshot)
+    in_before = [ids_before.get(name, -1) for name in sites]
+    in_after = [ids_after.get(name, -1) for name in sites]
+
+    changes = []
+    for source_name in sites:
+        source_after = ids_after.get(source_name)
+        if same_nodes and after.reused[source_after]:
+            continue
+        source_before = ids_before.get(source_name)
+        distances_before, hops_before, counts_before = empty if source_before is None else before.rows[source_before]
+        distances_after, hops_after, counts_after = empty if source_after is None else after.rows[source_after]
+        for target_name, node_before, node_after in zip(sites, in_before, in_after):
+            if target_name == source_name:
+                continue
+            cost_before = distances_before[node_before] if node_before >= 0 else INFINITY
+            cost_after = distances_after[node_after] if node_after >= 0 else INFINITY
+            count_before = counts_before[node_before] if node_before >= 0 else 0
+            count_after = counts_after[node_after] if node_after >= 0 else 0
+            kinds = classify_pair(cost_before, count_before, cost_after, count_after)
+            if not kinds:
+                continue
+            changes.append([
+                source_name, target_name, ";".join(kinds),
+                format_cost(cost_before), format_cost(cost_after),
+                hops_before[node_before] if node_before >= 0 and cost_before != INFINITY else "N/A",
+                hops_after[node_after] if node_after >= 0 and cost_after != INFINITY else "N/A",
+                count_before, count_after
+            ])
+    return changes
+
+# Función para contar los pares por tipo de cambio (un par puede sumar en dos tipos)
+def summarize_pair_changes(changes):
+    counts = dict.fromkeys(PAIR_CHANGE_KINDS, 0)
+    for change in changes:
+        for kind in change[2].split(";"):
+            counts[kind] += 1
+    return counts
+
+# Función para cambiar algunas aristas de un grafo de adyacencia (ambos sentidos, como los graph-*.json)
+def perturb_adjacency(adjacency, changes, seed=0):
+    rng = random.Random(seed)
+    adjacency = {node: list(neighbors) for node, neighbors in adjacency.items()}
+    nodes = list(adjacency)
+    for _ in range(changes):
+        node = rng.choice(nodes)
+        dest, weight = rng.choice(adjacency[node])
+        new_weight = float(rng.randint(1, 20)) if rng.random() < 0.7 else None
+        for a, b in ((node, dest), (dest, node)):
+            adjacency[a] = [(n, w) for n, w in adjacency[a] if n != b]
+            if new_weight is not None:
+                adjacency[a].append((b, new_weight))
+    return adjacency
+
+# Función para medir la actualización de árboles contra recalcular todo el snapshot
+def run_benchmark(side=30, edge_changes=3):
+    adjacency = generate_synthetic_graph(side)
+    before = CSRGraph.from_adjacency(adjacency)
+    after = CSRGraph.from_adjacency(perturb_adjacency(adjacency, edge_changes))
+
+    start = time.perf_counter()
+    paths_before = compute_snapshot_paths(before)
+    full_time = time.perf_counter() - start
+    print(f"Malla de {len(before)} nodos, todos los pares: {full_time:.2f} s")
+
+    start = time.perf_counter()
+    paths_after = compute_snapshot_paths(after, paths_before)
+    incremental_time = time.perf_counter() - start
+    print(f"Snapshot con {edge_changes} enlaces cambiados: {incremental_time:.2f} s "
+          f"({paths_after.reused_count()} de {len(after)} árboles sin cambios, el resto reparado)")
+
+    start = time.perf_counter()
+    changes = diff_snapshot_paths(paths_before, paths_after)
+    print(f"Comparación: {len(changes)} pares con cambios en {time.perf_counter() - start:.2f} s")
+    for kind, count in summarize_pair_changes(changes).items():
+        print(f"  {kind:<18} {count}")
+
+    # Los árboles actualizados deben ser idénticos a recalcularlos
+    full_after = compute_snapshot_paths(after)
+    if full_after.rows != paths_after.rows:
+        print("ERROR: los árboles actualizados no coinciden con el cálculo completo")
+        return 1
+    if diff_snapshot_paths(paths_before, full_after) != changes:
+        print("ERROR: la comparación incremental no coincide con la completa")
+        return 1
+    print("Los árboles actualizados coinciden con el cálculo completo.")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de la comparación incremental de snapshots de topología.")
+    parser.add_argument("--side", type=int, default=30, help="Lado de la malla sintética (por defecto: 30, 900 nodos).")
+    parser.add_argument("--changes", type=int, default=3, help="Enlaces a modificar entre snapshots (por defecto: 3).")
+    args = parser.parse_args()
+    sys.exit(run_benchmark(args.side, args.changes))
@@ -0,0 +1,492 @@
+import os
+import sys
+import csv
+import json
+import time
+import heapq
+import random
+import hashlib
+import argparse
+from array import array
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from graph_paths import INFINITY, CSRGraph, shortest_path_counts, generate_synthetic_graph
+
+# Caminos más cortos dinámicos y barrido de fallas N-1 / N-2.
+# DynamicGraph guarda una copia de los pesos del grafo CSR y un árbol (DynamicTree) por origen.
+# Cambiar un peso, quitar un enlace (peso infinito) o quitar un nodo (todas sus aristas en
+# infinito) solo repara los árboles cuyos caminos mínimos tocan las aristas cambiadas, y dentro
+# de cada árbol solo los nodos que colgaban de ellas o que ahora se mejoran; cada cambio deja un
+# registro para deshacerlo (rollback), así que un barrido aplica y deshace una falla a la vez
+# sin volver a calcular nada desde cero.
+
+FAILURE_DISCONNECTED = "sin-conexion"
+FAILURE_OVER_THRESHOLD = "supera-umbral"
+FAILURE_FIELDNAMES = ["Falla", "Tipo", "Origen", "Destino", "Cambio", "Costo antes", "Costo después"]
+SCENARIO_SUMMARY_FIELDNAMES = ["Falla", "Tipo", "Pares sin conexión", "Pares sobre el umbral"]
+TOLERANCE = 1e-9
+
+# Árbol de caminos más cortos de un origen sobre los pesos actuales de un DynamicGraph:
+# distancias, brincos y cantidad de caminos mínimos por id, más el registro para deshacer
+class DynamicTree:
+    __slots__ = ("owner", "source", "distances", "hops", "counts", "undo")
+
+    # rows: (distancias, brincos, caminos) ya calculados con los pesos actuales, si se tienen
+    def __init__(self, owner, source, rows=None):
+        self.owner = owner
+        self.source = source
+        self.distances, self.hops, self.counts = rows if rows is not None else shortest_path_counts(owner.graph, source, TOLERANCE)
+        self.undo = []
+
+    # Función para saber si una arista (u -> v con el peso dado) está en algún camino mínimo del árbol
+    def on_shortest_path(self, u, v, weight):
+        du = self.distances[u]
+        return du != INFINITY and du + weight <= self.distances[v] + TOLERANCE
+
+    # Función para reparar el árbol tras cambios [(arista, peso anterior, peso nuevo)] ya aplicados
+    # a owner.weights. Devuelve {nodo: (distancia, brincos, caminos) anteriores} de los nodos que cambiaron;
+    # cada llamada deja una entrada en undo, aunque no cambie nada.
+    def update(self, changes):
+        owner = self.owner
+        targets, offsets = owner.graph.targets, owner.graph.offsets
+        in_offsets, in_sources, in_edges = owner.in_offsets, owner.in_sources, owner.in_edges
+        weights, tails = owner.weights, owner.tails
+        distances, hops, counts = self.distances, self.hops, self.counts
+        previous = {}
+        self.undo.append(previous)
+
+        # Aristas quitadas o encarecidas que estaban en algún camino mínimo, y aristas abaratadas
+        # que igualan o mejoran alguno
+        old_weights = {}
+        invalid = set()
+        better = []
+        for edge, old_weight, new_weight in changes:
+            old_weights[edge] = old_weight
+            u, v = tails[edge], targets[edge]
+            if new_weight > old_weight:
+                if self.on_shortest_path(u, v, old_weight):
+                    invalid.add(v)
+            elif self.on_shortest_path(u, v, new_weight):
+                better.append(edge)
+        if not invalid and not better:
+            return {}
+
+        # Todo lo que colgaba de las aristas perdidas (con los pesos anteriores) se invalida
+        pending = list(invalid)
+        while pending:
+            node = pending.pop()
+            distance = distances[node]
+            for edge in range(offsets[node], offsets[node + 1]):
+                dest = targets[edge]
+                if dest not in invalid and abs(distance + old_weights.get(edge, weights[edge]) - distances[dest]) <= TOLERANCE:
+                    invalid.add(dest)
+                    pending.append(dest)
+        for node in invalid:
+            previous[node] = (distances[node], hops[node], counts[node])
+            distances[node], hops[node], counts[node] = INFINITY, -1, 0
+
+        # Dijkstra limitado a la zona afectada, sembrado con las aristas abaratadas y con la mejor
+        # entrada de cada nodo invalidado desde fuera de la zona
+        queue = [(distances[tails[edge]] + weights[edge], targets[edge]) for edge in better]
+        for node in invalid:
+            best = min((distances[in_sources[i]] + weights[in_edges[i]] for i in range(in_offsets[node], in_offsets[node + 1])),
+                       default=INFINITY)
+            if best != INFINITY:
+                queue.append((best, node))
+        heapq.heapify(queue)
+
+        # Cada nodo se recalcula desde sus aristas de entrada al salir de la cola: con pesos
+        # positivos sus predecesores ya son definitivos
+        finished = set()
+        while queue:
+            _, node = heapq.heappop(queue)
+            if node in finished:
+                continue
+            finished.add(node)
+            best, best_hops, best_count = INFINITY, -1, 0
+            for i in range(in_offsets[node], in_offsets[node + 1]):
+                parent = in_sources[i]
+                cost = distances[parent] + weights[in_edges[i]]
+                if cost < best - TOLERANCE:
+                    best, best_hops, best_count = cost, hops[parent] + 1, counts[parent]
+                elif cost <= best + TOLERANCE and cost != INFINITY:
+                    best_count += counts[parent]
+                    best_hops = min(best_hops, hops[parent] + 1)
+            if (best, best_hops, best_count) == (distances[node], hops[node], counts[node]):
+                continue
+            if node not in previous:
+                previous[node] = (distances[node], hops[node], counts[node])
+            distances[node], hops[node], counts[node] = best, best_hops, best_count
+            if best == INFINITY:
+                continue
+            for edge in range(offsets[node], offsets[node + 1]):
+                dest = targets[edge]
+                cost = best + weights[edge]
+                if dest not in finished and cost <= distances[dest] + TOLERANCE:
+                    heapq.heappush(queue, (cost, dest))
+
+        return {node: values for node, values in previous.items() if values != (distances[node], hops[node], counts[node])}
+
+    # Función para deshacer la última reparación
+    def rollback(self):
+        for node, values in self.undo.pop().items():
+            self.distances[node], self.hops[node], self.counts[node] = values
+
+# Grafo CSR con pesos modificables y los árboles de los orígenes que se estén siguiendo
+class DynamicGraph:
+    __slots__ = ("graph", "weights", "tails", "in_offsets", "in_sources", "in_edges", "trees", "undo")
+
+    def __init__(self, graph, sources=None):
+        self.graph = graph
+        self.weights = array('d', graph.weights)
+        self.tails = graph.edge_sources()
+        self.in_offsets, self.in_sources, self.in_edges = graph.incoming_edges()
+        self.trees = {source: DynamicTree(self, source) for source in (range(len(graph)) if sources is None else sources)}
+        self.undo = []
+
+    # Función para obtener las aristas u -> v (puede haber varias en paralelo)
+    def find_edges(self, u, v):
+        targets = self.graph.targets
+        return [edge for edge in range(self.graph.offsets[u], self.graph.offsets[u + 1]) if targets[edge] == v]
+
+    # Función para aplicar cambios [(arista, peso nuevo)] y reparar los árboles afectados.
+    # Devuelve {origen: {nodo: valores anteriores}} de los árboles que cambiaron.
+    def change_edges(self, new_weights):
+        changes = []
+        for edge, weight in new_weights:
+            if self.weights[edge] != weight:
+                changes.append((edge, self.weights[edge], weight))
+                self.weights[edge] = weight
+        self.undo.append(changes)
+        changed = {}
+        for source, tree in self.trees.items():
+            tree_changes = tree.update(changes)
+            if tree_changes:
+                changed[source] = tree_changes
+        return changed
+
+    def set_edge_weight(self, u, v, weight):
+        return self.change_edges([(edge, float(weight)) for edge in self.find_edges(u, v)])
+
+    # Función para quitar un enlace en ambos sentidos (como están los graph-*.json)
+    def remove_link(self, u, v):
+        return self.change_edges([(edge, INFINITY) for edge in self.find_edges(u, v) + self.find_edges(v, u)])
+
+    # Función para quitar un nodo: todas sus aristas de entrada y de salida
+    def remove_node(self, node):
+        edges = list(range(self.graph.offsets[node], self.graph.offsets[node + 1]))
+        edges += [self.in_edges[i] for i in range(self.in_offsets[node], self.in_offsets[node + 1])]
+        return self.change_edges([(edge, INFINITY) for edge in edges])
+
+    # Función para dejar definitivos los cambios aplicados (descarta los registros para deshacer)
+    def commit(self):
+        self.undo.clear()
+        for tree in self.trees.values():
+            tree.undo.clear()
+
+    # Función para deshacer el último change_edges (pesos y árboles)
+    def rollback(self):
+        for edge, old_weight, _ in self.undo.pop():
+            self.weights[edge] = old_weight
+        for tree in self.trees.values():
+            tree.rollback()
+
+# Función para listar las fallas de enlace: un enlace por par de nodos conectados (en ambos sentidos)
+def link_failures(graph):
+    links = []
+    seen = set()
+    for node in range(len(graph)):
+        for dest, _ in graph.neighbors(node):
+            key = (min(node, dest), max(node, dest))
+            if key not in seen:
+                seen.add(key)
+                links.append(("enlace", key[0], key[1]))
+    return links
+
+def node_failures(graph):
+    return [("nodo", node, None) for node in range(len(graph))]
+
+def failure_label(graph, failure):
+    kind, a, b = failure
+    return f"{graph.names[a]}-{graph.names[b]}" if kind == "enlace" else graph.names[a]
+
+# Función para aplicar una falla; devuelve {origen: {nodo: valores anteriores}}
+def apply_failure(dynamic, failure):
+    kind, a, b = failure
+    return dynamic.remove_link(a, b) if kind == "enlace" else dynamic.remove_node(a)
+
+# Función para armar las filas (FAILURE_FIELDNAMES) de un escenario ya aplicado: los pares que quedan
+# sin conexión o pasan a superar el umbral de costo. changes son los resultados de aplicar cada falla,
+# en orden; los pares que incluyen a un nodo caído no se reportan.
+def scenario_rows(dynamic, failures, changes, threshold=None):
+    names = dynamic.graph.names
+    label = " + ".join(failure_label(dynamic.graph, failure) for failure in failures)
+    kind = "+".join(failure[0] for failure in failures)
+    failed_nodes = {failure[1] for failure in failures if failure[0] == "nodo"}
+
+    # Distancia antes del escenario: la primera anterior registrada de cada par
+    baseline = {}
+    for changed in changes:
+        for source, nodes in changed.items():
+            before = baseline.setdefault(source, {})
+            for node, (old_distance, _, _) in nodes.items():
+                before.setdefault(node, old_distance)
+
+    rows = []
+    for source, nodes in baseline.items():
+        if source in failed_nodes:
+            continue
+        distances = dynamic.trees[source].distances
+        for node, old_distance in nodes.items():
+            if node in failed_nodes or node == source or old_distance == INFINITY:
+                continue
+            new_distance = distances[node]
+            if new_distance == INFINITY:
+                rows.append([label, kind, names[source], names[node], FAILURE_DISCONNECTED, old_distance, "N/A"])
+            elif threshold is not None and new_distance > threshold >= old_distance:
+                rows.append([label, kind, names[source], names[node], FAILURE_OVER_THRESHOLD, old_distance, new_distance])
+    rows.sort(key=lambda row: (row[2], row[3]))
+    return rows
+
+# Función para evaluar una falla: la aplica, arma sus filas y la deshace
+def evaluate_failure(dynamic, failure, threshold=None):
+    rows = scenario_rows(dynamic, [failure], [apply_failure(dynamic, failure)], threshold)
+    dynamic.rollback()
+    return rows
+
+# Un nodo caído ya incluye la caída de sus enlaces: esos pares N-2 repetirían la falla N-1 del nodo
+def failures_compatible(first, second):
+    for node_failure, other in ((first, second), (second, first)):
+        if node_failure[0] == "nodo" and other[0] == "enlace" and node_failure[1] in other[1:]:
+            return False
+    return first != second
+
+# Grafo CSR en memoria compartida: offsets, targets y weights se copian una sola vez a bloques
+# SharedMemory y los procesos del barrido los leen desde ahí sin recibir una copia del grafo
+class SharedGraph:
+    __slots__ = ("names", "blocks", "spec")
+
+    def __init__(self, graph):
+        self.names = graph.names
+        self.blocks = []
+        self.spec = []
+        for values in (graph.offsets, graph.targets, graph.weights):
+            data = memoryview(values).cast('B')
+            block = shared_memory.SharedMemory(create=True, size=max(1, len(data)))
+            block.buf[:len(data)] = data
+            self.blocks.append(block)
+            self.spec.append((block.name, values.typecode, len(values)))
+
+    def close(self):
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+# Función para abrir desde un proceso del barrido el grafo de un SharedGraph; devuelve (grafo, bloques).
+# Los bloques se deben mantener referenciados mientras se use el grafo.
+def attach_shared_graph(names, spec):
+    blocks = []
+    arrays = []
+    for block_name, typecode, length in spec:
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        arrays.append(block.buf[:length * array(typecode).itemsize].cast(typecode))
+    return CSRGraph(names, *arrays), blocks
+
+# Estado de cada proceso del barrido: (DynamicGraph, fallas, profundidad, umbral, bloques compartidos)
+_scenario_state = None
+
+def _init_scenario_worker(names, spec, failures, depth, threshold):
+    global _scenario_state
+    graph, blocks = attach_shared_graph(names, spec)
+    _scenario_state = (DynamicGraph(graph), failures, depth, threshold, blocks)
+
+# Función que evalúa una tarea del barrido: la falla first sola (N-1) o combinada con cada falla
+# posterior (N-2), aplicando first una sola vez. Devuelve (first, escenarios evaluados, filas por escenario afectado).
+def run_scenario_task(first):
+    dynamic, failures, depth, threshold, _ = _scenario_state
+    first_failure = failures[first]
+    first_changes = apply_failure(dynamic, first_failure)
+    evaluated = 0
+    results = []
+    if depth == 1:
+        evaluated = 1
+        rows = scenario_rows(dynamic, [first_failure], [first_changes], threshold)
+        if rows:
+            results.append(rows)
+    else:
+        for second in range(first + 1, len(failures)):
+            second_failure = failures[second]
+            if not failures_compatible(first_failure, second_failure):
+                continue
+            evaluated += 1
+            rows = scenario_rows(dynamic, [first_failure, second_failure], [first_changes, apply_failure(dynamic, second_failure)], threshold)
+            dynamic.rollback()
+            if rows:
+                results.append(rows)
+    dynamic.rollback()
+    return first, evaluated, results
+
+# Función para identificar una corrida (grafo, profundidad y umbral) y no reanudar con otros parámetros
+def scenario_fingerprint(graph, depth, threshold):
+    digest = hashlib.sha256("\n".join(graph.names).encode())
+    for values in (graph.offsets, graph.targets, graph.weights):
+        digest.update(memoryview(values).cast('B'))
+    return {"graph": digest.hexdigest(), "depth": depth, "threshold": threshold}
+
+def scenario_output_paths(csv_path):
+    base = os.path.splitext(csv_path)[0]
+    return base + "-resumen.csv", base + ".progress"
+
+# Función para abrir las salidas del barrido. Con resume lee el progreso (una línea por tarea con el
+# largo de los dos CSV al terminarla), recorta lo que haya quedado a medias y devuelve las tareas hechas.
+def open_scenario_outputs(csv_path, fingerprint, resume):
+    summary_path, progress_path = scenario_output_paths(csv_path)
+    completed = set()
+    if resume and os.path.isfile(progress_path):
+        with open(progress_path, 'r') as progress_file:
+            lines = progress_file.read().split("\n")
+        # La última línea solo cuenta si terminó de escribirse (split deja "" después del último salto).
+        # Sin ninguna línea de avance la corrida se cortó antes de empezar y se arranca de nuevo.
+        entries = [line.split() for line in lines[1:-1]]
+        if entries:
+            try:
+                same_run = json.loads(lines[0]) == fingerprint
+            except ValueError:
+                same_run = False
+            if not same_run:
+                raise ValueError(f"{progress_path} corresponde a otro grafo, profundidad o umbral; corre sin --resume para empezar de nuevo")
+            for path in (csv_path, summary_path):
+                if not os.path.isfile(path):
+                    raise ValueError(f"No se puede retomar el barrido: falta {path}; corre sin --resume para empezar de nuevo")
+
+            completed = {int(task) for task, _, _ in entries if int(task) >= 0}
+            csv_size, summary_size = int(entries[-1][1]), int(entries[-1][2])
+            for path, size in ((csv_path, csv_size), (summary_path, summary_size)):
+                with open(path, 'r+b') as output:
+                    output.truncate(size)
+            csv_file = open(csv_path, 'a', newline='')
+            summary_file = open(summary_path, 'a', newline='')
+            progress_file = open(progress_path, 'a')
+            # Si la última línea quedó cortada se descarta con un salto de línea
+            if lines[-1]:
+                progress_file.write("\n")
+            return completed, csv_file, summary_file, progress_file
+
+    csv_file = open(csv_path, 'w', newline='')
+    summary_file = open(summary_path, 'w', newline='')
+    csv.writer(csv_file).writerow(FAILURE_FIELDNAMES)
+    csv.writer(summary_file).writerow(SCENARIO_SUMMARY_FIELDNAMES)
+    csv_file.flush()
+    summary_file.flush()
+    # La huella y la primera línea de avance van en una sola escritura
+    progress_file = open(progress_path, 'w')
+    progress_file.write(f"{json.dumps(fingerprint)}\n-1 {csv_file.tell()} {summary_file.tell()}\n")
+    progress_file.flush()
+    return completed, csv_file, summary_file, progress_file
+
+# Función para correr el barrido de fallas N-1 (depth=1) o N-2 (depth=2) sobre todos los enlaces y nodos.
+# Las filas de cada escenario se escriben en csv_path apenas termina su tarea, con un resumen por
+# escenario afectado en <csv>-resumen.csv y el avance en <csv>.progress para poder reanudar (resume=True).
+# Con workers > 1 las tareas se reparten entre procesos que leen el grafo desde memoria compartida.
+# Devuelve (tareas, tareas ya hechas antes, escenarios evaluados, escenarios afectados) de esta corrida.
+def run_scenarios(graph, csv_path, depth=1, threshold=None, workers=1, resume=False):
+    global _scenario_state
+    failures = link_failures(graph) + node_failures(graph)
+    completed, csv_file, summary_file, progress_file = open_scenario_outputs(
+        csv_path, scenario_fingerprint(graph, depth, threshold), resume
+    )
+    pending = [task for task in range(len(failures)) if task not in completed]
+    writer = csv.writer(csv_file)
+    summary_writer = csv.writer(summary_file)
+    evaluated = affected = 0
+    shared = executor = None
+    try:
+        if workers <= 1:
+            _scenario_state = (DynamicGraph(graph), failures, depth, threshold, ())
+            results = map(run_scenario_task, pending)
+        else:
+            shared = SharedGraph(graph)
+            executor = ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_scenario_worker,
+                initargs=(shared.names, shared.spec, failures, depth, threshold)
+            )
+            results = (future.result() for future in as_completed([executor.submit(run_scenario_task, task) for task in pending]))
+
+        for task, task_evaluated, task_results in results:
+            for rows in task_results:
+                writer.writerows(rows)
+                disconnected = sum(1 for row in rows if row[4] == FAILURE_DISCONNECTED)
+                summary_writer.writerow([rows[0][0], rows[0][1], disconnected, len(rows) - disconnected])
+            csv_file.flush()
+            summary_file.flush()
+            progress_file.write(f"{task} {csv_file.tell()} {summary_file.tell()}\n")
+            progress_file.flush()
+            evaluated += task_evaluated
+            affected += len(task_results)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        if shared is not None:
+            shared.close()
+        _scenario_state = None
+        csv_file.close()
+        summary_file.close()
+        progress_file.close()
+    return len(failures), len(completed), evaluated, affected
+
+# Función con la misma evaluación recalculando todos los árboles desde cero, solo para el benchmark
+def evaluate_failure_from_scratch(graph, baseline, failure, threshold=None):
+    dynamic = DynamicGraph(graph, sources=())
+    apply_failure(dynamic, failure)
+    failed_graph = CSRGraph(graph.names, graph.offsets, graph.targets, dynamic.weights, graph.ids)
+    label = failure_label(graph, failure)
+    failed_node = failure[1] if failure[0] == "nodo" else None
+    rows = []
+    for source in range(len(graph)):
+        if source == failed_node:
+            continue
+        distances = shortest_path_counts(failed_graph, source, TOLERANCE)[0]
+        for node, (old_distance, new_distance) in enumerate(zip(baseline[source], distances)):
+            if node == failed_node or node == source or old_distance == INFINITY:
+                continue
+            if new_distance == INFINITY:
+                rows.append([label, failure[0], graph.names[source], graph.names[node], FAILURE_DISCONNECTED, old_distance, "N/A"])
+            elif threshold is not None and new_distance > threshold >= old_distance:
+                rows.append([label, failure[0], graph.names[source], graph.names[node], FAILURE_OVER_THRESHOLD, old_distance, new_distance])
+    rows.sort(key=lambda row: (row[2], row[3]))
+    return rows
+
+# Función para medir el barrido N-1 incremental contra recalcular todos los árboles en cada falla
+def run_benchmark(side=15, threshold=150.0, sample=40):
+    graph = CSRGraph.from_adjacency(generate_synthetic_graph(side))
+    failures = link_failures(graph) + node_failures(graph)
+
+    start = time.perf_counter()
+    dynamic = DynamicGraph(graph)
+    results = [evaluate_failure(dynamic, failure, threshold) for failure in failures]
+    sweep_time = time.perf_counter() - start
+    print(f"Malla de {len(graph)} nodos: barrido N-1 de {len(failures)} fallas en {sweep_time:.2f} s "
+          f"({sum(map(len, results))} pares reportados)")
+
+    baseline = [tree.distances[:] for tree in dynamic.trees.values()]
+    picked = random.Random(0).sample(range(len(failures)), min(sample, len(failures)))
+    start = time.perf_counter()
+    full_results = [evaluate_failure_from_scratch(graph, baseline, failures[i], threshold) for i in picked]
+    full_time = time.perf_counter() - start
+    print(f"Recalculando desde cero: {full_time / len(picked):.3f} s por falla, "
+          f"{full_time / len(picked) * len(failures):.1f} s estimados para el barrido completo")
+
+    if any(results[i] != rows for i, rows in zip(picked, full_results)):
+        print("ERROR: el barrido incremental no coincide con el recálculo completo")
+        return 1
+    print(f"El barrido incremental coincide con el recálculo completo en {len(picked)} fallas.")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del barrido de fallas N-1 con caminos dinámicos.")
+    parser.add_argument("--side", type=int, default=15, help="Lado de la malla sintética (por defecto: 15, 225 nodos).")
+    parser.add_argument("--threshold", type=float, default=150.0, help="Umbral de costo (por defecto: 150).")
+    args = parser.parse_args()
+    sys.exit(run_benchmark(args.side, args.threshold))
@@ -0,0 +1,483 @@
+import sys
+import json
+import time
+import tracemalloc
+import heapq
+import random
+import argparse
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate, repeat
+
+# Motor de k caminos más cortos sin ciclos (algoritmo de Yen) sobre un grafo dirigido.
+# El grafo se carga en formato CSR (CSRGraph): los nombres de nodo se convierten una sola vez
+# a enteros y las aristas quedan en tres arrays (offsets, targets, weights), así que los
+# recorridos trabajan con índices enteros y no vuelven a hashear nombres.
+# Las distancias al destino se calculan una sola vez con Dijkstra sobre el grafo invertido
+# (árbol de caminos más cortos hacia el destino) y se reutilizan como heurística A* en cada
+# búsqueda de desvío: quitar nodos o aristas solo alarga los caminos, así que la cota sigue
+# siendo válida. Los caminos aceptados se indexan por prefijo para saber qué aristas bloquear
+# en cada desvío, y cada camino solo se desvía desde el punto donde se separó de su padre
+# (mejora de Lawler), así que no se repiten búsquedas.
+
+INFINITY = float("inf")
+BENCHMARK_GRAPHS = ("graph-as-is-2023.json", "graph-as-is-2024.json", "graph-to-be-2024.json")
+
+# Grafo dirigido en formato CSR. Los nodos son enteros 0..n-1 (names[i] es el nombre del nodo i);
+# las aristas del nodo i son targets[offsets[i]:offsets[i + 1]] con sus pesos en weights.
+class CSRGraph:
+    __slots__ = ("names", "ids", "offsets", "targets", "weights", "reverse_cache")
+
+    def __init__(self, names, offsets, targets, weights, ids=None):
+        self.names = names
+        self.ids = ids if ids is not None else {name: node for node, name in enumerate(names)}
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.reverse_cache = None
+
+    # Función para construir el grafo desde {nodo: [(vecino, peso), ...]}; los nodos que solo
+    # aparecen como destino quedan al final, sin aristas de salida
+    @classmethod
+    def from_adjacency(cls, adjacency):
+        ids = {name: node for node, name in enumerate(adjacency)}
+        names = list(adjacency)
+        offsets = array('q', [0])
+        targets = array('i')
+        weights = array('d')
+        for neighbors in adjacency.values():
+            for dest, weight in neighbors:
+                node = ids.get(dest)
+                if node is None:
+                    node = ids[dest] = len(names)
+                    names.append(dest)
+                targets.append(node)
+                weights.append(float(weight))
+            offsets.append(len(targets))
+        offsets.extend(repeat(len(targets), len(names) + 1 - len(offsets)))
+        return cls(names, offsets, targets, weights, ids)
+
+    def __len__(self):
+        return len(self.names)
+
+    def edge_count(self):
+        return len(self.targets)
+
+    # Función para obtener las aristas de salida de un nodo como pares (vecino, peso)
+    def neighbors(self, node):
+        lo, hi = self.offsets[node], self.offsets[node + 1]
+        return zip(self.targets[lo:hi], self.weights[lo:hi])
+
+    # Función para obtener el peso de la arista u -> v (el menor si hay varias); None si no existe
+    def edge_weight(self, u, v):
+        lo, hi = self.offsets[u], self.offsets[u + 1]
+        found = [weight for dest, weight in zip(self.targets[lo:hi], self.weights[lo:hi]) if dest == v]
+        return min(found) if found else None
+
+    # Función para invertir las aristas del grafo (mismos ids de nodo); se calcula una sola vez
+    def reverse(self):
+        if self.reverse_cache is None:
+            self.reverse_cache = self.build_reverse()
+        return self.reverse_cache
+
+    def build_reverse(self):
+        offsets, sources, edges = self.incoming_edges()
+        weights = array('d', map(self.weights.__getitem__, edges))
+        return CSRGraph(self.names, offsets, sources, weights, self.ids)
+
+    # Función para indexar las aristas de entrada de cada nodo: (offsets, sources, edges), donde
+    # sources[offsets[v]:offsets[v + 1]] son los nodos que llegan a v y edges la posición de cada
+    # arista en targets/weights
+    def incoming_edges(self):
+        counts = [0] * (len(self.names) + 1)
+        for dest in self.targets:
+            counts[dest + 1] += 1
+        offsets = array('q', accumulate(counts))
+        position = list(offsets)
+        sources = array('i', bytes(4 * len(self.targets)))
+        edges = array('q', bytes(8 * len(self.targets)))
+        for node in range(len(self.names)):
+            for edge in range(self.offsets[node], self.offsets[node + 1]):
+                dest = self.targets[edge]
+                sources[position[dest]] = node
+                edges[position[dest]] = edge
+                position[dest] += 1
+        return offsets, sources, edges
+
+    # Función para obtener el nodo de origen de cada arista (en el orden de targets/weights)
+    def edge_sources(self):
+        sources = array('i')
+        for node in range(len(self.names)):
+            sources.extend(repeat(node, self.offsets[node + 1] - self.offsets[node]))
+        return sources
+
+    # Función para volver a {nombre: [(vecino, peso), ...]}
+    def to_adjacency(self):
+        names = self.names
+        return {names[node]: [(names[dest], weight) for dest, weight in self.neighbors(node)] for node in range(len(names))}
+
+# Caché de filas del CSR como tuplas (vecino, peso): las búsquedas de desvío de una misma
+# consulta recorren una y otra vez los mismos nodos, así que cada fila se arma una sola vez
+class AdjacencyRows(dict):
+    __slots__ = ("graph",)
+
+    def __init__(self, graph):
+        super().__init__()
+        self.graph = graph
+
+    def __missing__(self, node):
+        row = self[node] = tuple(self.graph.neighbors(node))
+        return row
+
+# Función para cargar el grafo desde un archivo JSON {"A": [["B", 10], ...], ...} en formato CSR
+def cargar_grafo_desde_json(filename):
+    with open(filename, 'r') as file:
+        return CSRGraph.from_adjacency(json.load(file))
+
+# Función Dijkstra desde un nodo; devuelve la lista de distancias por id (INFINITY si no se alcanza)
+def shortest_distances(graph, source):
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    distances = [INFINITY] * len(graph)
+    distances[source] = 0.0
+    queue = [(0.0, source)]
+    while queue:
+        cost, node = heapq.heappop(queue)
+        if cost > distances[node]:
+            continue
+        for edge in range(offsets[node], offsets[node + 1]):
+            neighbor = targets[edge]
+            new_cost = cost + weights[edge]
+            if new_cost < distances[neighbor]:
+                distances[neighbor] = new_cost
+                heapq.heappush(queue, (new_cost, neighbor))
+    return distances
+
+# Función Dijkstra que también guarda el árbol: devuelve (distancias, brincos, previos) por id.
+# Entre caminos del mismo costo se queda con el de menos brincos; -1 en brincos y previos si no se alcanza.
+def shortest_path_tree(graph, source):
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    distances = [INFINITY] * len(graph)
+    hops = [-1] * len(graph)
+    previous = array('i', repeat(-1, len(graph)))
+    distances[source] = 0.0
+    hops[source] = 0
+    queue = [(0.0, 0, source)]
+    while queue:
+        cost, hop_count, node = heapq.heappop(queue)
+        if cost > distances[node] or (cost == distances[node] and hop_count > hops[node]):
+            continue
+        hop_count += 1
+        for edge in range(offsets[node], offsets[node + 1]):
+            neighbor = targets[edge]
+            new_cost = cost + weights[edge]
+            if new_cost < distances[neighbor] or (new_cost == distances[neighbor] and hop_count < hops[neighbor]):
+                distances[neighbor] = new_cost
+                hops[neighbor] = hop_count
+                previous[neighbor] = node
+                heapq.heappush(queue, (new_cost, hop_count, neighbor))
+    return distances, hops, previous
+
+# Función Dijkstra que además cuenta los caminos de costo mínimo (ECMP) hacia cada nodo.
+# Devuelve (distancias, brincos, caminos) por id; supone pesos positivos (infinito = arista caída).
+def shortest_path_counts(graph, source, tolerance=1e-9):
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    distances = [INFINITY] * len(graph)
+    hops = [-1] * len(graph)
+    counts = [0] * len(graph)
+    done = bytearray(len(graph))
+    distances[source] = 0.0
+    hops[source] = 0
+    counts[source] = 1
+    queue = [(0.0, source)]
+    while queue:
+        cost, node = heapq.heappop(queue)
+        if done[node]:
+            continue
+        done[node] = 1
+        hop_count = hops[node] + 1
+        for edge in range(offsets[node], offsets[node + 1]):
+            neighbor = targets[edge]
+            new_cost = cost + weights[edge]
+            current = distances[neighbor]
+            if new_cost < current - tolerance:
+                distances[neighbor] = new_cost
+                hops[neighbor] = hop_count
+                counts[neighbor] = counts[node]
+                heapq.heappush(queue, (new_cost, neighbor))
+            elif new_cost <= current + tolerance and current != INFINITY and not done[neighbor]:
+                counts[neighbor] += counts[node]
+                if hop_count < hops[neighbor]:
+                    hops[neighbor] = hop_count
+    return distances, hops, counts
+
+# Función para leer del árbol el camino de ids de la raíz a target ([] si no se alcanza)
+def path_from_tree(previous, source, target):
+    if target != source and previous[target] == -1:
+        return []
+    path = [target]
+    while target != source:
+        target = previous[target]
+        path.append(target)
+    path.reverse()
+    return path
+
+_worker_graph = None
+
+def _init_worker(graph):
+    global _worker_graph
+    _worker_graph = graph
+
+def _source_row(source):
+    distances, hops, _ = shortest_path_tree(_worker_graph, source)
+    return source, distances, hops
+
+# Función para calcular caminos más cortos entre todos los pares con un Dijkstra por origen.
+# Devuelve (origen, distancias, brincos) en orden de id; con workers > 1 reparte los orígenes
+# entre procesos (cada proceso recibe el grafo una sola vez).
+def all_pairs_shortest_paths(graph, workers=1):
+    if workers <= 1 or len(graph) < 2:
+        for source in range(len(graph)):
+            distances, hops, _ = shortest_path_tree(graph, source)
+            yield source, distances, hops
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(graph,)) as executor:
+        yield from executor.map(_source_row, range(len(graph)), chunksize=max(1, len(graph) // (workers * 8)))
+
+# Función A* del nodo de desvío al destino sin pasar por blocked_nodes ni por las aristas
+# spur -> blocked_next; rows es la caché AdjacencyRows del grafo.
+# Devuelve (costo, camino de ids) o None si no hay camino
+def spur_path(rows, spur, target, to_target, blocked_nodes, blocked_next):
+    best = {spur: 0.0}
+    previous = {spur: -1}
+    queue = [(to_target[spur], 0.0, spur)]
+    while queue:
+        _, cost, node = heapq.heappop(queue)
+        if cost > best[node]:
+            continue
+        if node == target:
+            path = []
+            while node != -1:
+                path.append(node)
+                node = previous[node]
+            path.reverse()
+            return cost, path
+        for neighbor, weight in rows[node]:
+            if neighbor in blocked_nodes or (node == spur and neighbor in blocked_next):
+                continue
+            remaining = to_target[neighbor]
+            if remaining == INFINITY:
+                continue
+            new_cost = cost + weight
+            if new_cost < best.get(neighbor, INFINITY):
+                best[neighbor] = new_cost
+                previous[neighbor] = node
+                heapq.heappush(queue, (new_cost + remaining, new_cost, neighbor))
+    return None
+
+# Función de Yen sobre ids: devuelve [(camino de ids, costo), ...] en orden de costo
+def yen_paths(graph, source, target, k, to_target=None):
+    if to_target is None:
+        to_target = shortest_distances(graph.reverse(), target)
+    if to_target[source] == INFINITY or k <= 0:
+        return []
+    if source == target:
+        return [((source,), 0.0)]
+
+    rows = AdjacencyRows(graph)
+    first = spur_path(rows, source, target, to_target, (), ())
+    accepted = []
+    # Próximos nodos ya usados después de cada prefijo de los caminos aceptados
+    next_by_prefix = {}
+    # Candidatos: (costo, camino, índice desde donde se desvió de su padre)
+    candidates = [(first[0], tuple(first[1]), 0)]
+    seen = {candidates[0][1]}
+
+    while candidates and len(accepted) < k:
+        cost, path, deviation = heapq.heappop(candidates)
+        accepted.append((path, cost))
+        if len(accepted) == k:
+            break
+        for i in range(len(path) - 1):
+            next_by_prefix.setdefault(path[:i + 1], set()).add(path[i + 1])
+
+        # Costo acumulado del prefijo (raíz) hasta cada nodo de desvío
+        root_cost = 0.0
+        for i in range(deviation):
+            root_cost += graph.edge_weight(path[i], path[i + 1])
+        for i in range(deviation, len(path) - 1):
+            root = path[:i + 1]
+            spur = path[i]
+            found = spur_path(rows, spur, target, to_target, set(root[:-1]), next_by_prefix[root])
+            if found is not None:
+                candidate = root[:-1] + tuple(found[1])
+                if candidate not in seen:
+                    seen.add(candidate)
+                    heapq.heappush(candidates, (root_cost + found[0], candidate, i))
+            root_cost += graph.edge_weight(spur, path[i + 1])
+
+    return accepted
+
+# Función para obtener los k caminos más cortos sin ciclos de start a target (por nombre), en orden
+# de costo. Devuelve [(camino, costo, brincos), ...] como dijkstra_k_shortest_paths.
+def k_shortest_paths(graph, start, target, k=5, to_target=None):
+    source, destination = graph.ids.get(start), graph.ids.get(target)
+    if source is None or destination is None:
+        return []
+    names = graph.names
+    return [([names[node] for node in path], cost, len(path) - 1)
+            for path, cost in yen_paths(graph, source, destination, k, to_target)]
+
+# Función anterior del script (búsqueda best-first que copia camino y visitados en cada
+# entrada del heap), solo para el benchmark
+def dijkstra_k_shortest_paths(graph, start, target, k=5, max_hops=10):
+    # Min-heap para almacenar (costo, nodo_actual, camino_recorrido, brincos, nodos_visitados)
+    queue = [(0, start, [start], 0, set([start]))]
+    best_paths = []
+
+    while queue and len(best_paths) < k:
+        cost, current_node, path, hops, visited = heapq.heappop(queue)
+
+        # Si llegamos al nodo destino, añadimos el camino a los mejores caminos
+        if current_node == target:
+            best_paths.append((path, cost, hops))
+            continue
+
+        # Limitar la longitud del camino (brincos) para reducir el uso de memoria
+        if hops >= max_hops:
+            continue
+
+        # Explorar vecinos
+        for neighbor, weight in graph.get(current_node, []):
+            new_cost = cost + weight
+            # Continuar solo si el vecino no ha sido visitado en el camino actual
+            if neighbor in visited:
+                continue
+
+            # Crear un nuevo conjunto de nodos visitados incluyendo el vecino actual
+            new_visited = visited | {neighbor}
+            heapq.heappush(queue, (new_cost, neighbor, path + [neighbor], hops + 1, new_visited))
+
+    return best_paths
+
+# Función para generar un grafo sintético tipo malla (cuadrícula con diagonales aleatorias),
+# simétrico como los graph-*.json; devuelve el diccionario de adyacencia
+def generate_synthetic_graph(side, seed=0):
+    rng = random.Random(seed)
+    graph = {f"N{row}-{col}": [] for row in range(side) for col in range(side)}
+
+    def link(a, b):
+        weight = float(rng.randint(1, 20))
+        graph[a].append((b, weight))
+        graph[b].append((a, weight))
+
+    for row in range(side):
+        for col in range(side):
+            node = f"N{row}-{col}"
+            if col + 1 < side:
+                link(node, f"N{row}-{col + 1}")
+            if row + 1 < side:
+                link(node, f"N{row + 1}-{col}")
+            if row + 1 < side and col + 1 < side and rng.random() < 0.2:
+                link(node, f"N{row + 1}-{col + 1}")
+    return graph
+
+# Función para comprobar que una lista de caminos es válida: sin ciclos, costos correctos y en orden
+def check_paths(graph, start, target, paths):
+    ids = graph.ids
+    previous_cost = -INFINITY
+    for path, cost, hops in paths:
+        if path[0] != start or path[-1] != target or len(set(path)) != len(path) or hops != len(path) - 1:
+            return False
+        real_cost = sum(graph.edge_weight(ids[a], ids[b]) for a, b in zip(path, path[1:]))
+        if abs(real_cost - cost) > 1e-9 or cost < previous_cost - 1e-9:
+            return False
+        previous_cost = cost
+    return len({tuple(path) for path, _, _ in paths}) == len(paths)
+
+# Función para generar un grafo aleatorio de nodes nodos y ~edges aristas como lo devuelve json.load
+def generate_random_adjacency(nodes, edges, seed=0):
+    rng = random.Random(seed)
+    names = [f"R{node}" for node in range(nodes)]
+    adjacency = {name: [] for name in names}
+    for _ in range(edges // 2):
+        a, b = rng.choice(names), rng.choice(names)
+        weight = rng.randint(1, 100)
+        adjacency[a].append([b, weight])
+        adjacency[b].append([a, weight])
+    return adjacency
+
+# Función para medir la memoria del grafo como diccionario de tuplas (cargador anterior) y en CSR
+def measure_graph_memory(nodes=100_000, edges=1_000_000):
+    adjacency = generate_random_adjacency(nodes, edges)
+    tracemalloc.start()
+    as_dict = {k: [(dest, float(peso)) for dest, peso in v] for k, v in adjacency.items()}
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    del as_dict
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    as_csr = CSRGraph.from_adjacency(adjacency)
+    csr_bytes = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    print(f"Grafo aleatorio de {len(as_csr)} nodos y {as_csr.edge_count()} aristas:")
+    print(f"  diccionario de tuplas  {dict_bytes / 2**20:8.1f} MB")
+    print(f"  CSR                    {csr_bytes / 2**20:8.1f} MB (nombres e ids incluidos)")
+
+# Función para comparar el motor de Yen con la búsqueda anterior en una lista de pares;
+# devuelve 0 si los costos coinciden (salvo donde la anterior cortó caminos por brincos)
+def compare_with_linear_search(label, graph, pairs, k, max_hops):
+    start = time.perf_counter()
+    adjacency = graph.to_adjacency()
+    old_results = [dijkstra_k_shortest_paths(adjacency, a, b, k, max_hops) for a, b in pairs]
+    old_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    new_results = [k_shortest_paths(graph, a, b, k) for a, b in pairs]
+    new_time = time.perf_counter() - start
+
+    print(f"{label}: {len(graph)} nodos, {len(pairs)} pares, k={k}")
+    print(f"  anterior (best-first)  {old_time:8.2f} s")
+    print(f"  Yen                    {new_time:8.2f} s")
+
+    status = 0
+    for (a, b), old, new in zip(pairs, old_results, new_results):
+        if not check_paths(graph, a, b, new):
+            print(f"ERROR: caminos inválidos de {a} a {b}")
+            status = 1
+        elif all(hops <= max_hops for _, _, hops in new) and [cost for _, cost, _ in old] != [cost for _, cost, _ in new]:
+            print(f"ERROR: los costos de {a} a {b} no coinciden con la búsqueda anterior")
+            status = 1
+    return status
+
+# Función para medir el motor de Yen contra la búsqueda anterior en los grafos del repo
+# y en mallas sintéticas (la búsqueda anterior solo en una chica: en una de 12x12 ya agota la memoria)
+def run_benchmark(graph_files=BENCHMARK_GRAPHS, k=10, max_hops=10, side=60, large_k=200):
+    status = 0
+    for filename in graph_files:
+        graph = cargar_grafo_desde_json(filename)
+        nodes = sorted(graph.names)
+        status |= compare_with_linear_search(filename, graph, [(a, b) for a in nodes for b in nodes if a != b], k, max_hops)
+
+    status |= compare_with_linear_search("Malla sintética 10x10", CSRGraph.from_adjacency(generate_synthetic_graph(10)), [("N0-0", "N9-9")], 100, 20)
+
+    graph = CSRGraph.from_adjacency(generate_synthetic_graph(side))
+    start_node, target_node = "N0-0", f"N{side - 1}-{side - 1}"
+    start = time.perf_counter()
+    paths = k_shortest_paths(graph, start_node, target_node, large_k)
+    large_time = time.perf_counter() - start
+    print(f"Malla sintética de {len(graph)} nodos: {len(paths)} caminos de {start_node} a {target_node} en {large_time:.2f} s "
+          f"(costos {paths[0][1]:g} a {paths[-1][1]:g})")
+    if not check_paths(graph, start_node, target_node, paths):
+        print("ERROR: caminos inválidos en la malla sintética")
+        status = 1
+    measure_graph_memory()
+    if status == 0:
+        print("Los costos coinciden con la búsqueda anterior en todos los pares.")
+    return status
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del motor de k caminos más cortos (Yen).")
+    parser.add_argument("--k", type=int, default=10, help="Caminos por par en los grafos del repo (por defecto: 10).")
+    parser.add_argument("--side", type=int, default=60, help="Lado de la malla sintética (por defecto: 60, 3600 nodos).")
+    parser.add_argument("--large-k", type=int, default=200, help="Caminos a buscar en la malla sintética (por defecto: 200).")
+    args = parser.parse_args()
+    sys.exit(run_benchmark(k=args.k, side=args.side, large_k=args.large_k))
@@ -0,0 +1,153 @@
+import re
+import sys
+import time
+import random
+import argparse
+
+# Parser de la salida de 'show ip route' de NX-OS en texto.
+# Los patrones se compilan una sola vez y cada línea se despacha por su primer carácter:
+# las líneas de prefijo empiezan con un dígito y las de next-hop con '*via', así que
+# cada línea pasa como mucho por un patrón.
+
+NETWORK_PATTERN = re.compile(r"^(\d+\.\d+\.\d+\.\d+\/\d+),\s+ubest\/mbest:\s+(\d+)\/(\d+)")
+PATH_PATTERN = re.compile(
+    r"^\*via\s+([\d\.]+),\s*([\w\/\.]+)?,?\s*\[(\d+)\/(\d+)\],?\s*((?:\d{2}:\d{2}:\d{2})|\d+\w+)?,?\s*(static|ospf-\d+|bgp)?(?:,\s*(intra|inter|type-1|type-2))?(?:,\s*tag\s*(\d+))?"
+)
+
+DIGITS = frozenset("0123456789")
+
+# Función para convertir las líneas de 'show ip route' en el diccionario de rutas
+# {prefijo: {"ubest", "mbest", "paths": [...]}} que usan los scripts NXOS-CLI-Routes-*
+def parse_route_lines(lines):
+    routes = {}
+    current_paths = None
+    network_match = NETWORK_PATTERN.match
+    path_match = PATH_PATTERN.match
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        first = line[0]
+        if first in DIGITS:
+            # Prefijo de red y ubest/mbest
+            match = network_match(line)
+            if match:
+                current_paths = []
+                routes[match.group(1)] = {
+                    "ubest": int(match.group(2)),
+                    "mbest": int(match.group(3)),
+                    "paths": current_paths
+                }
+        elif first == "*" and current_paths is not None:
+            # Información de next-hop (via IP, interfaz, etc.)
+            match = path_match(line)
+            if match:
+                next_hop, interface, ad, metric, age, protocol, route_type, tag = match.groups()
+                current_paths.append({
+                    "next_hop": next_hop,
+                    "interface": interface or "N/A",
+                    "administrative_distance": int(ad) if ad else "N/A",
+                    "metric": int(metric) if metric else "N/A",
+                    "age": age or "N/A",
+                    "protocol": protocol or "N/A",
+                    "route_type": route_type or "N/A",
+                    "tag": tag or "N/A"
+                })
+
+    return routes
+
+# Función para leer y analizar un archivo de rutas línea por línea
+def parse_route_file(route_file_path):
+    with open(route_file_path, 'r') as file:
+        return parse_route_lines(file)
+
+# Función con el parser anterior (re.match con patrones en línea sobre cada línea), solo para el benchmark
+def parse_route_lines_inline(lines):
+    routes = {}
+    current_network = None
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        network_match = re.match(r"^(\d+\.\d+\.\d+\.\d+\/\d+),\s+ubest\/mbest:\s+(\d+)\/(\d+)", line)
+        if network_match:
+            current_network = network_match.group(1)
+            routes[current_network] = {
+                "ubest": int(network_match.group(2)),
+                "mbest": int(network_match.group(3)),
+                "paths": []
+            }
+
+        path_match = re.match(
+            r"^\*via\s+([\d\.]+),\s*([\w\/\.]+)?,?\s*\[(\d+)\/(\d+)\],?\s*((?:\d{2}:\d{2}:\d{2})|\d+\w+)?,?\s*(static|ospf-\d+|bgp)?(?:,\s*(intra|inter|type-1|type-2))?(?:,\s*tag\s*(\d+))?",
+            line
+        )
+        if path_match and current_network:
+            routes[current_network]["paths"].append({
+                "next_hop": path_match.group(1),
+                "interface": path_match.group(2) if path_match.group(2) else "N/A",
+                "administrative_distance": int(path_match.group(3)) if path_match.group(3) else "N/A",
+                "metric": int(path_match.group(4)) if path_match.group(4) else "N/A",
+                "age": path_match.group(5) if path_match.group(5) else "N/A",
+                "protocol": path_match.group(6) if path_match.group(6) else "N/A",
+                "route_type": path_match.group(7) if path_match.group(7) else "N/A",
+                "tag": path_match.group(8) if path_match.group(8) else "N/A"
+            })
+
+    return routes
+
+# Función para generar una tabla sintética de 'show ip route' con el formato de NX-OS
+def generate_synthetic_route_lines(route_count, seed=0):
+    rng = random.Random(seed)
+    lines = [
+        "IP Route Table for VRF \"default\"",
+        "'*' denotes best ucast next-hop",
+        "'**' denotes best mcast next-hop",
+        "'[x/y]' denotes [preference/metric]",
+        "'%<string>' in via output denotes VRF <string>",
+        "",
+    ]
+    for i in range(route_count):
+        network = f"{(i >> 16) & 0xff or 1}.{(i >> 8) & 0xff}.{i & 0xff}.0/24"
+        path_count = rng.choice((1, 1, 2, 4))
+        lines.append(f"{network}, ubest/mbest: {path_count}/0")
+        for p in range(path_count):
+            next_hop = f"192.168.{p}.{rng.randint(1, 254)}"
+            kind = rng.random()
+            if kind < 0.6:
+                lines.append(f"    *via {next_hop}, [20/0], 3w2d, bgp-65000, external, tag 65001")
+            elif kind < 0.9:
+                lines.append(f"    *via {next_hop}, Eth1/{p + 1}, [110/{rng.randint(2, 200)}], 1d02h, ospf-1, intra")
+            else:
+                lines.append(f"    *via {next_hop}, Vlan{rng.randint(2, 4000)}, [1/0], 00:12:{rng.randint(10, 59)}, static")
+    return lines
+
+# Función para medir líneas por segundo del parser precompilado contra el anterior
+def run_benchmark(route_count=1_000_000):
+    lines = generate_synthetic_route_lines(route_count)
+    print(f"Tabla sintética: {route_count} rutas, {len(lines)} líneas")
+
+    for name, parse in (("anterior (re.match en línea)", parse_route_lines_inline), ("precompilado", parse_route_lines)):
+        start = time.perf_counter()
+        routes = parse(lines)
+        elapsed = time.perf_counter() - start
+        print(f"  {name:<30} {elapsed:8.2f} s  {len(lines) / elapsed:>12,.0f} líneas/s")
+        del routes
+
+    # La comparación de salidas se hace sobre una tabla menor para no duplicar la memoria
+    check_lines = generate_synthetic_route_lines(min(route_count, 50_000), seed=1)
+    if parse_route_lines(check_lines) != parse_route_lines_inline(check_lines):
+        print("ERROR: los parsers no producen la misma salida")
+        return 1
+    print("Ambos parsers producen la misma salida.")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del parser de 'show ip route' de NX-OS.")
+    parser.add_argument("--routes", type=int, default=1_000_000, help="Rutas de la tabla sintética (por defecto: 1000000).")
+    args = parser.parse_args()
+    sys.exit(run_benchmark(args.routes))
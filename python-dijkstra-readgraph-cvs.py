@@ -1,45 +1,14 @@
-import heapq
+import os
+import sys
 import csv
-import json
-
-# Función para cargar el grafo desde un archivo JSON
-def cargar_grafo_desde_json(filename):
-    with open(filename, 'r') as file:
-        graph = json.load(file)
-    # Convertir cada peso a `float` para permitir valores decimales
-    return {k: [(dest, float(peso)) for dest, peso in v] for k, v in graph.items()}
-
-
-# Función Dijkstra para encontrar los k mejores caminos de un nodo a otro
-def dijkstra_k_shortest_paths(graph, start, target, k=5, max_hops=10):
-    # Min-heap para almacenar (costo, nodo_actual, camino_recorrido, brincos, nodos_visitados)
-    queue = [(0, start, [start], 0, set([start]))]
-    best_paths = []
-    
-    while queue and len(best_paths) < k:
-        cost, current_node, path, hops, visited = heapq.heappop(queue)
-
-        # Si llegamos al nodo destino, añadimos el camino a los mejores caminos
-        if current_node == target:
-            best_paths.append((path, cost, hops))
-            continue
-
-        # Limitar la longitud del camino (brincos) para reducir el uso de memoria
-        if hops >= max_hops:
-            continue
-
-        # Explorar vecinos
-        for neighbor, weight in graph.get(current_node, []):
-            new_cost = cost + weight
-            # Continuar solo si el vecino no ha sido visitado en el camino actual
-            if neighbor in visited:
-                continue
-            
-            # Crear un nuevo conjunto de nodos visitados incluyendo el vecino actual
-            new_visited = visited | {neighbor}
-            heapq.heappush(queue, (new_cost, neighbor, path + [neighbor], hops + 1, new_visited))
-
-    return best_paths
+import argparse
+from datetime import datetime
+from graph_paths import (
+    INFINITY, cargar_grafo_desde_json, k_shortest_paths, run_benchmark,
+    all_pairs_shortest_paths, shortest_path_tree, path_from_tree
+)
+from graph_diff import compute_snapshot_paths, diff_snapshot_paths, summarize_pair_changes, PAIR_CHANGE_FIELDNAMES
+from graph_failures import run_scenarios, scenario_output_paths
 
 # Función para guardar los resultados en formato CSV
 def save_paths_to_csv(paths, filename='mejores_caminos.csv'):
@@ -55,28 +24,195 @@ def save_paths_to_csv(paths, filename='mejores_caminos.csv'):
     
     print(f"\nResultados guardados en el archivo {filename}")
 
-# Cargar el grafo desde el archivo JSON
-filename = 'graph-to-be-2024.json'
-graph = cargar_grafo_desde_json(filename)
-
-# Solicitar al usuario el nodo de origen y destino
-start_node = input("Ingresa el nodo de origen: ")
-target_node = input("Ingresa el nodo de destino: ")
-
-# Obtener los 5 mejores caminos desde el origen hasta el destino
-k = 10
-best_paths = dijkstra_k_shortest_paths(graph, start_node, target_node, k)
-
-# Mostrar los mejores caminos
-if best_paths:
-    print(f"\nLos {k} mejores caminos de {start_node} a {target_node} son:\n")
-    for i, (path, cost, hops) in enumerate(best_paths, 1):
-        print(f"Camino {i}: {' → '.join(path)}")
-        print(f"  Costo total: {cost}")
-        print(f"  Número de brincos (hops): {hops}\n")
-    
-    # Guardar resultados en formato CSV
-    save_paths_to_csv(best_paths)
+# Función para guardar las matrices de costos y de brincos entre todos los pares (N/A si no hay camino)
+def save_distance_matrices(graph, cost_file, hops_file, workers=1):
+    names = graph.names
+    with open(cost_file, mode='w', newline='') as costs, open(hops_file, mode='w', newline='') as hops:
+        cost_writer = csv.writer(costs)
+        hops_writer = csv.writer(hops)
+        cost_writer.writerow(['Origen'] + names)
+        hops_writer.writerow(['Origen'] + names)
+        for source, distances, hop_counts in all_pairs_shortest_paths(graph, workers):
+            cost_writer.writerow([names[source]] + ["N/A" if cost == INFINITY else cost for cost in distances])
+            hops_writer.writerow([names[source]] + ["N/A" if count < 0 else count for count in hop_counts])
+
+    print(f"Matrices guardadas en {cost_file} y {hops_file}")
+
+# Función para leer el archivo de consultas: un par origen,destino por línea (también separado por espacios)
+def read_pair_queries(filename):
+    queries = []
+    with open(filename, 'r') as file:
+        for line in file:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            fields = line.replace(',', ' ').split()
+            if len(fields) != 2:
+                raise ValueError(f"Línea inválida en {filename}: {line}")
+            queries.append((fields[0], fields[1]))
+    return queries
+
+# Función para responder las consultas con un solo árbol de caminos más cortos por origen
+def answer_pair_queries(graph, queries, filename):
+    trees = {}
+    answered = 0
+    with open(filename, mode='w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['Origen', 'Destino', 'Costo Total', 'Brincos', 'Camino'])
+        for start, target in queries:
+            source, destination = graph.ids.get(start), graph.ids.get(target)
+            if source is None or destination is None:
+                writer.writerow([start, target, "N/A", "N/A", "nodo desconocido"])
+                continue
+            if source not in trees:
+                trees[source] = shortest_path_tree(graph, source)
+            distances, hops, previous = trees[source]
+            if distances[destination] == INFINITY:
+                writer.writerow([start, target, "N/A", "N/A", "sin camino"])
+                continue
+            path = path_from_tree(previous, source, destination)
+            writer.writerow([start, target, distances[destination], hops[destination], ' → '.join(graph.names[node] for node in path)])
+            answered += 1
+
+    print(f"{answered} de {len(queries)} consultas con camino, guardadas en {filename}")
+
+# Función para el modo por lotes: matrices de todos los pares y/o consultas de un archivo, por grafo
+def run_batch(graph_files, queries_file, matrix, output_dir, workers):
+    queries = read_pair_queries(queries_file) if queries_file else []
+    os.makedirs(output_dir, exist_ok=True)
+    for graph_file in graph_files:
+        graph = cargar_grafo_desde_json(graph_file)
+        name = os.path.splitext(os.path.basename(graph_file))[0]
+        print(f"{graph_file}: {len(graph)} nodos, {graph.edge_count()} aristas")
+        if matrix:
+            save_distance_matrices(
+                graph, os.path.join(output_dir, f"{name}-costos.csv"), os.path.join(output_dir, f"{name}-brincos.csv"), workers
+            )
+        if queries:
+            answer_pair_queries(graph, queries, os.path.join(output_dir, f"{name}-consultas.csv"))
+
+# Función para comparar snapshots consecutivos (p. ej. as-is-2023 → as-is-2024 → to-be-2024) y
+# guardar los pares que se abarataron, encarecieron, perdieron camino o redundancia
+def compare_snapshots(graph_files, output_dir):
+    os.makedirs(output_dir, exist_ok=True)
+    previous = previous_name = None
+    for graph_file in graph_files:
+        graph = cargar_grafo_desde_json(graph_file)
+        name = os.path.splitext(os.path.basename(graph_file))[0]
+        paths = compute_snapshot_paths(graph, previous)
+        if previous is None:
+            print(f"{graph_file}: {len(graph)} nodos, {graph.edge_count()} aristas")
+        else:
+            print(f"{graph_file}: {len(graph)} nodos, {graph.edge_count()} aristas, "
+                  f"{paths.reused_count()} de {len(graph)} árboles sin cambios respecto de {previous_name}")
+            changes = diff_snapshot_paths(previous, paths)
+            csv_file = os.path.join(output_dir, f"{previous_name}-vs-{name}.csv")
+            with open(csv_file, mode='w', newline='') as file:
+                writer = csv.writer(file)
+                writer.writerow(PAIR_CHANGE_FIELDNAMES)
+                writer.writerows(changes)
+            for kind, count in summarize_pair_changes(changes).items():
+                print(f"  {kind}: {count}")
+            print(f"Los {len(changes)} pares con cambios se han guardado en {csv_file}")
+        previous, previous_name = paths, name
+
+# Función para el barrido de fallas de cada grafo: cae cada enlace y cada nodo (N-1) o cada par
+# de ellos (N-2) y se guardan los pares que quedan sin conexión o superan el umbral de costo.
+# Con resume se retoma un barrido interrumpido a partir de su archivo .progress.
+def run_failure_sweep(graph_files, depth, threshold, output_dir, workers=1, resume=False):
+    os.makedirs(output_dir, exist_ok=True)
+    for graph_file in graph_files:
+        graph = cargar_grafo_desde_json(graph_file)
+        name = os.path.splitext(os.path.basename(graph_file))[0]
+        csv_file = os.path.join(output_dir, f"{name}-n{depth}.csv")
+        failures, resumed, evaluated, affected = run_scenarios(graph, csv_file, depth, threshold, workers, resume)
+        if resumed:
+            print(f"{graph_file}: se retoma el barrido, {resumed} de {failures} fallas ya evaluadas")
+        print(f"{graph_file}: {evaluated} escenarios evaluados, {affected} con pares afectados")
+
+        summary_file, _ = scenario_output_paths(csv_file)
+        with open(summary_file, mode='r', newline='') as file:
+            summary = [(int(row[2]), int(row[3]), row[0]) for row in list(csv.reader(file))[1:]]
+        for disconnected, over_threshold, label in sorted(summary, reverse=True)[:10]:
+            print(f"  {label}: {disconnected} pares sin conexión, {over_threshold} sobre el umbral")
+        print(f"El barrido N-{depth} se ha guardado en {csv_file}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Los k mejores caminos sin ciclos entre dos nodos de un grafo JSON.")
+    parser.add_argument("--graph", nargs="+", default=["graph-to-be-2024.json"],
+                        help="Grafo(s) JSON (por defecto: graph-to-be-2024.json); en modo interactivo solo uno.")
+    parser.add_argument("--k", type=int, default=10, help="Cantidad de caminos a buscar (por defecto: 10).")
+    parser.add_argument("--matrix", action="store_true", help="Guarda las matrices de costo y brincos entre todos los pares de cada grafo.")
+    parser.add_argument("--compare", action="store_true", help="Compara los caminos de todos los pares entre grafos consecutivos de --graph.")
+    parser.add_argument("--n1", action="store_true", help="Barrido N-1: cae cada enlace y cada nodo y reporta los pares afectados.")
+    parser.add_argument("--n2", action="store_true", help="Barrido N-2: cae cada par de enlaces y/o nodos y reporta los pares afectados.")
+    parser.add_argument("--threshold", type=float, help="Umbral de costo para los barridos N-1/N-2 (sin umbral solo se reportan pares sin conexión).")
+    parser.add_argument("--resume", action="store_true", help="Retoma un barrido N-1/N-2 interrumpido en la misma carpeta de salida.")
+    parser.add_argument("--queries", help="Archivo con un par origen,destino por línea; responde todos en una pasada.")
+    parser.add_argument("--output", help="Carpeta de salida de los modos por lotes y de comparación (por defecto: <fecha>-caminos).")
+    parser.add_argument("--workers", type=int, default=1, help="Procesos para las matrices y los barridos de fallas (por defecto: 1).")
+    parser.add_argument("--benchmark", action="store_true", help="Compara el motor de Yen con la búsqueda anterior en los graph-*.json.")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        sys.exit(run_benchmark())
+
+    output_dir = args.output or datetime.now().strftime("%d-%m-%Y-caminos")
+    if args.compare:
+        if len(args.graph) < 2:
+            parser.error("--compare necesita al menos dos grafos en --graph.")
+        try:
+            compare_snapshots(args.graph, output_dir)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        return
+
+    if args.n1 or args.n2:
+        if args.resume and not args.output:
+            parser.error("--resume necesita la carpeta del barrido a retomar en --output.")
+        try:
+            run_failure_sweep(args.graph, 2 if args.n2 else 1, args.threshold, output_dir, args.workers, args.resume)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        return
+
+    if args.matrix or args.queries:
+        try:
+            run_batch(args.graph, args.queries, args.matrix, output_dir, args.workers)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        return
+
+    if len(args.graph) > 1:
+        parser.error("El modo interactivo usa un solo grafo; para varios usa --matrix o --queries.")
+
+    # Cargar el grafo desde el archivo JSON
+    graph = cargar_grafo_desde_json(args.graph[0])
+
+    # Solicitar al usuario el nodo de origen y destino
+    start_node = input("Ingresa el nodo de origen: ")
+    target_node = input("Ingresa el nodo de destino: ")
+
+    # Obtener los k mejores caminos desde el origen hasta el destino
+    k = args.k
+    best_paths = k_shortest_paths(graph, start_node, target_node, k)
+
+    # Mostrar los mejores caminos
+    if best_paths:
+        print(f"\nLos {k} mejores caminos de {start_node} a {target_node} son:\n")
+        for i, (path, cost, hops) in enumerate(best_paths, 1):
+            print(f"Camino {i}: {' → '.join(path)}")
+            print(f"  Costo total: {cost}")
+            print(f"  Número de brincos (hops): {hops}\n")
+
+        # Guardar resultados en formato CSV
+        save_paths_to_csv(best_paths)
+
+    else:
+        print(f"\nNo se encontraron caminos de {start_node} a {target_node}.")
 
-else:
-    print(f"\nNo se encontraron caminos de {start_node} a {target_node}.")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+import sys
+import time
+import random
+import argparse
+
+# Motor de diferencias entre dos tablas de rutas en el formato de nxos_route_parser
+# ({prefijo: {"ubest", "mbest", "paths": [...]}}).
+# Cada prefijo se busca en la otra tabla por hash y sus paths se comparan como un
+# diccionario {(next_hop, interfaz): (AD, métrica)}, así que el costo es lineal en rutas + paths.
+
+PREFIX_ADDED = "prefijo-agregado"
+PREFIX_REMOVED = "prefijo-eliminado"
+NEXT_HOP_ADDED = "next-hop-agregado"
+NEXT_HOP_REMOVED = "next-hop-eliminado"
+DISTANCE_CHANGED = "ad-cambiado"
+METRIC_CHANGED = "metrica-cambiada"
+
+CHANGE_KINDS = (PREFIX_ADDED, PREFIX_REMOVED, NEXT_HOP_ADDED, NEXT_HOP_REMOVED, DISTANCE_CHANGED, METRIC_CHANGED)
+CHANGE_FIELDNAMES = ["Network", "Cambio", "Next-hop", "Interfaz", "Antes", "Después"]
+
+# Un cambio entre el antes y el después.
+#   prefijo agregado/eliminado:  next_hop e interface None; before/after = tupla de next-hops
+#   next-hop agregado/eliminado: before/after = (AD, métrica) del path (next-hop + interfaz)
+#   AD/métrica cambiada:         before/after = valor anterior y nuevo
+class RouteChange:
+    __slots__ = ("kind", "network", "next_hop", "interface", "before", "after")
+
+    def __init__(self, kind, network, next_hop=None, interface=None, before=None, after=None):
+        self.kind = kind
+        self.network = network
+        self.next_hop = next_hop
+        self.interface = interface
+        self.before = before
+        self.after = after
+
+    # Función para convertir el cambio en una fila del CSV
+    def as_row(self):
+        return [self.network, self.kind, self.next_hop or "", self.interface or "", format_value(self.before), format_value(self.after)]
+
+    def __eq__(self, other):
+        return isinstance(other, RouteChange) and all(getattr(self, field) == getattr(other, field) for field in self.__slots__)
+
+    def __repr__(self):
+        return f"RouteChange({self.kind}, {self.network}, {self.next_hop}, {self.interface}, {self.before!r} -> {self.after!r})"
+
+def format_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, tuple):
+        return ";".join(map(str, value))
+    return str(value)
+
+# Función para indexar los paths de una ruta por (next_hop, interfaz): {(next_hop, interfaz): (AD, métrica)}.
+# Un mismo next-hop por dos interfaces (p. ej. unnumbered) son dos paths distintos. Si la misma
+# pareja se repite devuelve None y la ruta se compara con group_paths.
+def index_paths(paths):
+    hops = {(path["next_hop"], path["interface"]): (path["administrative_distance"], path["metric"]) for path in paths}
+    return hops if len(hops) == len(paths) else None
+
+# Función para agrupar los paths por (next_hop, interfaz): {(next_hop, interfaz): [(AD, métrica), ...]}
+def group_paths(paths):
+    groups = {}
+    for path in paths:
+        groups.setdefault((path["next_hop"], path["interface"]), []).append((path["administrative_distance"], path["metric"]))
+    return groups
+
+# Función para comparar una pareja (next_hop, interfaz) con un solo path a cada lado
+def diff_path_values(network, key, before, after, changes):
+    if after[0] != before[0]:
+        changes.append(RouteChange(DISTANCE_CHANGED, network, key[0], key[1], before[0], after[0]))
+    if after[1] != before[1]:
+        changes.append(RouteChange(METRIC_CHANGED, network, key[0], key[1], before[1], after[1]))
+
+# Función para comparar los paths repetidos de una misma pareja (next_hop, interfaz).
+# Primero se emparejan los que tienen el mismo (AD, métrica), así reordenar los paths entre
+# capturas no es un cambio; los que sobran se emparejan por posición y el resto se agrega o elimina.
+def diff_repeated_paths(network, key, values_before, values_after, changes):
+    unmatched_after = list(values_after)
+    unmatched_before = []
+    for values in values_before:
+        if values in unmatched_after:
+            unmatched_after.remove(values)
+        else:
+            unmatched_before.append(values)
+
+    for before, after in zip(unmatched_before, unmatched_after):
+        diff_path_values(network, key, before, after, changes)
+    paired = min(len(unmatched_before), len(unmatched_after))
+    for before in unmatched_before[paired:]:
+        changes.append(RouteChange(NEXT_HOP_REMOVED, network, key[0], key[1], before, None))
+    for after in unmatched_after[paired:]:
+        changes.append(RouteChange(NEXT_HOP_ADDED, network, key[0], key[1], None, after))
+
+# Función para comparar los paths de un prefijo presente en ambas tablas
+def diff_paths(network, paths_before, paths_after, changes):
+    hops_before = index_paths(paths_before)
+    hops_after = index_paths(paths_after)
+    if hops_before is None or hops_after is None:
+        groups_after = group_paths(paths_after)
+        for key, values_before in group_paths(paths_before).items():
+            diff_repeated_paths(network, key, values_before, groups_after.pop(key, ()), changes)
+        for key, values_after in groups_after.items():
+            diff_repeated_paths(network, key, (), values_after, changes)
+        return
+    if hops_before == hops_after:
+        return
+
+    for key, values in hops_before.items():
+        after = hops_after.get(key)
+        if after is None:
+            changes.append(RouteChange(NEXT_HOP_REMOVED, network, key[0], key[1], values, None))
+        else:
+            diff_path_values(network, key, values, after, changes)
+
+    for key, values in hops_after.items():
+        if key not in hops_before:
+            changes.append(RouteChange(NEXT_HOP_ADDED, network, key[0], key[1], None, values))
+
+# Función para comparar dos tablas; devuelve la lista de RouteChange en el orden del antes
+# (y al final los prefijos que solo están en el después)
+def diff_route_tables(routes_before, routes_after):
+    changes = []
+    append = changes.append
+    for network, route_before in routes_before.items():
+        route_after = routes_after.get(network)
+        if route_after is None:
+            append(RouteChange(PREFIX_REMOVED, network, None, None, tuple(path["next_hop"] for path in route_before["paths"]), None))
+        else:
+            diff_paths(network, route_before["paths"], route_after["paths"], changes)
+
+    for network, route_after in routes_after.items():
+        if network not in routes_before:
+            append(RouteChange(PREFIX_ADDED, network, None, None, None, tuple(path["next_hop"] for path in route_after["paths"])))
+    return changes
+
+# Función para contar los cambios por tipo
+def summarize_changes(changes):
+    counts = dict.fromkeys(CHANGE_KINDS, 0)
+    for change in changes:
+        counts[change.kind] += 1
+    return counts
+
+# Función con la comparación anterior (compare_next_hop de v0.2), solo para el benchmark
+def compare_next_hop_linear_scan(json1, json2):
+    differences = []
+    all_networks = set(json1.keys()).union(set(json2.keys()))
+
+    for network in all_networks:
+        if network in json1 and network in json2:
+            paths1 = json1[network]["paths"]
+            paths2 = json2[network]["paths"]
+
+            for path1 in paths1:
+                next_hop_before = path1["next_hop"]
+                matching_path = next((p for p in paths2 if p["next_hop"] == next_hop_before), None)
+
+                if not matching_path:
+                    next_hop_after = paths2[0]["next_hop"] if paths2 else "N/A"
+                    differences.append((network, next_hop_before, next_hop_after))
+
+    return differences
+
+def make_path(next_hop, distance, metric):
+    return {
+        "next_hop": next_hop,
+        "interface": "N/A",
+        "administrative_distance": distance,
+        "metric": metric,
+        "age": "3w2d",
+        "protocol": "bgp",
+        "route_type": "N/A",
+        "tag": "65001"
+    }
+
+# Función para generar un par de tablas antes/después con una fracción de prefijos modificados
+def generate_synthetic_tables(route_count, change_ratio=0.01, seed=0):
+    rng = random.Random(seed)
+    before = {}
+    for i in range(route_count):
+        network = f"{1 + (i >> 16)}.{(i >> 8) & 0xff}.{i & 0xff}.0/24"
+        before[network] = {
+            "ubest": 1,
+            "mbest": 0,
+            "paths": [make_path(f"192.168.{p}.{rng.randint(1, 254)}", 20, 0) for p in range(rng.choice((1, 1, 2, 4)))]
+        }
+
+    after = {}
+    for network, route in before.items():
+        paths = list(route["paths"])
+        if rng.random() < change_ratio:
+            kind = rng.randrange(5)
+            if kind == 0:
+                continue
+            if kind == 1:
+                paths.append(make_path(f"10.255.{rng.randint(0, 255)}.{rng.randint(1, 254)}", 20, 0))
+            elif kind == 2 and len(paths) > 1:
+                paths.pop()
+            elif kind == 3:
+                paths[0] = make_path(paths[0]["next_hop"], 200, paths[0]["metric"])
+            else:
+                paths[0] = make_path(paths[0]["next_hop"], paths[0]["administrative_distance"], rng.randint(1, 100))
+        after[network] = {"ubest": len(paths), "mbest": 0, "paths": paths}
+    for i in range(int(route_count * change_ratio)):
+        after[f"172.{16 + (i >> 16) % 16}.{(i >> 8) & 0xff}.{i & 0xff}/32"] = {"ubest": 1, "mbest": 0, "paths": [make_path("10.0.0.1", 1, 0)]}
+    return before, after
+
+# Función para medir el motor de diferencias contra la comparación anterior
+def run_benchmark(route_count=1_000_000):
+    before, after = generate_synthetic_tables(route_count)
+    print(f"Tablas sintéticas: {len(before)} prefijos antes, {len(after)} después")
+
+    start = time.perf_counter()
+    old_differences = compare_next_hop_linear_scan(before, after)
+    old_time = time.perf_counter() - start
+    print(f"  anterior (compare_next_hop)  {old_time:8.2f} s  {len(old_differences)} diferencias (solo next-hops que desaparecen)")
+
+    start = time.perf_counter()
+    changes = diff_route_tables(before, after)
+    new_time = time.perf_counter() - start
+    print(f"  motor por hash               {new_time:8.2f} s  {len(changes)} cambios")
+    for kind, count in summarize_changes(changes).items():
+        print(f"    {kind:<20} {count}")
+
+    # Todo next-hop que la comparación anterior daba como perdido debe salir como eliminado
+    removed = {(change.network, change.next_hop) for change in changes if change.kind == NEXT_HOP_REMOVED}
+    if any((network, next_hop) not in removed for network, next_hop, _ in old_differences):
+        print("ERROR: el motor no reporta todos los next-hops que reportaba la comparación anterior")
+        return 1
+    print("Los next-hops eliminados incluyen todas las diferencias de la comparación anterior.")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del motor de diferencias de tablas de rutas.")
+    parser.add_argument("--routes", type=int, default=1_000_000, help="Prefijos de cada tabla sintética (por defecto: 1000000).")
+    args = parser.parse_args()
+    sys.exit(run_benchmark(args.routes))
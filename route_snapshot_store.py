@@ -0,0 +1,343 @@
+import os
+import re
+import sys
+import csv
+import json
+import time
+import zlib
+import random
+import hashlib
+import argparse
+import tempfile
+from datetime import datetime
+from nxos_route_parser import parse_route_file
+from route_table import parse_prefix
+from route_diff import diff_route_tables, summarize_changes, CHANGE_FIELDNAMES
+
+# Almacén local de snapshots de tablas de rutas por equipo.
+# Cada tabla se ordena por prefijo y se corta en chunks; el corte depende solo del prefijo
+# (crc32 del prefijo), así que agregar o cambiar una ruta solo cambia su chunk. Los hashes de
+# los chunks se agrupan a su vez en grupos cortados por el propio hash. Chunks y grupos se
+# guardan una sola vez por su SHA-256 (packs/) y un snapshot es solo la lista de sus grupos
+# (devices/<equipo>/snapshots/): el almacén crece con los cambios, no con la tabla.
+# Comparar dos snapshots solo abre los grupos y chunks que no tienen en común.
+#
+# El campo "age" no se guarda: cambia en cada captura y haría distinto cada chunk.
+
+DEFAULT_STORE_DIR = "route-snapshots"
+CHUNK_BOUNDARY_MASK = 0x1f  # un corte cada ~32 prefijos
+GROUP_BOUNDARY_MASK = 0x3f  # un corte cada ~64 chunks
+PACK_SUFFIX = ".pack"
+PACK_INDEX_SUFFIX = ".idx"
+DIGEST_SIZE = 32
+PATH_FIELDS = ("next_hop", "interface", "administrative_distance", "metric", "protocol", "route_type", "tag")
+UNSAFE_NAME_CHARS = re.compile(r"[^\w.-]")
+
+class RouteSnapshotStore:
+    def __init__(self, store_dir=DEFAULT_STORE_DIR):
+        self.store_dir = store_dir
+        self.packs_dir = os.path.join(store_dir, "packs")
+        self.devices_dir = os.path.join(store_dir, "devices")
+        os.makedirs(self.packs_dir, exist_ok=True)
+        os.makedirs(self.devices_dir, exist_ok=True)
+        self.object_index = self._load_object_index()
+
+    # Los objetos nuevos de cada ingesta van juntos en un pack (packs/<n>.pack) con su índice
+    # packs/<n>.idx {hash: [offset, largo]}, así no queda un archivo pequeño por chunk
+    def _load_object_index(self):
+        object_index = {}
+        for name in sorted(os.listdir(self.packs_dir)):
+            if name.endswith(PACK_INDEX_SUFFIX):
+                pack_name = name[:-len(PACK_INDEX_SUFFIX)]
+                with open(os.path.join(self.packs_dir, name), 'r') as index_file:
+                    for digest, (offset, length) in json.load(index_file).items():
+                        object_index[digest] = (pack_name, offset, length)
+        return object_index
+
+    def _write_pack(self, new_objects):
+        if not new_objects:
+            return 0
+        pack_name = f"{len(os.listdir(self.packs_dir)) // 2:06d}-{os.getpid()}"
+        pack_index = {}
+        offset = 0
+        for digest, data in new_objects.items():
+            pack_index[digest] = [offset, len(data)]
+            offset += len(data)
+        # Primero el pack y después su índice: un pack sin índice se ignora al abrir el almacén
+        written = write_atomic(os.path.join(self.packs_dir, pack_name + PACK_SUFFIX), b"".join(new_objects.values()))
+        write_atomic(os.path.join(self.packs_dir, pack_name + PACK_INDEX_SUFFIX), json.dumps(pack_index).encode())
+        for digest, (offset, length) in pack_index.items():
+            self.object_index[digest] = (pack_name, offset, length)
+        return written
+
+    # Función para leer muchos objetos, abriendo cada pack una sola vez
+    def _read_objects(self, digests):
+        open_packs = {}
+        try:
+            for digest in digests:
+                pack_name, offset, length = self.object_index[digest]
+                pack_file = open_packs.get(pack_name)
+                if pack_file is None:
+                    pack_file = open_packs[pack_name] = open(os.path.join(self.packs_dir, pack_name + PACK_SUFFIX), 'rb')
+                pack_file.seek(offset)
+                yield pack_file.read(length)
+        finally:
+            for pack_file in open_packs.values():
+                pack_file.close()
+
+    def _device_dir(self, device):
+        return os.path.join(self.devices_dir, UNSAFE_NAME_CHARS.sub('_', device))
+
+    def _snapshot_path(self, device, taken_at):
+        return os.path.join(self._device_dir(device), "snapshots", UNSAFE_NAME_CHARS.sub('_', taken_at) + ".json")
+
+    # Función para leer la lista de snapshots de un equipo, del más antiguo al más reciente
+    def snapshots(self, device):
+        try:
+            with open(os.path.join(self._device_dir(device), "snapshots.json"), 'r') as index_file:
+                return json.load(index_file)
+        except FileNotFoundError:
+            return []
+
+    def devices(self):
+        return sorted(os.listdir(self.devices_dir))
+
+    # Función para guardar una tabla {prefijo: {"ubest", "mbest", "paths"}} como snapshot nuevo.
+    # Devuelve el resumen del snapshot con cuántos chunks y bytes se escribieron realmente.
+    def ingest(self, device, routes, taken_at=None):
+        taken_at = taken_at or datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
+        new_objects = {}
+        group_hashes = []
+        group = []
+        chunk_count = new_chunks = 0
+
+        def add_object(data, stored_data):
+            digest = hashlib.sha256(data).digest()
+            key = digest.hex()
+            if key not in self.object_index and key not in new_objects:
+                new_objects[key] = stored_data
+                return digest, True
+            return digest, False
+
+        for chunk in split_into_chunks(routes):
+            data = encode_chunk(chunk)
+            digest, is_new = add_object(data, zlib.compress(data, 6))
+            chunk_count += 1
+            new_chunks += is_new
+            group.append(digest)
+            # Los grupos se cortan por el hash del chunk, así que también se reutilizan entre snapshots
+            if digest[-1] & GROUP_BOUNDARY_MASK == 0:
+                group_hashes.append(add_object(b"".join(group), b"".join(group))[0].hex())
+                group = []
+        if group:
+            group_hashes.append(add_object(b"".join(group), b"".join(group))[0].hex())
+        new_bytes = self._write_pack(new_objects)
+
+        summary = {"taken_at": taken_at, "routes": len(routes), "chunks": chunk_count, "new_chunks": new_chunks, "new_bytes": new_bytes}
+        write_atomic(self._snapshot_path(device, taken_at), json.dumps(dict(summary, groups=group_hashes)).encode())
+        snapshots = [entry for entry in self.snapshots(device) if entry["taken_at"] != taken_at]
+        snapshots.append(summary)
+        snapshots.sort(key=lambda entry: entry["taken_at"])
+        write_atomic(os.path.join(self._device_dir(device), "snapshots.json"), json.dumps(snapshots, indent=1).encode())
+        return summary
+
+    # Función para elegir el snapshot de una fecha: el último tomado hasta esa fecha (o fecha y hora)
+    def find_snapshot(self, device, when=None):
+        snapshots = self.snapshots(device)
+        if not snapshots:
+            raise ValueError(f"No hay snapshots del equipo '{device}'")
+        if when is None:
+            return snapshots[-1]
+        limit = when + "T23:59:59" if len(when) == 10 else when
+        candidates = [entry for entry in snapshots if entry["taken_at"] <= limit]
+        if not candidates:
+            raise ValueError(f"No hay snapshots de '{device}' anteriores a {when} (el primero es de {snapshots[0]['taken_at']})")
+        return candidates[-1]
+
+    # Función para obtener los hashes de los chunks de un snapshot, grupo por grupo
+    def _snapshot_groups(self, device, snapshot):
+        with open(self._snapshot_path(device, snapshot["taken_at"]), 'r') as snapshot_file:
+            return json.load(snapshot_file)["groups"]
+
+    def _chunk_hashes(self, groups):
+        return [
+            data[i:i + DIGEST_SIZE].hex()
+            for data in self._read_objects(groups)
+            for i in range(0, len(data), DIGEST_SIZE)
+        ]
+
+    def _load_routes(self, chunk_hashes):
+        routes = {}
+        for data in self._read_objects(chunk_hashes):
+            routes.update(decode_chunk(zlib.decompress(data)))
+        return routes
+
+    # Función para reconstruir la tabla completa de un snapshot
+    def rebuild(self, device, when=None):
+        return self._load_routes(self._chunk_hashes(self._snapshot_groups(device, self.find_snapshot(device, when))))
+
+    # Función para comparar dos snapshots: solo se abren los grupos y chunks que no comparten
+    def diff(self, device, when_before, when_after):
+        groups_before = self._snapshot_groups(device, self.find_snapshot(device, when_before))
+        groups_after = self._snapshot_groups(device, self.find_snapshot(device, when_after))
+        shared_groups = set(groups_before) & set(groups_after)
+        chunks_before = self._chunk_hashes(group for group in groups_before if group not in shared_groups)
+        chunks_after = self._chunk_hashes(group for group in groups_after if group not in shared_groups)
+        shared = set(chunks_before) & set(chunks_after)
+        routes_before = self._load_routes(digest for digest in chunks_before if digest not in shared)
+        routes_after = self._load_routes(digest for digest in chunks_after if digest not in shared)
+        return diff_route_tables(routes_before, routes_after)
+
+    # Función para calcular el espacio ocupado por los packs
+    def disk_usage(self):
+        return sum(entry.stat().st_size for entry in os.scandir(self.packs_dir))
+
+# Función para escribir un archivo de forma atómica; devuelve los bytes escritos
+def write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as tmp_file:
+        tmp_file.write(data)
+    os.replace(tmp_path, path)
+    return len(data)
+
+# Función para ordenar la tabla por prefijo entero y cortarla donde el crc32 del prefijo lo indique
+def split_into_chunks(routes):
+    chunk = []
+    for prefix in sorted(routes, key=parse_prefix):
+        chunk.append((prefix, routes[prefix]))
+        if zlib.crc32(prefix.encode()) & CHUNK_BOUNDARY_MASK == 0:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+# Función para serializar un chunk de forma canónica (mismo contenido, mismos bytes, mismo hash)
+def encode_chunk(chunk):
+    return json.dumps([
+        [prefix, route_info["ubest"], route_info["mbest"], [[path[field] for field in PATH_FIELDS] for path in route_info["paths"]]]
+        for prefix, route_info in chunk
+    ], separators=(",", ":")).encode()
+
+def decode_chunk(data):
+    return {
+        prefix: {
+            "ubest": ubest,
+            "mbest": mbest,
+            "paths": [dict(zip(PATH_FIELDS, values), age="N/A") for values in paths]
+        }
+        for prefix, ubest, mbest, paths in json.loads(data)
+    }
+
+# Función para cargar una tabla de una captura en txt o del routes.json de NXOS-CLI-Routes-to-csv
+def load_routes(path):
+    if path.endswith(".json"):
+        with open(path, 'r') as json_file:
+            return json.load(json_file)
+    return parse_route_file(path)
+
+def save_changes_to_csv(changes, csv_file_path):
+    with open(csv_file_path, 'w', newline='') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(CHANGE_FIELDNAMES)
+        writer.writerows(change.as_row() for change in changes)
+    print(f"El archivo CSV con los cambios se ha guardado en {csv_file_path}")
+
+# Función para medir cuánto crece el almacén con tablas grandes y poco cambio entre capturas
+def run_benchmark(route_count=200_000, snapshots=10, churn=0.005):
+    rng = random.Random(0)
+    routes = {}
+    for i in range(route_count):
+        routes[f"{1 + (i >> 16)}.{(i >> 8) & 0xff}.{i & 0xff}.0/24"] = {
+            "ubest": 1, "mbest": 0,
+            "paths": [{"next_hop": f"192.168.0.{rng.randint(1, 254)}", "interface": "N/A", "administrative_distance": 20,
+                       "metric": 0, "age": "3w2d", "protocol": "bgp", "route_type": "N/A", "tag": "65001"}]
+        }
+
+    with tempfile.TemporaryDirectory() as store_dir:
+        store = RouteSnapshotStore(store_dir)
+        raw_json_bytes = 0
+        for day in range(snapshots):
+            if day:
+                for prefix in rng.sample(sorted(routes), int(route_count * churn)):
+                    routes[prefix]["paths"][0] = dict(routes[prefix]["paths"][0], next_hop=f"10.0.{day}.{rng.randint(1, 254)}")
+            raw_json_bytes += len(json.dumps(routes, indent=4))
+            start = time.perf_counter()
+            snapshot = store.ingest("leaf-1", routes, f"2024-01-{day + 1:02d}T00:00:00")
+            print(f"  día {day + 1:2d}: {snapshot['new_chunks']:5d} chunks nuevos, {snapshot['new_bytes'] / 1024:9.1f} KB, "
+                  f"{time.perf_counter() - start:.2f} s")
+
+        print(f"Almacén: {store.disk_usage() / 1024 / 1024:.1f} MB contra {raw_json_bytes / 1024 / 1024:.1f} MB de routes.json diarios")
+
+        start = time.perf_counter()
+        rebuilt = store.rebuild("leaf-1", "2024-01-05")
+        print(f"Tabla del 2024-01-05 reconstruida en {time.perf_counter() - start:.2f} s ({len(rebuilt)} rutas)")
+
+        start = time.perf_counter()
+        changes = store.diff("leaf-1", "2024-01-01", f"2024-01-{snapshots:02d}")
+        print(f"Cambios entre el primer y el último día: {len(changes)} en {time.perf_counter() - start:.2f} s")
+
+        expected = diff_route_tables(store.rebuild("leaf-1", "2024-01-01"), store.rebuild("leaf-1", f"2024-01-{snapshots:02d}"))
+        if sorted(map(repr, changes)) != sorted(map(repr, expected)):
+            print("ERROR: la comparación por chunks no coincide con la comparación de las tablas completas")
+            return 1
+        print("La comparación por chunks coincide con la de las tablas completas.")
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Almacén de snapshots de tablas de rutas por equipo.")
+    parser.add_argument("--store", default=DEFAULT_STORE_DIR, help=f"Carpeta del almacén (por defecto: {DEFAULT_STORE_DIR}).")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="Guarda una captura (txt o routes.json) como snapshot de un equipo.")
+    ingest.add_argument("device")
+    ingest.add_argument("route_file")
+    ingest.add_argument("--taken-at", help="Fecha y hora de la captura (YYYY-MM-DDTHH:MM:SS, por defecto: ahora).")
+
+    listing = commands.add_parser("list", help="Lista los equipos o los snapshots de un equipo.")
+    listing.add_argument("device", nargs="?")
+
+    export = commands.add_parser("export", help="Reconstruye la tabla de una fecha en JSON.")
+    export.add_argument("device")
+    export.add_argument("--date", help="Fecha (YYYY-MM-DD) o fecha y hora; por defecto el último snapshot.")
+    export.add_argument("--output", required=True, help="Archivo JSON de salida.")
+
+    changes = commands.add_parser("diff", help="Guarda en CSV los cambios entre dos fechas.")
+    changes.add_argument("device")
+    changes.add_argument("date_before")
+    changes.add_argument("date_after")
+    changes.add_argument("--output", required=True, help="Archivo CSV de salida.")
+
+    commands.add_parser("benchmark", help="Mide el crecimiento del almacén con tablas sintéticas.")
+    args = parser.parse_args()
+
+    if args.command == "benchmark":
+        return run_benchmark()
+
+    store = RouteSnapshotStore(args.store)
+    try:
+        if args.command == "ingest":
+            snapshot = store.ingest(args.device, load_routes(args.route_file), args.taken_at)
+            print(f"Snapshot {snapshot['taken_at']} de {args.device}: {snapshot['routes']} rutas, "
+                  f"{snapshot['new_chunks']} de {snapshot['chunks']} chunks nuevos ({snapshot['new_bytes']} bytes)")
+        elif args.command == "list":
+            if not args.device:
+                print("\n".join(store.devices()))
+            for snapshot in store.snapshots(args.device) if args.device else ():
+                print(f"{snapshot['taken_at']}  {snapshot['routes']:>9} rutas  {snapshot['new_chunks']:>6} chunks nuevos")
+        elif args.command == "export":
+            with open(args.output, 'w') as json_file:
+                json.dump(store.rebuild(args.device, args.date), json_file, indent=4)
+            print(f"La tabla se ha guardado en {args.output}")
+        else:
+            changes = store.diff(args.device, args.date_before, args.date_after)
+            for kind, count in summarize_changes(changes).items():
+                print(f"  {kind}: {count}")
+            save_changes_to_csv(changes, args.output)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,451 @@
+import sys
+import time
+import random
+import argparse
+import ipaddress
+from bisect import bisect_right
+from itertools import compress, repeat
+from operator import is_, rshift
+
+# Tabla de rutas indexada por prefijo entero.
+# Cada prefijo se guarda como (red entera, longitud) en un trie Patricia (binario con
+# compresión de caminos), que permite longest-prefix match, buscar las rutas que cubren
+# un prefijo, las rutas cubiertas por un prefijo y recorrer la tabla en orden, sin
+# recorrer un diccionario de cadenas.
+
+# Registro compacto de un next-hop. AD y métrica son enteros (None si no vienen en la salida).
+class RoutePath:
+    __slots__ = ("next_hop", "interface", "administrative_distance", "metric", "age", "protocol", "route_type", "tag")
+
+    def __init__(self, next_hop, interface=None, administrative_distance=None, metric=None, age=None, protocol=None, route_type=None, tag=None):
+        intern = sys.intern
+        self.next_hop = intern(next_hop) if next_hop else next_hop
+        self.interface = intern(interface) if interface else interface
+        self.administrative_distance = administrative_distance
+        self.metric = metric
+        self.age = age
+        self.protocol = intern(protocol) if protocol else protocol
+        self.route_type = intern(route_type) if route_type else route_type
+        self.tag = tag
+
+    # Función para volver al formato de diccionario de los scripts (con "N/A" en los campos vacíos)
+    def as_dict(self):
+        return {field: "N/A" if (value := getattr(self, field)) is None else value for field in self.__slots__}
+
+    def __eq__(self, other):
+        return isinstance(other, RoutePath) and all(getattr(self, field) == getattr(other, field) for field in self.__slots__)
+
+    def __repr__(self):
+        return f"RoutePath({self.next_hop}, {self.interface}, [{self.administrative_distance}/{self.metric}], {self.protocol})"
+
+# Una entrada de la tabla: prefijo entero + ubest/mbest + sus next-hops
+class Route:
+    __slots__ = ("network", "length", "version", "ubest", "mbest", "paths")
+
+    def __init__(self, network, length, version=4, ubest=None, mbest=None, paths=None):
+        self.network = network
+        self.length = length
+        self.version = version
+        self.ubest = ubest
+        self.mbest = mbest
+        self.paths = paths if paths is not None else []
+
+    @property
+    def prefix(self):
+        return format_prefix(self.network, self.length, self.version)
+
+    def __repr__(self):
+        return f"Route({self.prefix}, {len(self.paths)} paths)"
+
+class _Node:
+    __slots__ = ("network", "length", "route", "children")
+
+    def __init__(self, network, length, route=None):
+        self.network = network
+        self.length = length
+        self.route = route
+        self.children = [None, None]
+
+ADDRESS_BITS = {4: 32, 6: 128}
+
+# Función para convertir "10.0.0.0/8" (o IPv6) a (versión, red entera, longitud); los bits de host se limpian
+def parse_prefix(prefix):
+    address, _, length_text = prefix.partition('/')
+    if ':' in address:
+        network = ipaddress.IPv6Network(prefix, strict=False)
+        return 6, int(network.network_address), network.prefixlen
+    octets = address.split('.')
+    if len(octets) != 4:
+        raise ValueError(f"Prefijo inválido: {prefix}")
+    value = 0
+    for octet in octets:
+        number = int(octet)
+        if not 0 <= number <= 255:
+            raise ValueError(f"Prefijo inválido: {prefix}")
+        value = (value << 8) | number
+    length = int(length_text) if length_text else 32
+    if not 0 <= length <= 32:
+        raise ValueError(f"Prefijo inválido: {prefix}")
+    return 4, value & (((1 << length) - 1) << (32 - length)), length
+
+# Función para convertir una dirección IP en texto a (versión, entero)
+def parse_address(address):
+    if ':' in address:
+        return 6, int(ipaddress.IPv6Address(address))
+    version, value, _ = parse_prefix(address + "/32")
+    return version, value
+
+# Función para mostrar un prefijo entero como texto
+def format_prefix(network, length, version=4):
+    if version == 4:
+        return f"{network >> 24}.{(network >> 16) & 0xff}.{(network >> 8) & 0xff}.{network & 0xff}/{length}"
+    return f"{ipaddress.IPv6Address(network)}/{length}"
+
+class RouteTable:
+    def __init__(self, version=4):
+        self.version = version
+        self.width = ADDRESS_BITS[version]
+        self.root = _Node(0, 0)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def _covers(self, node, network, length):
+        # True si el nodo es igual o menos específico que network/length y lo contiene
+        return node.length <= length and (node.length == 0 or (node.network ^ network) >> (self.width - node.length) == 0)
+
+    def _bit(self, network, position):
+        return (network >> (self.width - 1 - position)) & 1
+
+    # Función para agregar (o reemplazar) la ruta de un prefijo
+    def add(self, route):
+        return self._insert(self.root, route, None)
+
+    # Inserción desde 'node' (que debe contener al prefijo). Si se pasa 'path', se le agregan
+    # los nodos recorridos hasta el nodo de la ruta, para continuar la siguiente inserción desde ahí.
+    def _insert(self, node, route, path):
+        network, length = route.network, route.length
+        width = self.width
+        while True:
+            if node.length == length:
+                if node.route is None:
+                    self.size += 1
+                node.route = route
+                return route
+
+            bit = (network >> (width - 1 - node.length)) & 1
+            child = node.children[bit]
+            if child is None:
+                child = node.children[bit] = _Node(network, length, route)
+                if path is not None:
+                    path.append(child)
+                self.size += 1
+                return route
+
+            child_length = child.length
+            diff = child.network ^ network
+            if child_length <= length and (diff >> (width - child_length)) == 0:
+                # El hijo contiene al prefijo: seguir bajando
+                node = child
+                if path is not None:
+                    path.append(child)
+                continue
+
+            common = min(width - diff.bit_length(), child_length, length)
+            if common == length:
+                # El nuevo prefijo queda entre 'node' y 'child'
+                new_node = _Node(network, length, route)
+                new_node.children[(child.network >> (width - 1 - length)) & 1] = child
+                node.children[bit] = new_node
+                if path is not None:
+                    path.append(new_node)
+            else:
+                # Nodo intermedio sin ruta en el primer bit donde difieren
+                mask = ((1 << common) - 1) << (width - common)
+                glue = _Node(network & mask, common)
+                new_node = _Node(network, length, route)
+                glue.children[(child.network >> (width - 1 - common)) & 1] = child
+                glue.children[(network >> (width - 1 - common)) & 1] = new_node
+                node.children[bit] = glue
+                if path is not None:
+                    path.append(glue)
+                    path.append(new_node)
+            self.size += 1
+            return route
+
+    # Función para agregar muchas rutas: se ordenan por (red, longitud) y cada inserción
+    # empieza desde el ancestro común con la anterior en lugar de bajar desde la raíz
+    def add_many(self, routes):
+        width = self.width
+        path = [self.root]
+        for route in sorted(routes, key=lambda route: (route.network, route.length)):
+            network, length = route.network, route.length
+            while len(path) > 1:
+                node = path[-1]
+                if node.length <= length and ((node.network ^ network) >> (width - node.length)) == 0:
+                    break
+                path.pop()
+            self._insert(path[-1], route, path)
+
+    # Función para agregar una ruta a partir del prefijo en texto
+    def add_prefix(self, prefix, ubest=None, mbest=None, paths=None):
+        version, network, length = parse_prefix(prefix)
+        if version != self.version:
+            raise ValueError(f"El prefijo {prefix} no es IPv{self.version}")
+        return self.add(Route(network, length, version, ubest, mbest, paths))
+
+    # Función para obtener la ruta exacta de un prefijo (None si no existe)
+    def get(self, network, length):
+        node = self.root
+        while node is not None and self._covers(node, network, length):
+            if node.length == length:
+                return node.route
+            node = node.children[self._bit(network, node.length)]
+        return None
+
+    # Función de longest-prefix match: la ruta más específica que contiene la dirección
+    def lookup(self, address):
+        width = self.width
+        node = self.root
+        best = node.route
+        while True:
+            node = node.children[(address >> (width - 1 - node.length)) & 1] if node.length < width else None
+            if node is None or (node.length and (node.network ^ address) >> (width - node.length)):
+                return best
+            if node.route is not None:
+                best = node.route
+
+    # Función para obtener las rutas que cubren un prefijo (de la menos a la más específica)
+    def covering(self, network, length, include_self=False):
+        found = []
+        node = self.root
+        while node is not None and self._covers(node, network, length):
+            if node.route is not None and (include_self or node.length < length):
+                found.append(node.route)
+            if node.length == length:
+                break
+            node = node.children[self._bit(network, node.length)]
+        return found
+
+    # Generador con las rutas cubiertas por un prefijo, en orden (red, longitud)
+    def covered(self, network, length, include_self=False):
+        node = self.root
+        while node is not None and node.length < length and self._covers(node, network, length):
+            node = node.children[self._bit(network, node.length)]
+        # 'node' es el primer nodo con longitud >= length en el camino; sirve si está dentro del prefijo
+        if node is None or not (node.length >= length and (length == 0 or (node.network ^ network) >> (self.width - length) == 0)):
+            return
+        for route in self._walk(node):
+            if include_self or route.length > length:
+                yield route
+
+    def _walk(self, start):
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            if node.route is not None:
+                yield node.route
+            right, left = node.children[1], node.children[0]
+            if right is not None:
+                stack.append(right)
+            if left is not None:
+                stack.append(left)
+
+    # Recorrido ordenado por (red, longitud)
+    def __iter__(self):
+        return self._walk(self.root)
+
+    # Función para crear la tabla desde el diccionario de nxos_route_parser.parse_route_lines
+    @classmethod
+    def from_nxos_routes(cls, routes):
+        table = cls(4)
+        entries = []
+        for prefix, route_info in routes.items():
+            paths = [
+                RoutePath(
+                    path["next_hop"],
+                    none_if_na(path["interface"]),
+                    none_if_na(path["administrative_distance"]),
+                    none_if_na(path["metric"]),
+                    none_if_na(path["age"]),
+                    none_if_na(path["protocol"]),
+                    none_if_na(path["route_type"]),
+                    none_if_na(path["tag"]),
+                )
+                for path in route_info["paths"]
+            ]
+            version, network, length = parse_prefix(prefix)
+            if version == 4:
+                entries.append(Route(network, length, version, route_info["ubest"], route_info["mbest"], paths))
+        table.add_many(entries)
+        return table
+
+    # Función para volver al diccionario {prefijo: {"ubest", "mbest", "paths"}} de los scripts
+    def to_nxos_routes(self):
+        return {
+            route.prefix: {
+                "ubest": route.ubest,
+                "mbest": route.mbest,
+                "paths": [path.as_dict() for path in route.paths]
+            }
+            for route in self
+        }
+
+# Índice de rangos para LPM en bloque: la tabla se aplana en rangos de direcciones
+# disjuntos, cada uno con la ruta más específica que le corresponde. Encima va una tabla
+# directa (como DIR-24-8) indexada por los primeros bits de la dirección: si el bloque cae
+# entero dentro de un rango, la tabla ya tiene su ruta y resolver la dirección es un solo
+# acceso a una lista; solo los bloques partidos por prefijos más largos (p. ej. /25 a /32 en
+# una tabla de 1M de rutas IPv4) se resuelven con una búsqueda binaria (bisect, en C) sobre
+# los inicios de los rangos.
+RANGE_MAX_DIRECT_BITS = 24
+
+# Marca de los bloques de la tabla directa que están partidos entre varios rangos
+SPLIT_BLOCK = object()
+
+class RangeIndex:
+    def __init__(self, table, direct_bits=None):
+        self.version = table.version
+        starts = [0]
+        owners = [None]
+        stack = []  # (fin del rango, ruta) de las rutas que contienen la posición actual
+
+        def emit(position, owner):
+            if starts[-1] == position:
+                owners[-1] = owner
+            else:
+                starts.append(position)
+                owners.append(owner)
+
+        address_space = 1 << table.width
+        for route in table:
+            start = route.network
+            while stack and stack[-1][0] <= start:
+                end, _ = stack.pop()
+                emit(end, stack[-1][1] if stack else None)
+            emit(start, route)
+            stack.append((start + (1 << (table.width - route.length)), route))
+        while stack:
+            end, _ = stack.pop()
+            if end < address_space:
+                emit(end, stack[-1][1] if stack else None)
+
+        self.starts = starts
+        # bisect_right devuelve el índice del rango + 1; el None inicial compensa ese desplazamiento
+        self.owners = [None] + owners
+
+        # Bloque b = direcciones [b << shift, (b + 1) << shift): guarda la ruta del rango que lo
+        # contiene entero, o SPLIT_BLOCK si algún rango empieza dentro del bloque. Por defecto hay
+        # unos 8 bloques por rango (2^24 con 1M de rutas, 16M referencias = 128 MB) y menos en
+        # tablas chicas, donde el bisect de los bloques partidos es corto.
+        if direct_bits is None:
+            direct_bits = min(RANGE_MAX_DIRECT_BITS, table.width, len(starts).bit_length() + 3)
+        self.shift = shift = table.width - direct_bits
+        self.direct = direct = [SPLIT_BLOCK] * (1 << direct_bits)
+        ends = starts[1:] + [address_space]
+        for owner, start, end in zip(owners, starts, ends):
+            first_block = -(-start >> shift)
+            end_block = end >> shift
+            if end_block > first_block:
+                direct[first_block:end_block] = [owner] * (end_block - first_block)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def lookup(self, address):
+        owner = self.direct[address >> self.shift]
+        if owner is SPLIT_BLOCK:
+            owner = self.owners[bisect_right(self.starts, address)]
+        return owner
+
+    # Función para resolver muchas direcciones enteras; devuelve la ruta (o None) de cada una.
+    # Todas pasan por la tabla directa con map y solo las de bloques partidos hacen bisect.
+    def lookup_many(self, addresses):
+        found = list(map(self.direct.__getitem__, map(rshift, addresses, repeat(self.shift))))
+        split = list(compress(range(len(found)), map(is_, found, repeat(SPLIT_BLOCK))))
+        if split:
+            positions = map(bisect_right, repeat(self.starts), map(addresses.__getitem__, split))
+            for i, owner in zip(split, map(self.owners.__getitem__, positions)):
+                found[i] = owner
+        return found
+
+# Función para crear la tabla desde la salida de Genie de 'show ip route' (parsed_output.json)
+def route_table_from_genie(parsed, vrf="default", address_family="ipv4"):
+    version = 6 if address_family == "ipv6" else 4
+    table = RouteTable(version)
+    entries = []
+    af_data = parsed.get("vrf", {}).get(vrf, {}).get("address_family", {}).get(address_family, {})
+    for prefix, route_info in af_data.get("routes", {}).items():
+        distance = route_info.get("route_preference")
+        metric = route_info.get("metric")
+        protocol = route_info.get("source_protocol")
+        next_hop = route_info.get("next_hop", {})
+        paths = [
+            RoutePath(hop.get("next_hop"), hop.get("outgoing_interface"), distance, metric, hop.get("updated"), protocol)
+            for hop in next_hop.get("next_hop_list", {}).values()
+        ]
+        # Rutas conectadas/locales: solo traen la interfaz de salida
+        paths.extend(
+            RoutePath(None, interface, distance, metric, None, protocol)
+            for interface in next_hop.get("outgoing_interface", {})
+        )
+        prefix_version, network, length = parse_prefix(route_info.get("route", prefix))
+        if prefix_version == version:
+            entries.append(Route(network, length, version, None, None, paths))
+    table.add_many(entries)
+    return table
+
+def none_if_na(value):
+    return None if value == "N/A" else value
+
+# Función para generar prefijos IPv4 aleatorios con una mezcla de longitudes parecida a una tabla de Internet
+def generate_synthetic_prefixes(count, seed=0):
+    rng = random.Random(seed)
+    lengths = (8, 12, 16, 19, 20, 21, 22, 23, 24, 24, 24, 24, 24, 24, 25, 30, 32)
+    seen = set()
+    while len(seen) < count:
+        length = rng.choice(lengths)
+        network = rng.getrandbits(32) & (((1 << length) - 1) << (32 - length))
+        seen.add((network, length))
+    return list(seen)
+
+# Función para medir construcción y longest-prefix match sobre una tabla grande
+def run_benchmark(route_count=1_000_000, lookups=200_000):
+    prefixes = generate_synthetic_prefixes(route_count)
+    table = RouteTable(4)
+
+    routes = [Route(network, length, 4, 1, 0, [RoutePath("192.168.0.1", None, 20, 0)]) for network, length in prefixes]
+    start = time.perf_counter()
+    table.add_many(routes)
+    build_time = time.perf_counter() - start
+    print(f"Tabla de {len(table)} rutas construida en {build_time:.2f} s")
+
+    rng = random.Random(1)
+    addresses = [rng.getrandbits(32) for _ in range(lookups)]
+    start = time.perf_counter()
+    hits = sum(1 for address in addresses if table.lookup(address) is not None)
+    lookup_time = time.perf_counter() - start
+    print(f"{lookups} búsquedas LPM en {lookup_time:.2f} s ({lookup_time / lookups * 1e6:.2f} µs por búsqueda, {hits} con ruta)")
+
+    # Verificación contra una búsqueda por longitud (de /32 a /0) sobre una muestra
+    by_length = {}
+    for network, length in prefixes:
+        by_length.setdefault(length, set()).add(network)
+    for address in addresses[:5_000]:
+        expected = next(((address & (((1 << length) - 1) << (32 - length)), length)
+                         for length in range(32, -1, -1)
+                         if address & (((1 << length) - 1) << (32 - length)) in by_length.get(length, ())), None)
+        route = table.lookup(address)
+        if (route and (route.network, route.length)) != expected:
+            print(f"ERROR: LPM incorrecto para {format_prefix(address, 32)}")
+            return 1
+    print("LPM verificado contra búsqueda por longitud en una muestra de 5000 direcciones.")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de la tabla de rutas con trie Patricia.")
+    parser.add_argument("--routes", type=int, default=1_000_000, help="Rutas de la tabla sintética (por defecto: 1000000).")
+    parser.add_argument("--lookups", type=int, default=200_000, help="Búsquedas LPM a medir (por defecto: 200000).")
+    args = parser.parse_args()
+    sys.exit(run_benchmark(args.routes, args.lookups))
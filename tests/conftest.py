@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Los módulos del repo están en la raíz, junto a los scripts
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
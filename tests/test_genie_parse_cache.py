@@ -0,0 +1,73 @@
+import os
+import pytest
+import genie_parse_cache
+from genie_parse_cache import ENTRY_SUFFIX, GenieParseCache, cached_cli
+
+# Parser falso: cuenta cuántas veces se crea y se llama, como si fuera un parser de Genie
+class FakeParser:
+    created = 0
+    calls = 0
+
+    def __init__(self):
+        FakeParser.created += 1
+
+    def cli(self, output):
+        FakeParser.calls += 1
+        return {"lines": output.splitlines(), "calls": FakeParser.calls}
+
+@pytest.fixture(autouse=True)
+def reset_fake_parser():
+    FakeParser.created = FakeParser.calls = 0
+
+@pytest.fixture
+def cache(tmp_path):
+    return GenieParseCache(str(tmp_path), max_bytes=1024 * 1024)
+
+def test_factory_only_runs_on_miss(cache):
+    output = "10.0.0.1  00:01:02  0050.5600.0001  Vlan10\n"
+    first = cached_cli("nxos.show_arp.ShowIpArp", "nxos", output, FakeParser, cache)
+    second = cached_cli("nxos.show_arp.ShowIpArp", "nxos", output, FakeParser, cache)
+    assert first == second == {"lines": output.splitlines(), "calls": 1}
+    assert FakeParser.created == 1 and (cache.hits, cache.misses) == (1, 1)
+
+def test_key_depends_on_output_parser_and_os():
+    keys = {
+        GenieParseCache.make_key("salida", "nxos.show_arp.ShowIpArp", "nxos"),
+        GenieParseCache.make_key("salida ", "nxos.show_arp.ShowIpArp", "nxos"),
+        GenieParseCache.make_key("salida", "nxos.show_fdb.ShowMacAddressTable", "nxos"),
+        GenieParseCache.make_key("salida", "nxos.show_arp.ShowIpArp", "iosxe"),
+    }
+    assert len(keys) == 4
+    assert GenieParseCache.make_key("salida", "nxos.show_arp.ShowIpArp", "nxos") in keys
+
+def test_corrupt_entry_is_parsed_again(cache):
+    cached_cli("nxos.show_arp.ShowIpArp", "nxos", "salida", FakeParser, cache)
+    (entry,) = [name for name in os.listdir(cache.cache_dir) if name.endswith(ENTRY_SUFFIX)]
+    with open(os.path.join(cache.cache_dir, entry), "wb") as entry_file:
+        entry_file.write(b"no es zlib")
+
+    assert cached_cli("nxos.show_arp.ShowIpArp", "nxos", "salida", FakeParser, cache)["calls"] == 2
+    assert cached_cli("nxos.show_arp.ShowIpArp", "nxos", "salida", FakeParser, cache)["calls"] == 2
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = GenieParseCache(str(tmp_path), max_bytes=float("inf"))
+    sizes = {}
+    for name in ("a", "b", "c"):
+        key = cache.make_key(name, "nxos.show_arp.ShowIpArp", "nxos")
+        cache.put(key, os.urandom(2000))
+        sizes[name] = os.path.getsize(cache._entry_path(key))
+        os.utime(cache._entry_path(key), (len(sizes), len(sizes)))
+
+    # 'a' se vuelve a leer, así que la menos usada pasa a ser 'b'
+    assert cache.get(cache.make_key("a", "nxos.show_arp.ShowIpArp", "nxos")) is not None
+    cache.max_bytes = sizes["a"] + sizes["c"]
+    cache.evict()
+    remaining = {name for name in sizes if os.path.exists(cache._entry_path(cache.make_key(name, "nxos.show_arp.ShowIpArp", "nxos")))}
+    assert remaining == {"a", "c"}
+
+def test_disabled_cache_always_parses(monkeypatch):
+    monkeypatch.setenv("GENIE_PARSE_CACHE", "off")
+    monkeypatch.setattr(genie_parse_cache, "_default_cache", None)
+    cached_cli("nxos.show_arp.ShowIpArp", "nxos", "salida", FakeParser)
+    cached_cli("nxos.show_arp.ShowIpArp", "nxos", "salida", FakeParser)
+    assert FakeParser.created == 2
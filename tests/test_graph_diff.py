@@ -0,0 +1,68 @@
+import os
+import random
+import pytest
+from graph_paths import CSRGraph, cargar_grafo_desde_json, generate_random_adjacency
+from graph_diff import PAIR_LESS_REDUNDANT, compute_snapshot_paths, diff_snapshot_paths, pair_parallel_edges
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SNAPSHOT_FILES = ("graph-as-is-2023.json", "graph-as-is-2024.json", "graph-to-be-2024.json")
+
+# El snapshot nuevo calculado a partir del anterior debe dar las mismas filas y la misma
+# comparación que recalcularlo desde cero
+def assert_matches_recompute(graph_before, graph_after):
+    paths_before = compute_snapshot_paths(graph_before)
+    incremental = compute_snapshot_paths(graph_after, paths_before)
+    full = compute_snapshot_paths(graph_after)
+    assert incremental.rows == full.rows
+    assert diff_snapshot_paths(paths_before, incremental) == diff_snapshot_paths(paths_before, full)
+    return diff_snapshot_paths(paths_before, full)
+
+def test_lost_parallel_link_reports_less_redundancy():
+    before = CSRGraph.from_adjacency({"A": [["B", 10], ["B", 10]], "B": [["A", 10], ["A", 10]]})
+    after = CSRGraph.from_adjacency({"A": [["B", 10]], "B": [["A", 10]]})
+    changes = assert_matches_recompute(before, after)
+    assert [(row[0], row[1], row[2], row[7], row[8]) for row in changes] == [
+        ("A", "B", PAIR_LESS_REDUNDANT, 2, 1),
+        ("B", "A", PAIR_LESS_REDUNDANT, 2, 1),
+    ]
+    assert assert_matches_recompute(after, before)
+
+def test_parallel_edges_pair_equal_weights_first():
+    assert sorted(pair_parallel_edges([10.0, 20.0, 30.0], [30.0, 10.0])) == [(10.0, 10.0), (20.0, float("inf")), (30.0, 30.0)]
+    assert sorted(pair_parallel_edges([10.0], [5.0, 10.0, 10.0])) == [(10.0, 10.0), (float("inf"), 5.0), (float("inf"), 10.0)]
+
+# Multigrafo aleatorio (aristas paralelas y lazos incluidos) con enlaces quitados, agregados,
+# duplicados o con peso nuevo; a veces también entra o sale un nodo
+def perturb_multigraph(adjacency, rng):
+    adjacency = {node: [list(edge) for edge in edges] for node, edges in adjacency.items()}
+    nodes = list(adjacency)
+    for _ in range(rng.randint(1, 6)):
+        node = rng.choice(nodes)
+        roll = rng.random()
+        if adjacency[node] and roll < 0.3:
+            adjacency[node].pop(rng.randrange(len(adjacency[node])))
+        elif adjacency[node] and roll < 0.6:
+            adjacency[node].append(list(rng.choice(adjacency[node])))
+        elif adjacency[node] and roll < 0.8:
+            rng.choice(adjacency[node])[1] = rng.randint(1, 100)
+        else:
+            adjacency[node].append([rng.choice(nodes), rng.randint(1, 100)])
+    if rng.random() < 0.3:
+        adjacency["NEW"] = [[nodes[0], 5], [nodes[0], 5]]
+        adjacency[nodes[1]].append(["NEW", 5])
+    if rng.random() < 0.3:
+        removed = nodes[-1]
+        adjacency = {node: [edge for edge in edges if edge[0] != removed] for node, edges in adjacency.items() if node != removed}
+    return adjacency
+
+@pytest.mark.parametrize("seed", range(40))
+def test_random_multigraph_snapshots_match_recompute(seed):
+    rng = random.Random(seed)
+    adjacency = generate_random_adjacency(12, 40, seed)
+    after = perturb_multigraph(adjacency, rng)
+    assert_matches_recompute(CSRGraph.from_adjacency(adjacency), CSRGraph.from_adjacency(after))
+
+def test_repo_snapshots_match_recompute():
+    graphs = [cargar_grafo_desde_json(os.path.join(REPO_DIR, name)) for name in SNAPSHOT_FILES]
+    for graph_before, graph_after in zip(graphs, graphs[1:]):
+        assert_matches_recompute(graph_before, graph_after)
@@ -0,0 +1,99 @@
+import random
+import pytest
+from graph_paths import INFINITY, CSRGraph, shortest_path_counts, generate_random_adjacency, generate_synthetic_graph
+from graph_failures import (
+    TOLERANCE, DynamicGraph, link_failures, node_failures, evaluate_failure, evaluate_failure_from_scratch,
+    run_scenarios, scenario_output_paths
+)
+
+# Árboles de todos los orígenes recalculados desde cero con los pesos actuales del DynamicGraph
+def recomputed_trees(dynamic):
+    graph = dynamic.graph
+    current = CSRGraph(graph.names, graph.offsets, graph.targets, dynamic.weights, graph.ids)
+    return {source: shortest_path_counts(current, source, TOLERANCE) for source in range(len(graph))}
+
+def tree_rows(dynamic):
+    return {source: (tree.distances, tree.hops, tree.counts) for source, tree in dynamic.trees.items()}
+
+@pytest.mark.parametrize("seed", range(5))
+def test_weight_changes_and_rollback_match_recompute(seed):
+    rng = random.Random(seed)
+    graph = CSRGraph.from_adjacency(generate_random_adjacency(25, 90, seed))
+    dynamic = DynamicGraph(graph)
+    baseline = recomputed_trees(dynamic)
+    assert tree_rows(dynamic) == baseline
+
+    snapshots = []
+    for _ in range(8):
+        snapshots.append(recomputed_trees(dynamic))
+        # Lotes con subidas, bajadas (incluidos empates) y aristas quitadas
+        batch = [(rng.randrange(graph.edge_count()), rng.choice((INFINITY, float(rng.randint(1, 100)), 1.0)))
+                 for _ in range(rng.randint(1, 4))]
+        dynamic.change_edges(batch)
+        assert tree_rows(dynamic) == recomputed_trees(dynamic)
+
+    for expected in reversed(snapshots):
+        dynamic.rollback()
+        assert tree_rows(dynamic) == expected
+    assert list(dynamic.weights) == list(graph.weights)
+
+def test_failure_rows_match_recompute():
+    graph = CSRGraph.from_adjacency(generate_synthetic_graph(5))
+    dynamic = DynamicGraph(graph)
+    baseline = [shortest_path_counts(graph, source, TOLERANCE)[0] for source in range(len(graph))]
+    for failure in link_failures(graph) + node_failures(graph):
+        assert evaluate_failure(dynamic, failure, 40.0) == evaluate_failure_from_scratch(graph, baseline, failure, 40.0)
+    assert tree_rows(dynamic) == recomputed_trees(dynamic)
+
+@pytest.fixture
+def mesh():
+    return CSRGraph.from_adjacency(generate_synthetic_graph(4))
+
+def read_outputs(csv_path):
+    summary_path, _ = scenario_output_paths(str(csv_path))
+    with open(csv_path) as rows_file, open(summary_path) as summary_file:
+        return rows_file.read(), summary_file.read()
+
+def test_resume_after_truncated_progress(mesh, tmp_path):
+    expected_path = tmp_path / "completo.csv"
+    run_scenarios(mesh, str(expected_path), depth=2, threshold=30.0)
+    expected = read_outputs(expected_path)
+
+    csv_path = tmp_path / "retomado.csv"
+    run_scenarios(mesh, str(csv_path), depth=2, threshold=30.0)
+    progress_path = scenario_output_paths(str(csv_path))[1]
+    with open(progress_path) as progress_file:
+        lines = progress_file.read().split("\n")
+    # Corte a mitad de una línea de avance y filas a medio escribir después de la última tarea registrada
+    with open(progress_path, "w") as progress_file:
+        progress_file.write("\n".join(lines[:10]) + "\n" + lines[10][:2])
+    with open(csv_path, "a") as rows_file:
+        rows_file.write("fila,a medias")
+
+    failures, resumed, _, _ = run_scenarios(mesh, str(csv_path), depth=2, threshold=30.0, resume=True)
+    assert resumed == 8 and failures == len(link_failures(mesh)) + len(node_failures(mesh))
+    assert sorted(read_outputs(csv_path)[0].splitlines()) == sorted(expected[0].splitlines())
+    assert sorted(read_outputs(csv_path)[1].splitlines()) == sorted(expected[1].splitlines())
+
+def test_resume_with_only_fingerprint_restarts(mesh, tmp_path):
+    csv_path = tmp_path / "n1.csv"
+    run_scenarios(mesh, str(csv_path), threshold=30.0)
+    expected = read_outputs(csv_path)
+    progress_path = scenario_output_paths(str(csv_path))[1]
+    with open(progress_path) as progress_file:
+        fingerprint = progress_file.readline()
+    with open(progress_path, "w") as progress_file:
+        progress_file.write(fingerprint)
+
+    assert run_scenarios(mesh, str(csv_path), threshold=30.0, resume=True)[1] == 0
+    assert read_outputs(csv_path) == expected
+
+def test_resume_rejects_other_run_or_missing_output(mesh, tmp_path):
+    csv_path = tmp_path / "n1.csv"
+    run_scenarios(mesh, str(csv_path), threshold=30.0)
+    with pytest.raises(ValueError):
+        run_scenarios(mesh, str(csv_path), threshold=10.0, resume=True)
+
+    (tmp_path / "n1-resumen.csv").unlink()
+    with pytest.raises(ValueError):
+        run_scenarios(mesh, str(csv_path), threshold=30.0, resume=True)
@@ -0,0 +1,103 @@
+import random
+import pytest
+from route_diff import (
+    PREFIX_ADDED, PREFIX_REMOVED, NEXT_HOP_ADDED, NEXT_HOP_REMOVED, DISTANCE_CHANGED, METRIC_CHANGED,
+    diff_route_tables, summarize_changes
+)
+
+def path(next_hop, interface="N/A", distance=20, metric=0):
+    return {"next_hop": next_hop, "interface": interface, "administrative_distance": distance, "metric": metric}
+
+def route(*paths):
+    return {"ubest": len(paths), "mbest": 0, "paths": list(paths)}
+
+def as_tuples(changes):
+    return sorted((c.network, c.kind, c.next_hop, c.interface, c.before, c.after) for c in changes)
+
+# Comparación directa, recorriendo los paths con búsqueda lineal (paths únicos por next-hop + interfaz)
+def brute_force_diff(before, after):
+    changes = []
+    for network in set(before) | set(after):
+        if network not in after:
+            changes.append((network, PREFIX_REMOVED, None, None, tuple(p["next_hop"] for p in before[network]["paths"]), None))
+            continue
+        if network not in before:
+            changes.append((network, PREFIX_ADDED, None, None, None, tuple(p["next_hop"] for p in after[network]["paths"])))
+            continue
+        paths_before, paths_after = before[network]["paths"], after[network]["paths"]
+        for old in paths_before:
+            new = next((p for p in paths_after if (p["next_hop"], p["interface"]) == (old["next_hop"], old["interface"])), None)
+            hop = (network, old["next_hop"], old["interface"])
+            if new is None:
+                changes.append((network, NEXT_HOP_REMOVED) + hop[1:] + ((old["administrative_distance"], old["metric"]), None))
+                continue
+            if new["administrative_distance"] != old["administrative_distance"]:
+                changes.append((network, DISTANCE_CHANGED) + hop[1:] + (old["administrative_distance"], new["administrative_distance"]))
+            if new["metric"] != old["metric"]:
+                changes.append((network, METRIC_CHANGED) + hop[1:] + (old["metric"], new["metric"]))
+        for new in paths_after:
+            if not any((p["next_hop"], p["interface"]) == (new["next_hop"], new["interface"]) for p in paths_before):
+                changes.append((network, NEXT_HOP_ADDED, new["next_hop"], new["interface"], None, (new["administrative_distance"], new["metric"])))
+    return sorted(changes)
+
+def test_same_next_hop_over_two_interfaces():
+    before = {"10.0.0.0/24": route(path("10.1.1.1", "Eth1/1"), path("10.1.1.1", "Eth1/2"))}
+    after = {"10.0.0.0/24": route(path("10.1.1.1", "Eth1/1", metric=5))}
+    assert as_tuples(diff_route_tables(before, after)) == [
+        ("10.0.0.0/24", METRIC_CHANGED, "10.1.1.1", "Eth1/1", 0, 5),
+        ("10.0.0.0/24", NEXT_HOP_REMOVED, "10.1.1.1", "Eth1/2", (20, 0), None),
+    ]
+
+def test_repeated_path_is_not_collapsed():
+    before = {"10.0.0.0/24": route(path("10.1.1.1", "Eth1/1"), path("10.1.1.1", "Eth1/1", distance=200))}
+    after = {"10.0.0.0/24": route(path("10.1.1.1", "Eth1/1"))}
+    assert as_tuples(diff_route_tables(before, after)) == [
+        ("10.0.0.0/24", NEXT_HOP_REMOVED, "10.1.1.1", "Eth1/1", (200, 0), None),
+    ]
+
+def test_reordered_repeated_paths_are_not_changes():
+    paths = [path("10.1.1.1", "Eth1/1"), path("10.1.1.1", "Eth1/1", distance=200, metric=5), path("10.1.1.2", "Eth1/2")]
+    before = {"10.0.0.0/24": route(*paths)}
+    after = {"10.0.0.0/24": route(*reversed(paths))}
+    assert diff_route_tables(before, after) == []
+
+def test_repeated_paths_match_by_values_first():
+    before = {"10.0.0.0/24": route(path("10.1.1.1", "Eth1/1"), path("10.1.1.1", "Eth1/1", distance=200, metric=5))}
+    after = {"10.0.0.0/24": route(path("10.1.1.1", "Eth1/1", distance=200, metric=5), path("10.1.1.1", "Eth1/1", distance=30),
+                                  path("10.1.1.1", "Eth1/1", metric=7))}
+    assert as_tuples(diff_route_tables(before, after)) == [
+        ("10.0.0.0/24", DISTANCE_CHANGED, "10.1.1.1", "Eth1/1", 20, 30),
+        ("10.0.0.0/24", NEXT_HOP_ADDED, "10.1.1.1", "Eth1/1", None, (20, 7)),
+    ]
+
+def random_paths(rng):
+    hops = {(f"192.168.0.{rng.randint(1, 4)}", rng.choice(("Eth1/1", "Eth1/2", "N/A"))) for _ in range(rng.randint(1, 4))}
+    return [path(next_hop, interface, rng.choice((1, 20, 200)), rng.choice((0, 0, 10))) for next_hop, interface in sorted(hops)]
+
+@pytest.mark.parametrize("seed", range(5))
+def test_diff_matches_brute_force(seed):
+    rng = random.Random(seed)
+    before = {f"10.{i >> 8}.{i & 0xff}.0/24": route(*random_paths(rng)) for i in range(300)}
+    after = {}
+    for network, entry in before.items():
+        roll = rng.random()
+        if roll < 0.1:
+            continue
+        after[network] = route(*random_paths(rng)) if roll < 0.4 else entry
+    for i in range(20):
+        after[f"172.16.{i}.0/24"] = route(*random_paths(rng))
+
+    changes = diff_route_tables(before, after)
+    assert as_tuples(changes) == brute_force_diff(before, after)
+    assert sum(summarize_changes(changes).values()) == len(changes)
+    assert diff_route_tables(before, before) == []
+
+@pytest.mark.parametrize("seed", range(5))
+def test_shuffled_paths_with_repeats_are_not_changes(seed):
+    rng = random.Random(seed)
+    before = {}
+    for i in range(200):
+        paths = random_paths(rng)
+        before[f"10.0.{i}.0/24"] = route(*(paths + [dict(rng.choice(paths), metric=rng.randint(0, 3)) for _ in range(rng.randint(0, 3))]))
+    after = {network: route(*rng.sample(entry["paths"], len(entry["paths"]))) for network, entry in before.items()}
+    assert diff_route_tables(before, after) == []
@@ -0,0 +1,77 @@
+import random
+import pytest
+from route_diff import diff_route_tables
+from route_snapshot_store import PATH_FIELDS, RouteSnapshotStore
+
+def random_route(rng):
+    return {"ubest": 1, "mbest": 0, "paths": [{
+        "next_hop": f"192.168.0.{rng.randint(1, 254)}", "interface": rng.choice(("N/A", "Eth1/1")), "administrative_distance": 20,
+        "metric": rng.choice((0, 10)), "age": "3w2d", "protocol": "bgp", "route_type": "N/A", "tag": "65001"
+    }]}
+
+# Tablas de varios días: cada día cambia, se borra o se agrega un puñado de rutas
+def daily_tables(seed, route_count=3000, days=4):
+    rng = random.Random(seed)
+    routes = {f"10.{i >> 8}.{i & 0xff}.0/24": random_route(rng) for i in range(route_count)}
+    tables = [routes]
+    for _ in range(days - 1):
+        routes = dict(routes)
+        for prefix in rng.sample(sorted(routes), 30):
+            routes[prefix] = random_route(rng)
+        for prefix in rng.sample(sorted(routes), 10):
+            del routes[prefix]
+        for _ in range(10):
+            routes[f"172.16.{rng.randint(0, 255)}.0/24"] = random_route(rng)
+        tables.append(routes)
+    return tables
+
+# El almacén no guarda "age": la tabla reconstruida lo trae como N/A
+def without_age(routes):
+    return {
+        prefix: dict(route_info, paths=[dict({field: path[field] for field in PATH_FIELDS}, age="N/A") for path in route_info["paths"]])
+        for prefix, route_info in routes.items()
+    }
+
+def as_tuples(changes):
+    return sorted((c.network, c.kind, c.next_hop, c.interface, c.before, c.after) for c in changes)
+
+@pytest.mark.parametrize("seed", range(3))
+def test_rebuild_and_diff_match_full_tables(seed, tmp_path):
+    tables = daily_tables(seed)
+    store = RouteSnapshotStore(str(tmp_path))
+    for day, routes in enumerate(tables, 1):
+        store.ingest("leaf-1", routes, f"2024-01-0{day}T08:00:00")
+
+    # Se vuelve a abrir el almacén para leer solo lo que quedó en disco
+    store = RouteSnapshotStore(str(tmp_path))
+    for day, routes in enumerate(tables, 1):
+        assert store.rebuild("leaf-1", f"2024-01-0{day}") == without_age(routes)
+    for before, after in ((1, 2), (1, len(tables)), (len(tables), 2)):
+        expected = diff_route_tables(tables[before - 1], tables[after - 1])
+        assert as_tuples(store.diff("leaf-1", f"2024-01-0{before}", f"2024-01-0{after}")) == as_tuples(expected)
+
+def test_unchanged_table_writes_nothing(tmp_path):
+    routes = daily_tables(0, days=1)[0]
+    store = RouteSnapshotStore(str(tmp_path))
+    first = store.ingest("leaf-1", routes, "2024-01-01T08:00:00")
+    usage = store.disk_usage()
+    second = store.ingest("leaf-1", routes, "2024-01-02T08:00:00")
+    assert first["new_chunks"] == first["chunks"] > 1
+    assert (second["new_chunks"], second["new_bytes"]) == (0, 0)
+    assert store.disk_usage() == usage
+    assert store.diff("leaf-1", "2024-01-01", "2024-01-02") == []
+
+def test_find_snapshot_by_date(tmp_path):
+    routes = daily_tables(0, route_count=50, days=1)[0]
+    store = RouteSnapshotStore(str(tmp_path))
+    for taken_at in ("2024-01-02T08:00:00", "2024-01-02T20:00:00", "2024-01-05T08:00:00"):
+        store.ingest("leaf/1", routes, taken_at)
+
+    assert store.find_snapshot("leaf/1")["taken_at"] == "2024-01-05T08:00:00"
+    assert store.find_snapshot("leaf/1", "2024-01-02")["taken_at"] == "2024-01-02T20:00:00"
+    assert store.find_snapshot("leaf/1", "2024-01-04")["taken_at"] == "2024-01-02T20:00:00"
+    assert store.find_snapshot("leaf/1", "2024-01-02T12:00:00")["taken_at"] == "2024-01-02T08:00:00"
+    with pytest.raises(ValueError):
+        store.find_snapshot("leaf/1", "2024-01-01")
+    with pytest.raises(ValueError):
+        store.find_snapshot("leaf-2")
@@ -0,0 +1,81 @@
+import random
+import pytest
+from route_table import ADDRESS_BITS, RouteTable, RangeIndex, Route, RoutePath, parse_prefix, format_prefix
+
+def mask(length, width):
+    return ((1 << length) - 1) << (width - length)
+
+def contains(network, length, address, width):
+    return address & mask(length, width) == network
+
+# Prefijos aleatorios concentrados en un /8 para que haya muchos anidados, más la ruta por defecto a veces
+def random_prefixes(rng, version, count):
+    width = ADDRESS_BITS[version]
+    base = rng.getrandbits(8) << (width - 8)
+    prefixes = set()
+    for _ in range(count):
+        length = rng.randint(8, width)
+        prefixes.add(((base | rng.getrandbits(width - 8)) & mask(length, width), length))
+    if rng.random() < 0.5:
+        prefixes.add((0, 0))
+    return base, sorted(prefixes)
+
+def build_table(version, prefixes):
+    table = RouteTable(version)
+    table.add_many([Route(network, length, version, 1, 0, [RoutePath(f"nh-{length}")]) for network, length in prefixes])
+    return table
+
+def brute_force_lpm(prefixes, address, width):
+    matches = [(length, network) for network, length in prefixes if contains(network, length, address, width)]
+    return max(matches)[::-1] if matches else None
+
+def key(route):
+    return route and (route.network, route.length)
+
+@pytest.mark.parametrize("version,seed", [(4, seed) for seed in range(6)] + [(6, seed) for seed in range(2)])
+def test_lookup_covering_covered_match_brute_force(version, seed):
+    rng = random.Random(seed)
+    width = ADDRESS_BITS[version]
+    base, prefixes = random_prefixes(rng, version, 150)
+    table = build_table(version, prefixes)
+    assert len(table) == len(prefixes)
+    assert [key(route) for route in table] == prefixes
+
+    addresses = [base | rng.getrandbits(width - 8) for _ in range(300)] + [network for network, _ in prefixes]
+    for address in addresses:
+        assert key(table.lookup(address)) == brute_force_lpm(prefixes, address, width)
+
+    queries = prefixes[::5] + [(base & mask(12, width), 12), (addresses[0] & mask(width - 4, width), width - 4)]
+    for network, length in queries:
+        assert key(table.get(network, length)) == ((network, length) if (network, length) in prefixes else None)
+        covering = [(n, l) for n, l in prefixes if l < length and contains(n, l, network, width)]
+        assert [key(route) for route in table.covering(network, length)] == sorted(covering, key=lambda prefix: prefix[1])
+        covered = [(n, l) for n, l in prefixes if l > length and contains(network, length, n, width)]
+        assert [key(route) for route in table.covered(network, length)] == covered
+
+@pytest.mark.parametrize("direct_bits", [None, 0, 4, 16])
+def test_range_index_matches_trie(direct_bits):
+    rng = random.Random(direct_bits or 0)
+    for version in (4, 6):
+        width = ADDRESS_BITS[version]
+        base, prefixes = random_prefixes(rng, version, 200)
+        table = build_table(version, prefixes)
+        index = RangeIndex(table, direct_bits)
+        addresses = [base | rng.getrandbits(width - 8) for _ in range(500)] + [rng.getrandbits(width) for _ in range(100)]
+        addresses += [network for network, _ in prefixes] + [network + (1 << (width - length)) - 1 for network, length in prefixes]
+        expected = [table.lookup(address) for address in addresses]
+        assert index.lookup_many(addresses) == expected
+        assert [index.lookup(address) for address in addresses] == expected
+
+def test_nxos_routes_round_trip():
+    routes = {
+        "10.0.0.0/8": {"ubest": 1, "mbest": 0, "paths": [
+            {"next_hop": "192.168.0.1", "interface": "Eth1/1", "administrative_distance": 20, "metric": 0,
+             "age": "1d", "protocol": "bgp-65000", "route_type": "external", "tag": "65001"}]},
+        "10.1.0.0/16": {"ubest": 2, "mbest": 0, "paths": [
+            {"next_hop": "192.168.0.2", "interface": "N/A", "administrative_distance": 1, "metric": 0,
+             "age": "N/A", "protocol": "static", "route_type": "N/A", "tag": "N/A"}]},
+    }
+    table = RouteTable.from_nxos_routes(routes)
+    assert table.to_nxos_routes() == routes
+    assert format_prefix(*parse_prefix("10.1.2.3/16")[1:]) == "10.1.0.0/16"